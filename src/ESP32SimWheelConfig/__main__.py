@@ -9,21 +9,41 @@
 # @license Licensed under the EUPL
 # *****************************************************************************
 
+import time
+
+# Note: taken before any other import (see "--profile-startup")
+STARTUP_TIME = time.perf_counter()
+
+# Note: other device modules are imported on first use (see create_device_wrappers())
 if __package__:
     from . import esp32simwheel
 else:
     import esp32simwheel
 
-from nicegui import ui, app, run
-import webview
+import sys
+
+PROFILE_STARTUP = "--profile-startup" in (arg.casefold() for arg in sys.argv)
+
+
+def report_startup_time(milestone: str, start: float = STARTUP_TIME):
+    if PROFILE_STARTUP:
+        elapsed = 1000 * (time.perf_counter() - start)
+        print(f"Startup ({__name__}): {milestone}: {elapsed:.1f} ms")
+
+
+report_startup_time("esp32simwheel")
+_nicegui_import_time = time.perf_counter()
+
+from nicegui import ui, app
+from nicegui.binding import BindableProperty
+
+report_startup_time("nicegui", _nicegui_import_time)
+
 from json import dumps, loads
-from appstrings import gettext, set_translation_locale
-from lang_en import EN
-from lang_es import ES  # NOSONAR
-from lang_zh import ZH  # NOSONAR
-from rename_devices import get_display_name_from_registry, set_display_name_in_registry
+from concurrent.futures import ThreadPoolExecutor
+from appstrings import gettext, set_translation_locale, get_translation_locale
+import asyncio
 import os
-import sys
 
 ## NOTE: Must avoid non-ASCII characters at print()
 
@@ -44,50 +64,106 @@ if __name__ == "__main__":
             print("Language: Chinese")
             set_translation_locale("zh")
 
+report_startup_time("imports")
+
+
+def load_language_module():
+    # Only the selected translation is imported. English is the fallback.
+    # Note: plain import statements, so the freezer can still find them
+    start = time.perf_counter()
+    from lang_en import EN
+
+    language = get_translation_locale().split("_")[0].lower()
+    if language == "es":
+        import lang_es  # NOSONAR
+    elif language == "zh":
+        import lang_zh  # NOSONAR
+    report_startup_time("language modules", start)
+    return EN
+
+
+class LazyStrings:
+    """String IDs, imported along with their translations on first use."""
+
+    def __getattr__(self, name: str):
+        # Note: later lookups go straight to the string IDs
+        global STR
+        STR = load_language_module()
+        return getattr(STR, name)
+
+
 ##################################################################################################
 
 _ = gettext
 
-STR = EN
+STR = LazyStrings()
 MAX_DISPLAY_NAME_LENGTH = 72
 DEFAULT_GROUP_CLASSES = "text-h6 w-full text-bold"
+MAX_PROBE_WORKERS = 4
+DEVICE_STATE_POLLING_INTERVAL = 0.3
+HOTPLUG_CHECK_INTERVAL = 1.0
+DIAGNOSTICS_REFRESH_INTERVAL = 1.0
 
 ##################################################################################################
 
 device = esp32simwheel.SimWheel()
+adevice = None
+device_poller = None
+state = None
+hotplug_monitor = None
+hotplug_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Hotplug")
+registry = esp32simwheel.get_registry()
 
 PROFILE_FILE_TYPE = ("Device profiles (*.swjson)",)
 
 ##################################################################################################
 
-__buttons_map_columns = [
-    {
-        "headerName": _(STR.FIRMWARE_DEFINED),
-        "field": "firmware",
-        "wrapHeaderText": True,
-        "autoHeaderHeight": True,
-    },
-    {
-        "headerName": _(STR.USER_DEFINED),
-        "field": "user",
-        "editable": True,
-        "wrapHeaderText": True,
-        "autoHeaderHeight": True,
-    },
-    {
-        "headerName": _(STR.USER_DEFINED_ALT),
-        "field": "userAltMode",
-        "editable": True,
-        "wrapHeaderText": True,
-        "autoHeaderHeight": True,
-    },
-]
+
+def get_buttons_map_columns() -> list:
+    return [
+        {
+            "headerName": _(STR.FIRMWARE_DEFINED),
+            "field": "firmware",
+            "wrapHeaderText": True,
+            "autoHeaderHeight": True,
+        },
+        {
+            "headerName": _(STR.USER_DEFINED),
+            "field": "user",
+            "editable": True,
+            "wrapHeaderText": True,
+            "autoHeaderHeight": True,
+        },
+        {
+            "headerName": _(STR.USER_DEFINED_ALT),
+            "field": "userAltMode",
+            "editable": True,
+            "wrapHeaderText": True,
+            "autoHeaderHeight": True,
+        },
+    ]
 
 
 def is_running_in_windows() -> bool:
     return os.name == "nt"
 
 
+def get_display_name(vid: int, pid: int) -> str | None:
+    # Note: device display names are only available in Windows
+    if not is_running_in_windows():
+        return None
+    from rename_devices import get_display_name_from_registry
+
+    return get_display_name_from_registry(vid, pid)
+
+
+def set_display_name(vid: int, pid: int, display_name: str | None):
+    if is_running_in_windows():
+        from rename_devices import set_display_name_in_registry
+
+        set_display_name_in_registry(vid, pid, display_name)
+
+
 def get_16bit_value(value_as_string: str) -> int | None:
     try:
         v = int(value_as_string)
@@ -120,9 +196,83 @@ def notify_done(result: bool = True):
         ui.notify(_(STR.ERROR), type="negative")
 
 
+class DeviceState:
+    """Device state as shown in the user interface.
+
+    Updated by the device state poller.
+    Bindings to these properties are pushed, not polled.
+    """
+
+    title = BindableProperty()
+    is_alive = BindableProperty()
+    product_name = BindableProperty()
+    is_read_only = BindableProperty()
+    has_alt_buttons = BindableProperty()
+    alt_buttons_working_mode = BindableProperty()
+    has_dpad = BindableProperty()
+    dpad_working_mode = BindableProperty()
+    has_clutch = BindableProperty()
+    has_analog_clutch_paddles = BindableProperty()
+    clutch_working_mode = BindableProperty()
+    bite_point = BindableProperty()
+    has_battery = BindableProperty()
+    battery_calibration_available = BindableProperty()
+    battery_soc = BindableProperty()
+    has_buttons_map = BindableProperty()
+    has_rotary_encoders = BindableProperty()
+    pulse_width_multiplier = BindableProperty()
+    has_custom_hw_id = BindableProperty()
+
+    def __init__(self, offline_state: dict):
+        for name, value in offline_state.items():
+            setattr(self, name, value)
+        self.title = _(STR.NO_DEVICE)
+
+
+def apply_device_state(changes: dict):
+    for name, value in changes.items():
+        setattr(state, name, value)
+    state.title = state.product_name if state.is_alive else _(STR.NO_DEVICE)
+
+
+def create_device_wrappers():
+    # Note: plain import statements, so the freezer can still find them
+    global adevice
+    global device_poller
+    global state
+    if adevice is not None:
+        return
+    start = time.perf_counter()
+    if __package__:
+        from . import async_simwheel
+        from . import device_state
+    else:
+        import async_simwheel
+        import device_state
+    adevice = async_simwheel.AsyncSimWheel(device)
+    device_poller = device_state.DeviceStatePoller(device)
+    state = DeviceState(device_state.OFFLINE_STATE)
+    device_poller.subscribe(apply_device_state)
+    report_startup_time("device modules", start)
+
+
+async def poll_device_state():
+    device_poller.update(await adevice.run(device_poller.read))
+
+
+async def set_device_property(name: str, value):
+    # Values pushed by the poller are already in place
+    if (value is not None) and (value != getattr(state, name)):
+        await adevice.set(name, value)
+        device_poller.update({name: value})
+
+
 available_devices_ph = None
+no_devices_notice = None
+device_cards = {}
 drawer = None
 btn_map_reload = None
+btn_map_rescan = None
 btn_map_save = None
 btn_map_defaults = None
 buttons_map_grid = None
@@ -135,76 +285,181 @@ custom_vid_input = None
 custom_pid_input = None
 display_name_input = None
 read_only_notice = None
+diagnostics_dialog = None
+diagnostics_code = None
 
 
-def _refresh_available_devices():
-    print("Refreshing device list")
-    global available_devices_ph
-    available_devices_ph.clear()
-    count = 0
-    for sim_wheel in esp32simwheel.enumerate():
-        count += 1
-        with available_devices_ph:
-            with ui.card() as card:
-                card.classes(add="w-full q-ma-xs")
-                ui.label(sim_wheel.product_name).classes("text-overline")
-                ui.label(sim_wheel.manufacturer).classes("font-thin")
-                ui.label(f"S/N: {sim_wheel.device_id:X}").classes("font-thin")
-                ui.label(f"VID: {sim_wheel.vid:X}, PID: {sim_wheel.pid:X}").classes(
-                    "font-thin"
-                )
-                ui.button(_(STR.SELECT), icon="task_alt").classes("self-center").on(
-                    "click", lambda path=sim_wheel.path: select_device(path)
-                )
-        sim_wheel.close()
-    if count == 0:
-        with available_devices_ph:
-            ui.label(_(STR.NO_DEVICES_FOUND)).classes(
-                replace="text-negative", add="text-weight-bold"
+def _get_device_card_info(sim_wheel: esp32simwheel.SimWheel) -> dict:
+    return {
+        "path": sim_wheel.path,
+        "product_name": sim_wheel.product_name,
+        "manufacturer": sim_wheel.manufacturer,
+        "device_id": sim_wheel.device_id,
+        "vid": sim_wheel.vid,
+        "pid": sim_wheel.pid,
+    }
+
+
+def _probe_hotplugged_device(device_dict: dict) -> dict | None:
+    sim_wheel = registry.probe(device_dict)
+    registry.probe_cache.save()
+    if sim_wheel is None:
+        return None
+    return _get_device_card_info(sim_wheel)
+
+
+def add_device_card(info: dict):
+    if info["path"] in device_cards:
+        return
+    with available_devices_ph:
+        with ui.card() as card:
+            card.classes(add="w-full q-ma-xs")
+            ui.label(info["product_name"]).classes("text-overline")
+            ui.label(info["manufacturer"]).classes("font-thin")
+            ui.label(f"S/N: {info['device_id']:X}").classes("font-thin")
+            ui.label(f"VID: {info['vid']:X}, PID: {info['pid']:X}").classes(
+                "font-thin"
+            )
+            ui.button(_(STR.SELECT), icon="task_alt").classes("self-center").on(
+                "click", lambda path=info["path"]: select_device(path)
             )
+    device_cards[info["path"]] = card
+
+
+def remove_device_card(path):
+    card = device_cards.pop(path, None)
+    if card is not None:
+        available_devices_ph.remove(card)
+
+
+def update_no_devices_notice():
+    no_devices_notice.set_visibility(len(device_cards) == 0)
 
 
 async def refresh_available_devices():
+    print("Refreshing device list")
     notification = please_wait()
-    await run.io_bound(_refresh_available_devices)
+    global available_devices_ph
+    available_devices_ph.clear()
+    device_cards.clear()
+    if __package__:
+        from . import async_simwheel
+    else:
+        import async_simwheel
+    # Devices show up as soon as each one is probed (known devices are not)
+    async for sim_wheel in async_simwheel.enumerate(
+        max_workers=MAX_PROBE_WORKERS, registry=registry
+    ):
+        add_device_card(await sim_wheel.run(_get_device_card_info, sim_wheel.device))
+        await sim_wheel.release()
+    update_no_devices_notice()
+    if hotplug_monitor is not None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(hotplug_executor, hotplug_monitor.resync)
     notification.dismiss()
 
 
-def select_device(path: str):
-    device.path = path
+async def check_hotplug():
+    # Only new devices are probed
+    loop = asyncio.get_running_loop()
+    events = await loop.run_in_executor(hotplug_executor, hotplug_monitor.poll)
+    for event in events:
+        if event.added:
+            print(f"Connected: {event.path}")
+            info = await loop.run_in_executor(
+                hotplug_executor, _probe_hotplugged_device, event.device_dict
+            )
+            if info is not None:
+                add_device_card(info)
+                if event.path == device.path:
+                    # The selected device is connected again
+                    await switch_device(event.path)
+        else:
+            print(f"Disconnected: {event.path}")
+            registry.forget(event.path)
+            remove_device_card(event.path)
+    if events:
+        update_no_devices_notice()
+
+
+def _attach_device(sim_wheel: esp32simwheel.SimWheel):
+    # Note: the previous device stays open in the registry
+    global device
+    device = sim_wheel
+    device_poller.device = sim_wheel
+
+
+async def switch_device(path) -> bool:
+    sim_wheel = registry.get(path)
+    if sim_wheel is None:
+        return False
+    await adevice.attach(sim_wheel)
+    _attach_device(sim_wheel)
+    return True
+
+
+async def select_device(path: str):
+    if not await switch_device(path):
+        # Disconnected in the meantime
+        remove_device_card(path)
+        update_no_devices_notice()
+        return
     print(f"Selecting {device.path}")
     drawer.toggle()
 
 
 def auto_select_device():
-    for sim_wheel in esp32simwheel.enumerate():
-        device.path = sim_wheel.path
+    # Note: the device wrappers are created for the selected device
+    global device
+    start = time.perf_counter()
+    for sim_wheel in registry.enumerate():
+        device = sim_wheel
         break
+    report_startup_time("device probe (auto-select)", start)
+    create_device_wrappers()
 
 
-def device_refresh():
-    device.is_alive
+first_paint_reported = False
 
 
 async def on_app_startup():
     print("Starting")
+    global first_paint_reported
+    if not first_paint_reported:
+        # Note: clients connect once the page is shown
+        first_paint_reported = True
+        report_startup_time("first paint")
+    global hotplug_monitor
+    if hotplug_monitor is None:
+        if __package__:
+            from . import hotplug
+        else:
+            import hotplug
+        loop = asyncio.get_running_loop()
+        hotplug_monitor = await loop.run_in_executor(
+            hotplug_executor, hotplug.HotplugMonitor
+        )
+    start = time.perf_counter()
     await refresh_available_devices()
-    ui.timer(2.0, device_refresh)
+    report_startup_time("device probe (device list)", start)
+    ui.timer(DEVICE_STATE_POLLING_INTERVAL, poll_device_state)
+    ui.timer(HOTPLUG_CHECK_INTERVAL, check_hotplug)
 
 
-def set_bite_point(value):
-    device.bite_point = value
+async def set_bite_point(value):
+    await set_device_property("bite_point", value)
 
 
 def buttons_group_enable(value: bool):
     # buttons_map_group.set_enabled(value)
     btn_map_reload.set_enabled(value)
+    btn_map_rescan.set_enabled(value)
     btn_map_save.set_enabled(value)
     btn_map_defaults.set_enabled(value)
     buttons_map_grid.set_visibility(value)
 
 
-def buttons_map_value_change(changes):
+async def buttons_map_value_change(changes):
     row_index = changes.args["rowIndex"]
     column_key = changes.args["colId"]
     value = changes.args["value"]
@@ -216,10 +471,12 @@ def buttons_map_value_change(changes):
         )
     else:
         buttons_map_grid.options["rowData"][row_index][column_key] = value
-        device.set_button_map_tuple(buttons_map_grid.options["rowData"][row_index])
+        await adevice.set_button_map_tuple(
+            buttons_map_grid.options["rowData"][row_index]
+        )
         # Ensure that the new value was accepted by the device
         try:
-            btn_map = device.get_button_map(
+            btn_map = await adevice.get_button_map(
                 buttons_map_grid.options["rowData"][row_index]["firmware"]
             )
             if btn_map != {}:
@@ -229,12 +486,12 @@ def buttons_map_value_change(changes):
     buttons_map_grid.update()
 
 
-def _reload_buttons_map():
+async def _reload_buttons_map(rescan: bool = False):
     print("Loading buttons map")
     global buttons_map_grid
     buttons_map_grid.options["rowData"].clear()
     try:
-        for map in device.enumerate_buttons_map():
+        async for map in adevice.enumerate_buttons_map(rescan):
             buttons_map_grid.options["rowData"].append(map)
         print(f"Buttons map: {len(buttons_map_grid.options['rowData'])} items")
         print("Buttons map: Done!")
@@ -243,27 +500,36 @@ def _reload_buttons_map():
         print("Buttons map: Failed !")
 
 
-async def reload_buttons_map():
+async def _update_buttons_map_grid(rescan: bool):
     global buttons_map_grid
     buttons_group_enable(False)
     notification = please_wait()
-    await run.io_bound(_reload_buttons_map)
+    await _reload_buttons_map(rescan)
     buttons_map_grid.update()
     buttons_group_enable(True)
     notification.dismiss()
 
 
-def save_now():
+async def reload_buttons_map():
+    await _update_buttons_map_grid(rescan=False)
+
+
+async def rescan_buttons_map():
+    # All firmware-defined button numbers are probed
+    await _update_buttons_map_grid(rescan=True)
+
+
+async def save_now():
     buttons_group_enable(False)
-    device.save_now()
+    await adevice.save_now()
     notify_done()
     buttons_group_enable(True)
 
 
 async def buttons_map_factory_defaults():
-    device.reset_buttons_map()
+    await adevice.reset_buttons_map()
     await reload_buttons_map()
-    save_now()
+    await save_now()
 
 
 def profile_group_enable(enabled: bool = True):
@@ -297,7 +563,12 @@ def _load_profile(filename: str) -> bool:
                 return False
             if not check_profile_buttons_map.value:
                 content.pop("ButtonsMap", None)
-            device.deserialize(content)
+            summary = device.deserialize(content, only_changes=True)
+            print(
+                f"Profile: {len(summary['settings'])} settings and "
+                f"{len(summary['buttons_map'])} button mappings written, "
+                f"{summary['unchanged']} unchanged"
+            )
         finally:
             f.close()
         return True
@@ -312,7 +583,7 @@ async def load_profile():
     if filename:
         notification = please_wait()
         profile_group_enable(False)
-        done = await run.io_bound(_load_profile, filename[0])
+        done = await adevice.run(_load_profile, filename[0])
         notification.dismiss()
         profile_group_enable(True)
         notify_done(done)
@@ -338,6 +609,8 @@ def _save_profile(filename: str) -> bool:
 
 
 async def save_profile():
+    import webview
+
     filename = await app.native.main_window.create_file_dialog(
         webview.FileDialog.SAVE,  # DevNote: webview.SAVE_DIALOG is deprecated and does not work
         allow_multiple=False,
@@ -346,69 +619,103 @@ async def save_profile():
     if filename:
         notification = please_wait()
         profile_group_enable(False)
-        done = await run.io_bound(_save_profile, filename[0])
+        done = await adevice.run(_save_profile, filename[0])
         notification.dismiss()
         profile_group_enable(True)
         notify_done(done)
 
 
-def on_update_hardware_id():
-    vid = device.custom_vid
-    pid = device.custom_pid
+async def on_update_hardware_id():
+    vid = await adevice.get("custom_vid")
+    pid = await adevice.get("custom_pid")
     custom_vid_input.value = vid
     custom_pid_input.value = pid
-    display_name_input.value = get_display_name_from_registry(vid, pid)
+    display_name_input.value = get_display_name(vid, pid)
 
 
-def hardware_id_factory_defaults():
+async def hardware_id_factory_defaults():
     try:
-        device.reset_custom_hardware_id()
-        vid = device.custom_vid
-        pid = device.custom_pid
-        if is_running_in_windows():
-            set_display_name_in_registry(vid, pid, None)
-        on_update_hardware_id()
+        await adevice.reset_custom_hardware_id()
+        vid = await adevice.get("custom_vid")
+        pid = await adevice.get("custom_pid")
+        set_display_name(vid, pid, None)
+        await on_update_hardware_id()
         notify_done()
     except Exception:
         notify_done(False)
 
 
-def hardware_id_set():
+async def hardware_id_set():
     try:
         display_name = display_name_input.value
         if (display_name != None) and (len(display_name) > MAX_DISPLAY_NAME_LENGTH):
             raise RuntimeError("Display name is too long")
         vid = get_16bit_value(custom_vid_input.value)
         pid = get_16bit_value(custom_pid_input.value)
-        device.set_custom_hardware_id(vid, pid)
-        if is_running_in_windows():
-            set_display_name_in_registry(vid, pid, display_name)
-        on_update_hardware_id()
+        await adevice.set_custom_hardware_id(vid, pid)
+        set_display_name(vid, pid, display_name)
+        await on_update_hardware_id()
         notify_done()
     except Exception:
         notify_done(False)
 
 
-def reverse_left_axis_click():
+async def reverse_left_axis_click():
     try:
-        device.reverse_left_axis()
+        await adevice.reverse_left_axis()
         notify_done()
     except Exception:
         notify_done(False)
 
 
-def reverse_right_axis_click():
+async def reverse_right_axis_click():
     try:
-        device.reverse_right_axis()
+        await adevice.reverse_right_axis()
         notify_done()
     except Exception:
         notify_done(False)
 
 
+def refresh_diagnostics():
+    if diagnostics_dialog.value:
+        stats = device.stats()
+        if stats is None:
+            diagnostics_code.set_content("{}")
+        else:
+            diagnostics_code.set_content(dumps(stats, indent=2))
+
+
+def on_key(e):
+    # Hidden diagnostics panel: CTRL+SHIFT+D
+    if (
+        e.action.keydown
+        and (not e.action.repeat)
+        and e.modifiers.ctrl
+        and e.modifiers.shift
+        and (e.key.code == "KeyD")
+    ):
+        # Note: HID traffic is not instrumented until first requested
+        esp32simwheel.enable_instrumentation()
+        diagnostics_dialog.set_value(not diagnostics_dialog.value)
+        refresh_diagnostics()
+
+
 ##################################################################################################
 
 
 def main_page():
+    create_device_wrappers()
+
+    # Hidden diagnostics panel
+
+    global diagnostics_dialog
+    global diagnostics_code
+    ui.keyboard(on_key=on_key, ignore=[])
+    with ui.dialog() as diagnostics_dialog:
+        with ui.card().classes("w-full"):
+            ui.label("HID diagnostics").classes("text-h6")
+            diagnostics_code = ui.code("{}", language="json").classes("w-full")
+    ui.timer(DIAGNOSTICS_REFRESH_INTERVAL, refresh_diagnostics)
 
     # Top header
 
@@ -420,13 +727,7 @@ def main_page():
             header_label = ui.label().classes(
                 "text-h3 align-middle tracking-wide ellipsis"
             )
-            header_label.bind_text_from(
-                device,
-                "is_alive",
-                backward=lambda is_alive_value: (
-                    device.product_name if is_alive_value else _(STR.NO_DEVICE)
-                ),
-            )
+            header_label.bind_text_from(state, "title")
 
     # Drawer
 
@@ -442,7 +743,12 @@ def main_page():
             )
         ui.separator()
         global available_devices_ph
+        global no_devices_notice
         available_devices_ph = ui.column().classes("w-full justify-center")
+        no_devices_notice = ui.label(_(STR.NO_DEVICES_FOUND)).classes(
+            replace="text-negative", add="text-weight-bold"
+        )
+        no_devices_notice.set_visibility(False)
 
     # Main content
 
@@ -451,27 +757,31 @@ def main_page():
     global read_only_notice
     read_only_notice = ui.label(_(STR.READ_ONLY_NOTICE))
     read_only_notice.classes("text-lg text-red-600 text-lg self-center")
-    read_only_notice.bind_visibility_from(device, "is_read_only")
+    read_only_notice.bind_visibility_from(state, "is_read_only")
 
     ## ALT buttons group
 
     alt_buttons_group = ui.expansion(_(STR.ALT_BUTTONS), value=True, icon="touch_app")
     alt_buttons_group.classes(DEFAULT_GROUP_CLASSES)
-    alt_buttons_group.bind_visibility_from(device, "has_alt_buttons")
+    alt_buttons_group.bind_visibility_from(state, "has_alt_buttons")
     with alt_buttons_group:
-        ui.toggle({True: _(STR.ALT_MODE), False: _(STR.REGULAR_BUTTON)}).bind_value(
-            device, "alt_buttons_working_mode"
-        ).classes("self-center")
+        ui.toggle(
+            {True: _(STR.ALT_MODE), False: _(STR.REGULAR_BUTTON)},
+            on_change=lambda e: set_device_property(
+                "alt_buttons_working_mode", e.value
+            ),
+        ).bind_value_from(state, "alt_buttons_working_mode").classes("self-center")
 
     ## DPAD group
 
     dpad_group = ui.expansion(_(STR.DPAD), value=True, icon="gamepad")
     dpad_group.classes(DEFAULT_GROUP_CLASSES)
-    dpad_group.bind_visibility_from(device, "has_dpad")
+    dpad_group.bind_visibility_from(state, "has_dpad")
     with dpad_group:
-        ui.toggle({True: _(STR.NAV), False: _(STR.REGULAR_BUTTON)}).bind_value(
-            device, "dpad_working_mode"
-        ).classes("self-center")
+        ui.toggle(
+            {True: _(STR.NAV), False: _(STR.REGULAR_BUTTON)},
+            on_change=lambda e: set_device_property("dpad_working_mode", e.value),
+        ).bind_value_from(state, "dpad_working_mode").classes("self-center")
 
     ## Clutch paddles group
 
@@ -479,7 +789,7 @@ def main_page():
         _(STR.CLUTCH_PADDLES), value=True, icon="garage"
     )
     clutch_paddles_group.classes(DEFAULT_GROUP_CLASSES)
-    clutch_paddles_group.bind_visibility_from(device, "has_clutch")
+    clutch_paddles_group.bind_visibility_from(state, "has_clutch")
     with clutch_paddles_group:
         ui.radio(
             {
@@ -489,17 +799,18 @@ def main_page():
                 3: _(STR.BUTTON),
                 4: _(STR.LAUNCH_CTRL_LEFT_MASTER),
                 5: _(STR.LAUNCH_CTRL_RIGHT_MASTER),
-            }
-        ).classes("self-center").bind_value(device, "clutch_working_mode").style(
+            },
+            on_change=lambda e: set_device_property("clutch_working_mode", e.value),
+        ).classes("self-center").bind_value_from(state, "clutch_working_mode").style(
             "font-size: 75%"
         ).props(
             "size=xs"
         )
         ui.label(_(STR.BITE_POINT)).classes("self-center text-sm")
         bite_point_slider = ui.slider(min=0, max=254, step=1)
-        bite_point_slider.bind_value_from(device, "bite_point")
+        bite_point_slider.bind_value_from(state, "bite_point")
         bite_point_slider.bind_enabled_from(
-            device,
+            state,
             "clutch_working_mode",
             backward=lambda value: (
                 value == esp32simwheel.ClutchPaddlesWorkingMode.CLUTCH
@@ -515,12 +826,12 @@ def main_page():
         )
         ui.label(_(STR.ANALOG_AXES)).classes(
             "text-sm self-center"
-        ).bind_visibility_from(device, "has_analog_clutch_paddles")
+        ).bind_visibility_from(state, "has_analog_clutch_paddles")
         ui.button(
             _(STR.RECALIBRATE),
             icon="autorenew",
-            on_click=lambda: device.recalibrate_analog_axes(),
-        ).bind_visibility_from(device, "has_analog_clutch_paddles").classes(
+            on_click=adevice.recalibrate_analog_axes,
+        ).bind_visibility_from(state, "has_analog_clutch_paddles").classes(
             "self-center"
         )
         with ui.row().classes("self-center"):
@@ -528,28 +839,28 @@ def main_page():
                 _(STR.REVERSE_LEFT_AXIS),
                 icon="invert_colors",
                 on_click=reverse_left_axis_click,
-            ).bind_visibility_from(device, "has_analog_clutch_paddles")
+            ).bind_visibility_from(state, "has_analog_clutch_paddles")
             ui.button(
                 _(STR.REVERSE_RIGHT_AXIS),
                 icon="invert_colors",
                 on_click=reverse_right_axis_click,
-            ).bind_visibility_from(device, "has_analog_clutch_paddles")
+            ).bind_visibility_from(state, "has_analog_clutch_paddles")
 
     ## Battery group
 
     battery_group = ui.expansion(_(STR.BATTERY), value=True, icon="battery_full")
     battery_group.classes(DEFAULT_GROUP_CLASSES)
-    battery_group.bind_visibility_from(device, "has_battery")
+    battery_group.bind_visibility_from(state, "has_battery")
     with battery_group:
         ui.label(_(STR.SOC)).classes("text-sm self-center")
         ui.linear_progress(show_value=False).bind_value_from(
-            device, "battery_soc", backward=lambda v: 0 if (v == None) else v / 100
+            state, "battery_soc", backward=lambda v: 0 if (v == None) else v / 100
         )
         ui.button(
             _(STR.RECALIBRATE),
             icon="autorenew",
-            on_click=lambda: device.recalibrate_battery(),
-        ).bind_visibility_from(device, "battery_calibration_available").classes(
+            on_click=adevice.recalibrate_battery,
+        ).bind_visibility_from(state, "battery_calibration_available").classes(
             "self-center"
         )
 
@@ -557,15 +868,19 @@ def main_page():
 
     buttons_map_group = ui.expansion(_(STR.BUTTONS_MAP), value=False, icon="map")
     buttons_map_group.classes(DEFAULT_GROUP_CLASSES)
-    buttons_map_group.bind_visibility_from(device, "has_buttons_map")
+    buttons_map_group.bind_visibility_from(state, "has_buttons_map")
     with buttons_map_group:
         with ui.row().classes("self-center"):
             global btn_map_reload
+            global btn_map_rescan
             global btn_map_save
             global btn_map_defaults
             btn_map_reload = ui.button(
                 _(STR.RELOAD), icon="sync", on_click=reload_buttons_map
             )
+            btn_map_rescan = ui.button(
+                _(STR.RESCAN), icon="manage_search", on_click=rescan_buttons_map
+            )
             btn_map_save = ui.button(_(STR.SAVE), icon="save", on_click=save_now)
             btn_map_defaults = ui.button(
                 _(STR.DEFAULTS), icon="factory", on_click=buttons_map_factory_defaults
@@ -574,7 +889,7 @@ def main_page():
         global buttons_map_grid
         buttons_map_grid = ui.aggrid(
             {
-                "columnDefs": __buttons_map_columns,
+                "columnDefs": get_buttons_map_columns(),
                 "rowData": [],
                 "rowSelection": "single",
                 "stopEditingWhenCellsLoseFocus": True,
@@ -587,7 +902,7 @@ def main_page():
         _(STR.ROTARY_ENCODERS), value=False, icon="360"
     )
     rotary_encoders_group.classes(DEFAULT_GROUP_CLASSES)
-    rotary_encoders_group.bind_visibility_from(device, "has_rotary_encoders")
+    rotary_encoders_group.bind_visibility_from(state, "has_rotary_encoders")
     with rotary_encoders_group:
         with ui.row().classes("self-center"):
             ui.label(_(STR.PULSE_WIDTH)).classes("text-sm self-center")
@@ -597,7 +912,10 @@ def main_page():
                 step=1,
                 precision=0,
                 prefix="x",
-            ).bind_value(device, "pulse_width_multiplier")
+                on_change=lambda e: set_device_property(
+                    "pulse_width_multiplier", e.value
+                ),
+            ).bind_value_from(state, "pulse_width_multiplier")
 
     ## Profile group
 
@@ -606,7 +924,7 @@ def main_page():
     global check_profile_buttons_map
     profile_group = ui.expansion(_(STR.LOCAL_PROFILE), value=False, icon="inventory_2")
     profile_group.classes(DEFAULT_GROUP_CLASSES)
-    profile_group.bind_visibility_from(device, "is_alive")
+    profile_group.bind_visibility_from(state, "is_alive")
     with profile_group:
         check_profile_same_device = ui.checkbox(_(STR.CHECK_ID), value=True)
         check_profile_same_device.classes("text-sm")
@@ -614,7 +932,7 @@ def main_page():
             ui.tooltip(_(STR.PROFILE_CHECK_TOOLTIP))
         check_profile_buttons_map = ui.checkbox(
             _(STR.INCLUDE_BTN_MAP), value=False
-        ).bind_visibility_from(device, "has_buttons_map")
+        ).bind_visibility_from(state, "has_buttons_map")
         with ui.row().classes("self-center"):
             global btn_load_profile
             global btn_save_profile
@@ -631,7 +949,7 @@ def main_page():
         _(STR.CUSTOM_HARDWARE_ID), value=False, icon="fingerprint"
     )
     hardware_id_group.classes(DEFAULT_GROUP_CLASSES)
-    hardware_id_group.bind_visibility_from(device, "has_custom_hw_id")
+    hardware_id_group.bind_visibility_from(state, "has_custom_hw_id")
     with hardware_id_group:
         read_only_notice = ui.label(_(STR.DANGER_ZONE)).classes(
             "self-center text-lg text-red-600"
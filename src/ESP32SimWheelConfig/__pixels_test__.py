@@ -9,27 +9,176 @@
 # @license Licensed under the EUPL
 # *****************************************************************************
 
+"""
+Pixel control test and throughput benchmark
+
+Usage:
+
+    python __pixels_test__.py [FPS] [--fake N] [--latency MS]
+    python __pixels_test__.py [FPS] --benchmark [--duration SECONDS]
+                              [--json FILE] [--csv FILE] [--fake N] [--latency MS]
+    python __pixels_test__.py --alloc [--calls N] [--fake N]
+
+FPS is the frame rate limit (zero means "as fast as the devices allow").
+Without "--benchmark", a chase animation runs on all devices until
+interrupted. With "--benchmark", each device runs on its own
+for a fixed time and the results are printed and exported.
+With "--alloc", memory allocated by each pixel_set() call is traced.
+"--fake" uses N emulated devices instead of real ones.
+"""
+
 if __package__:
     from . import esp32simwheel
+    from . import pixels
+    from . import fake_hid
 else:
     import esp32simwheel
+    import pixels
+    import fake_hid
 
-import time
+import argparse
+import csv
+import hid
+import json
 import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
 
 ###############################################################################
 
 
-def pixel_control_enumerate():
-    for device in esp32simwheel.enumerate(configurable_only=False):
+class _TimedDevice:
+    """Wrap a HID device to time written reports."""
+
+    def __init__(self, backend: "_TimedBackend", device):
+        self.__backend = backend
+        self.__device = device
+        self.__path = None
+
+    def __getattr__(self, name):
+        return getattr(self.__device, name)
+
+    def open_path(self, path):
+        self.__device.open_path(path)
+        self.__path = path
+
+    def __timed(self, function, data):
+        start = time.perf_counter()
+        result = function(data)
+        latency = time.perf_counter() - start
+        self.__backend.write_latency.setdefault(self.__path, []).append(latency)
+        return result
+
+    def write(self, data):
+        return self.__timed(self.__device.write, data)
+
+    def send_feature_report(self, data):
+        return self.__timed(self.__device.send_feature_report, data)
+
+
+class _TimedBackend:
+    """Wrap a HID backend to time written reports."""
+
+    def __init__(self, backend):
+        self.__backend = backend
+        # Key: device path. Value: latency of each written report, in seconds
+        self.write_latency = {}
+
+    def enumerate(self, *args, **kwargs):
+        return self.__backend.enumerate(*args, **kwargs)
+
+    def device(self):
+        return _TimedDevice(self, self.__backend.device())
+
+
+class _NullWriteDevice:
+    """Wrap a HID device to discard written reports."""
+
+    # Note: no __getattr__(), since it would make every method call
+    # allocate a bound method object, which would be traced by "--alloc"
+
+    def __init__(self, device):
+        self.__device = device
+
+    def open_path(self, path):
+        return self.__device.open_path(path)
+
+    def close(self):
+        return self.__device.close()
+
+    def get_manufacturer_string(self):
+        return self.__device.get_manufacturer_string()
+
+    def get_product_string(self):
+        return self.__device.get_product_string()
+
+    def get_feature_report(self, report_id, max_length):
+        return self.__device.get_feature_report(report_id, max_length)
+
+    def write(self, data):
+        return len(data)
+
+    def send_feature_report(self, data):
+        return len(data)
+
+
+class _NullWriteBackend:
+    """Wrap a HID backend to discard written reports."""
+
+    def __init__(self, backend):
+        self.__backend = backend
+
+    def enumerate(self, *args, **kwargs):
+        return self.__backend.enumerate(*args, **kwargs)
+
+    def device(self):
+        return _NullWriteDevice(self.__backend.device())
+
+
+###############################################################################
+
+
+@dataclass
+class BenchmarkResult:
+    """Pixel throughput of a single device."""
+
+    path: str
+    product_name: str
+    max_fps: int
+    target_fps: float
+    duration: float
+    frames: int
+    fps: float
+    late_frames: int
+    dropped_frames: int
+    reports: int
+    reports_per_second: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of a sorted list (zero if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+###############################################################################
+
+
+def pixel_control_enumerate(backend=None):
+    for device in esp32simwheel.enumerate(configurable_only=False, backend=backend):
         if device.has_pixel_control:
             yield device
 
 
-def set_pixel(device, group, index):
-    for i in range(device.pixel_count(group)):
-        device.pixel_set(group, i, 0, 0, 0)
-    device.pixel_set(group, index, 255, 255, 255)
+def set_pixel(frame, group, index):
+    frame.fill(group, 0, 0, 0)
+    frame.set(group, index, 255, 255, 255)
 
 
 def next_index(device):
@@ -40,41 +189,234 @@ def next_index(device):
         # print(f"GRP: {group} IDX: {device.pixel_index[group]}")
 
 
+def render(frame):
+    for group in esp32simwheel.PixelGroup:
+        set_pixel(frame, group, frame.device.pixel_index[group])
+        # print(f"GRP: {group} IDX: {frame.device.pixel_index[group]}")
+    next_index(frame.device)
+
+
+def benchmark(device, backend: _TimedBackend, fps, duration) -> BenchmarkResult:
+    device.pixel_index = [0, 0, 0]
+    streamer = pixels.PixelStreamer(device, fps)
+    streamer.frame.reset()
+    backend.write_latency[device.path] = []
+    streamer.run(render, duration)
+    stats = streamer.stats
+    latency = sorted(backend.write_latency[device.path])
+    path = device.path
+    if isinstance(path, bytes):
+        path = path.decode(errors="replace")
+    return BenchmarkResult(
+        path=path,
+        product_name=device.product_name,
+        max_fps=device.max_fps,
+        target_fps=streamer.fps,
+        duration=stats.elapsed,
+        frames=stats.frames,
+        fps=stats.fps,
+        late_frames=stats.late_frames,
+        dropped_frames=stats.dropped_frames,
+        reports=len(latency),
+        reports_per_second=len(latency) / stats.elapsed if stats.elapsed > 0 else 0.0,
+        latency_p50_ms=1000 * percentile(latency, 50),
+        latency_p95_ms=1000 * percentile(latency, 95),
+        latency_p99_ms=1000 * percentile(latency, 99),
+    )
+
+
+def print_result(result: BenchmarkResult):
+    print(f"Device: '{result.product_name}' ({result.path})")
+    print(f"  FPS: {result.fps:.1f} (target {result.target_fps}, max {result.max_fps})")
+    print(f"  Late / dropped frames: {result.late_frames} / {result.dropped_frames}")
+    print(f"  Reports per second: {result.reports_per_second:.1f}")
+    print(
+        f"  Report latency (ms): p50 {result.latency_p50_ms:.3f}"
+        f" / p95 {result.latency_p95_ms:.3f}"
+        f" / p99 {result.latency_p99_ms:.3f}"
+    )
+
+
+def export_json(results: list[BenchmarkResult], filename: str):
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump([asdict(result) for result in results], file, indent=2)
+
+
+def export_csv(results: list[BenchmarkResult], filename: str):
+    with open(filename, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=BenchmarkResult.__dataclass_fields__)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(asdict(result))
+
+
+def measure_allocations(device, calls: int) -> tuple[float, int]:
+    """Trace memory allocated by pixel_set().
+
+    Written reports are discarded, so HID backend allocations are not traced.
+    HID instrumentation should be disabled, since it allocates
+    on every call (see esp32simwheel.enable_instrumentation()).
+
+    Returns:
+        tuple[float, int]: Average peak of allocated bytes per call
+        and bytes still allocated after all calls.
+    """
+    group = next(
+        group for group in esp32simwheel.PixelGroup if device.pixel_count(group) > 0
+    )
+    count = device.pixel_count(group)
+
+    def trace(function) -> tuple[float, int]:
+        function(group, 0, 0, 0, 0)  # warm up
+        peak_total = 0
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        for i in range(calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            function(group, i % count, i & 0xFF, 0, 0)
+            peak_total += tracemalloc.get_traced_memory()[1] - before
+        retained = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+        return (peak_total / calls, retained)
+
+    # Note: subtract the cost of tracing itself
+    base_peak, base_retained = trace(lambda *args: None)
+    peak, retained = trace(device.pixel_set)
+    return (max(0.0, peak - base_peak), max(0, retained - base_retained))
+
+
 ###############################################################################
 
-if len(sys.argv) > 1:
-    fps = int(sys.argv[1])
-    if fps < 0:
-        fps = 50
-else:
-    fps = 50
 
-print("------------------")
-print("Pixel control test")
-print(f"FPS limit: {fps}")
-print("------------------")
+def run_test(devices, fps):
+    engine = pixels.SyncPixelEngine(devices, fps)
 
-if fps==0:
-    frame_limit_time = 0.0
-else:
-    frame_limit_time = 1 / fps
+    print("------------------")
+    print("Pixel control test")
+    print(f"FPS limit: {engine.fps}")
+    print("------------------")
 
-devices = list(pixel_control_enumerate())
-for sim_wheel in devices:
-    print(f"Found : '{sim_wheel.manufacturer}' / '{sim_wheel.product_name}'")
-    sim_wheel.pixel_index = [0, 0, 0]
-    sim_wheel.pixel_reset()
+    for sim_wheel in devices:
+        print(f"Found : '{sim_wheel.manufacturer}' / '{sim_wheel.product_name}'")
+        print(f"Max FPS: {sim_wheel.max_fps}")
+        sim_wheel.pixel_index = [0, 0, 0]
+    for frame in engine.frames:
+        frame.reset()
 
-print("-------")
-print("Running")
-print("-------")
+    print("-------")
+    print("Running")
+    print("-------")
 
-while True:
+    try:
+        engine.run(render)
+    except KeyboardInterrupt:
+        engine.stop()
+        stats = engine.stats
+        skew = engine.skew
+        print(f"Achieved FPS: {stats.fps:.1f}")
+        print(f"Late frames: {stats.late_frames}")
+        print(f"Dropped frames: {stats.dropped_frames}")
+        if skew.frames > 0:
+            print(f"Mean skew between devices: {1000 * skew.mean:.3f} ms")
+            print(f"Max. skew between devices: {1000 * skew.max:.3f} ms")
+
+
+def run_benchmark(devices, backend, fps, args):
+    print("-----------------------")
+    print("Pixel control benchmark")
+    print(f"Duration: {args.duration} s per device")
+    print("-----------------------")
+    results = []
     for device in devices:
-        for group in esp32simwheel.PixelGroup:
-            set_pixel(device, group, device.pixel_index[group])
-            # print(f"GRP: {group} IDX: {device.pixel_index[group]}")
-        next_index(device)
-        device.pixel_show()
-    if frame_limit_time>0.0:
-        time.sleep(frame_limit_time)
+        result = benchmark(device, backend, fps, args.duration)
+        print_result(result)
+        results.append(result)
+    if args.json:
+        export_json(results, args.json)
+        print(f"Saved to {args.json}")
+    if args.csv:
+        export_csv(results, args.csv)
+        print(f"Saved to {args.csv}")
+
+
+def run_alloc(backend, calls):
+    print("-----------------------------")
+    print("Pixel control allocations")
+    print(f"{calls} calls to pixel_set()")
+    print("-----------------------------")
+    for device in pixel_control_enumerate(_NullWriteBackend(backend)):
+        peak, retained = measure_allocations(device, calls)
+        print(f"Device: '{device.product_name}' ({device.path})")
+        print(f"  Allocated per call: {peak:.1f} bytes (peak)")
+        print(f"  Retained after all calls: {retained} bytes")
+
+
+###############################################################################
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pixel control test and benchmark")
+    parser.add_argument(
+        "fps",
+        nargs="?",
+        type=int,
+        default=pixels.DEFAULT_FPS,
+        help="Frame rate limit (0 = as fast as the devices allow)",
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Run a benchmark on each device"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Benchmark time per device"
+    )
+    parser.add_argument(
+        "--alloc", action="store_true", help="Trace allocations in pixel_set()"
+    )
+    parser.add_argument(
+        "--calls", type=int, default=10000, help="Calls to pixel_set() (--alloc)"
+    )
+    parser.add_argument("--json", metavar="FILE", help="Export results as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="Export results as CSV")
+    parser.add_argument(
+        "--fake", metavar="N", type=int, default=0, help="Use N emulated devices"
+    )
+    parser.add_argument(
+        "--latency",
+        metavar="MS",
+        type=float,
+        default=0.0,
+        help="Latency of every report in emulated devices",
+    )
+    args = parser.parse_args()
+
+    # Note: zero means "as fast as the devices allow"
+    fps = args.fps
+    if fps < 0:
+        fps = pixels.DEFAULT_FPS
+
+    if args.fake > 0:
+        backend = fake_hid.FakeBackend(
+            [
+                fake_hid.FakeDeviceSpec(path=f"fake://{i}".encode(), device_id=i + 1)
+                for i in range(args.fake)
+            ],
+            latency=args.latency / 1000,
+        )
+    else:
+        backend = hid
+
+    if args.alloc:
+        run_alloc(backend, args.calls)
+        sys.exit(0)
+
+    backend = _TimedBackend(backend)
+
+    devices = list(pixel_control_enumerate(backend))
+    if len(devices) == 0:
+        print("No devices found")
+        sys.exit(0)
+
+    if args.benchmark:
+        run_benchmark(devices, backend, fps, args)
+    else:
+        run_test(devices, fps)
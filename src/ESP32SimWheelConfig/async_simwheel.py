@@ -0,0 +1,241 @@
+# ****************************************************************************
+# @file async_simwheel.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Asyncio interface to ESP32 open sim wheel devices
+
+Each device runs its HID traffic on a dedicated I/O thread,
+so awaiting device operations never stalls the event loop.
+
+Classes:
+
+    AsyncSimWheel
+
+Functions:
+
+    enumerate()
+"""
+
+###############################################################################
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+if __package__:
+    from . import esp32simwheel
+else:
+    import esp32simwheel
+
+###############################################################################
+
+
+class AsyncSimWheel:
+    """Awaitable counterpart of an ESP32 open-source sim wheel or button box."""
+
+    def __init__(self, device: esp32simwheel.SimWheel):
+        """Wrap a sim wheel.
+
+        Args:
+            device (SimWheel): Device to wrap. Other threads and wrappers may
+            use it, too (each HID exchange is serialized by the device itself),
+            but only operations requested through this wrapper run in order.
+        """
+        self.__device = device
+        self.__executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="SimWheelIO"
+        )
+
+    @property
+    def device(self) -> esp32simwheel.SimWheel:
+        """Wrapped device."""
+        return self.__device
+
+    @property
+    def path(self) -> str:
+        """OS path to this device."""
+        return self.__device.path
+
+    @property
+    def vid(self) -> int:
+        """Current Vendor ID."""
+        return self.__device.vid
+
+    @property
+    def pid(self) -> int:
+        """Current Product ID."""
+        return self.__device.pid
+
+    async def run(self, function, *args, **kwargs):
+        """Run a blocking function on the I/O thread of this device.
+
+        Returns:
+            Whatever the function returns.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def get(self, name: str):
+        """Get the value of a SimWheel property, for example "bite_point"."""
+        return await self.run(getattr, self.__device, name)
+
+    async def set(self, name: str, value):
+        """Set the value of a SimWheel property, for example "bite_point"."""
+        await self.run(setattr, self.__device, name, value)
+
+    async def close(self):
+        """Close HID connection and release the I/O thread."""
+        await self.run(self.__device.close)
+        self.__executor.shutdown(wait=False)
+
+    async def release(self):
+        """Release the I/O thread, leaving the device open (for shared devices)."""
+        await self.run(lambda: None)
+        self.__executor.shutdown(wait=False)
+
+    async def attach(self, device: esp32simwheel.SimWheel):
+        """Wrap another device.
+
+        Operations already requested on the previous device are completed first.
+        """
+        await self.run(self.__set_device, device)
+
+    def __set_device(self, device: esp32simwheel.SimWheel):
+        self.__device = device
+
+    async def is_alive(self) -> bool:
+        """Returns True if this device is still connected."""
+        return await self.get("is_alive")
+
+    async def save_now(self):
+        """Save all user settings to the device's internal flash memory."""
+        await self.run(self.__device.save_now)
+
+    async def recalibrate_analog_axes(self):
+        """Force auto-calibration of analog clutch paddles (if available)."""
+        await self.run(self.__device.recalibrate_analog_axes)
+
+    async def recalibrate_battery(self):
+        """Force auto-calibration of battery's state of charge (if available)."""
+        await self.run(self.__device.recalibrate_battery)
+
+    async def reverse_left_axis(self):
+        """Reverse the polarity of the left analog axis."""
+        await self.run(self.__device.reverse_left_axis)
+
+    async def reverse_right_axis(self):
+        """Reverse the polarity of the right analog axis."""
+        await self.run(self.__device.reverse_right_axis)
+
+    async def reset_buttons_map(self):
+        """Return user-defined buttons map to factory defaults."""
+        await self.run(self.__device.reset_buttons_map)
+
+    async def get_button_map(self, raw_input_number: int) -> dict:
+        """Returns a user-defined button mapping. See SimWheel.get_button_map()."""
+        return await self.run(self.__device.get_button_map, raw_input_number)
+
+    async def set_button_map_tuple(self, tuple_or_list_or_dict):
+        """Sets an user-defined button mapping. See SimWheel.set_button_map_tuple()."""
+        await self.run(self.__device.set_button_map_tuple, tuple_or_list_or_dict)
+
+    async def enumerate_buttons_map(self, rescan: bool = False):
+        """Enumerates all available firmware-defined button numbers and their current user-defined map.
+
+        See SimWheel.enumerate_buttons_map().
+
+        Yields:
+            dict: A user-defined button mapping.
+        """
+        iterator = self.__device.enumerate_buttons_map(rescan)
+        end = object()
+        while True:
+            btn_map = await self.run(next, iterator, end)
+            if btn_map is end:
+                return
+            yield btn_map
+
+    async def set_custom_hardware_id(self, vid: int, pid: int):
+        """Force a custom hardware ID after next reboot (BLE only)."""
+        await self.run(self.__device.set_custom_hardware_id, vid, pid)
+
+    async def reset_custom_hardware_id(self):
+        """Reset custom hardware ID to factory defaults after next reboot."""
+        await self.run(self.__device.reset_custom_hardware_id)
+
+    async def serialize(self, all: bool = False) -> dict:
+        """Returns a dictionary containing current device settings. See SimWheel.serialize()."""
+        return await self.run(self.__device.serialize, all)
+
+    async def deserialize(self, source: dict, only_changes: bool = False) -> dict:
+        """Updates device user settings from the given dictionary. See SimWheel.deserialize()."""
+        return await self.run(self.__device.deserialize, source, only_changes)
+
+    async def pixel_set(
+        self,
+        group: esp32simwheel.PixelGroup,
+        index: int,
+        red: int,
+        green: int,
+        blue: int,
+    ):
+        """Set pixel color in a group."""
+        await self.run(self.__device.pixel_set, group, index, red, green, blue)
+
+    async def pixel_show(self):
+        """Show all pixels (in all groups) at once."""
+        await self.run(self.__device.pixel_show)
+
+    async def pixel_reset(self):
+        """Turn off all pixels (in all groups) at once."""
+        await self.run(self.__device.pixel_reset)
+
+
+###############################################################################
+
+
+async def enumerate(
+    configurable_only: bool = True,
+    probe_cache: esp32simwheel.ProbeCache | None = None,
+    max_workers: int = 1,
+    backend=None,
+    registry: esp32simwheel.SimWheelRegistry | None = None,
+):
+    """Retrieve all connected ESP32 open-source sim wheels or button boxes.
+
+    Same as esp32simwheel.enumerate(), but devices are probed
+    on a dedicated thread. If a registry is given, its shared devices
+    are retrieved instead (probe_cache and backend are ignored).
+    Use AsyncSimWheel.release() instead of close() on shared devices.
+
+    Yields:
+        AsyncSimWheel: A connected ESP32 open-source sim wheel or button box.
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="SimWheelEnumerate"
+    ) as executor:
+        if registry is None:
+            iterator = esp32simwheel.enumerate(
+                configurable_only, probe_cache, max_workers, backend
+            )
+        else:
+            iterator = registry.enumerate(configurable_only, max_workers)
+        end = object()
+        try:
+            while True:
+                sim_wheel = await loop.run_in_executor(executor, next, iterator, end)
+                if sim_wheel is end:
+                    return
+                yield AsyncSimWheel(sim_wheel)
+        finally:
+            await loop.run_in_executor(executor, iterator.close)
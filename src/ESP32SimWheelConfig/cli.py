@@ -0,0 +1,480 @@
+# ****************************************************************************
+# @file cli.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Command-line interface (no graphical user interface)
+
+Usage:
+
+    python -m ESP32SimWheelConfig.cli [--json] [--fake N] COMMAND ...
+
+Commands:
+
+    list                        List connected devices.
+    dump [-o FILE]              Save device settings as a profile.
+    apply PROFILE               Apply a profile to one or more devices.
+    get [NAME ...]              Show device properties.
+    set NAME VALUE              Change a device setting.
+    monitor                     Show device state changes until interrupted.
+    pixels clear|fill|set ...   Control pixels.
+
+Most commands take a "--device ID" argument (hexadecimal, as shown in
+the main app). Otherwise, the first device found is used.
+
+Only "esp32simwheel" is imported at startup. Other modules are imported
+by the commands that need them, so short queries start fast.
+"""
+
+###############################################################################
+
+if __package__:
+    from . import esp32simwheel
+else:
+    import esp32simwheel
+
+import argparse
+import importlib
+import json
+import sys
+import time
+from dataclasses import asdict
+
+###############################################################################
+
+# Readable device properties
+READABLE_PROPERTIES = (
+    "is_alive",
+    "product_name",
+    "manufacturer",
+    "device_id",
+    "vid",
+    "pid",
+    "data_major_version",
+    "data_minor_version",
+    "is_read_only",
+    "has_clutch",
+    "has_analog_clutch_paddles",
+    "has_alt_buttons",
+    "has_dpad",
+    "has_battery",
+    "has_rotary_encoders",
+    "has_pixel_control",
+    "has_buttons_map",
+    "has_custom_hw_id",
+    "custom_vid",
+    "custom_pid",
+    "max_fps",
+    "battery_soc",
+    "clutch_working_mode",
+    "bite_point",
+    "alt_buttons_working_mode",
+    "dpad_working_mode",
+    "pulse_width_multiplier",
+)
+
+
+def _parse_bool(value: str) -> bool:
+    value = value.lower()
+    if value in ("1", "true", "on", "yes"):
+        return True
+    if value in ("0", "false", "off", "no"):
+        return False
+    raise ValueError(f"Not a boolean: {value}")
+
+
+def _parse_clutch_working_mode(value: str) -> esp32simwheel.ClutchPaddlesWorkingMode:
+    if value.isdigit():
+        return esp32simwheel.ClutchPaddlesWorkingMode(int(value))
+    return esp32simwheel.ClutchPaddlesWorkingMode[value.upper()]
+
+
+# Writable device settings. Key: property name. Value: parser.
+WRITABLE_PROPERTIES = {
+    "clutch_working_mode": _parse_clutch_working_mode,
+    "bite_point": int,
+    "alt_buttons_working_mode": _parse_bool,
+    "dpad_working_mode": _parse_bool,
+    "pulse_width_multiplier": int,
+}
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_NO_DEVICE = 3
+
+###############################################################################
+
+
+def _import(name: str):
+    """Import a module of this package on demand."""
+    if __package__:
+        return importlib.import_module(f".{name}", __package__)
+    return importlib.import_module(name)
+
+
+def _to_json(value):
+    """Convert property values to JSON-compatible values."""
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    if isinstance(value, esp32simwheel.ClutchPaddlesWorkingMode):
+        return value.name
+    return value
+
+
+def _output(args, value, text=None):
+    """Print a result as JSON or as text."""
+    if args.json:
+        print(json.dumps(value, default=_to_json, indent=2))
+    elif text is not None:
+        print(text)
+    else:
+        print(value)
+
+
+def _parse_device_id(value: str) -> int:
+    try:
+        return int(value, 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a device ID: {value}")
+
+
+def _parse_color(value: str) -> tuple[int, int, int]:
+    try:
+        color = int(value.lstrip("#"), 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a RRGGBB color: {value}")
+    return ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+
+
+def _parse_group(value: str) -> esp32simwheel.PixelGroup:
+    names = {
+        "telemetry": esp32simwheel.PixelGroup.GRP_TELEMETRY,
+        "backlights": esp32simwheel.PixelGroup.GRP_BACKLIGHTS,
+        "individual": esp32simwheel.PixelGroup.GRP_INDIVIDUAL,
+    }
+    if value.lower() not in names:
+        raise argparse.ArgumentTypeError(f"Not a pixel group: {value}")
+    return names[value.lower()]
+
+
+###############################################################################
+
+
+def _registry(args) -> esp32simwheel.SimWheelRegistry:
+    if args.fake > 0:
+        fake_hid = _import("fake_hid")
+        return esp32simwheel.SimWheelRegistry(
+            backend=fake_hid.FakeBackend(
+                [
+                    fake_hid.FakeDeviceSpec(
+                        path=f"fake://{i}".encode(), device_id=i + 1
+                    )
+                    for i in range(args.fake)
+                ]
+            )
+        )
+    return esp32simwheel.get_registry()
+
+
+def _devices(args, configurable_only: bool = True) -> list:
+    """Connected devices, filtered by "--device" (if any)."""
+    device_ids = getattr(args, "device", None) or []
+    return [
+        sim_wheel
+        for sim_wheel in _registry(args).enumerate(configurable_only)
+        if (len(device_ids) == 0) or (sim_wheel.device_id in device_ids)
+    ]
+
+
+def _device(args, configurable_only: bool = True):
+    """First connected device matching "--device", or None."""
+    devices = _devices(args, configurable_only)
+    if len(devices) == 0:
+        print("No devices found", file=sys.stderr)
+        return None
+    return devices[0]
+
+
+def _device_info(sim_wheel: esp32simwheel.SimWheel) -> dict:
+    return {
+        "path": sim_wheel.path,
+        "product_name": sim_wheel.product_name,
+        "manufacturer": sim_wheel.manufacturer,
+        "device_id": sim_wheel.device_id,
+        "vid": sim_wheel.vid,
+        "pid": sim_wheel.pid,
+        "data_major_version": sim_wheel.data_major_version,
+        "data_minor_version": sim_wheel.data_minor_version,
+        "is_user_configurable": sim_wheel.is_user_configurable,
+        "has_pixel_control": sim_wheel.has_pixel_control,
+    }
+
+
+###############################################################################
+
+
+def cmd_list(args) -> int:
+    devices = [
+        _device_info(sim_wheel)
+        for sim_wheel in _devices(args, configurable_only=not args.all)
+    ]
+    lines = [
+        f"{info['device_id']:>16X}  {info['vid']:04X}:{info['pid']:04X}  "
+        f"{info['product_name']} ({info['manufacturer']})  {_to_json(info['path'])}"
+        for info in devices
+    ]
+    _output(args, devices, "\n".join(lines) if lines else "No devices found")
+    return EXIT_OK
+
+
+def cmd_dump(args) -> int:
+    sim_wheel = _device(args)
+    if sim_wheel is None:
+        return EXIT_NO_DEVICE
+    if args.rescan and sim_wheel.has_buttons_map:
+        # Note: learn all valid firmware-defined button numbers again
+        for _ in sim_wheel.enumerate_buttons_map(rescan=True):
+            pass
+    # Note: same content as profiles saved by the main app
+    content = sim_wheel.serialize()
+    content["deviceID"] = sim_wheel.device_id
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps(content))
+    else:
+        print(json.dumps(content, indent=2))
+    return EXIT_OK
+
+
+def cmd_apply(args) -> int:
+    fleet = _import("fleet")
+    profile = fleet.load_profile(args.profile, not args.no_buttons_map)
+    devices = _devices(args)
+    if len(devices) == 0:
+        print("No devices found", file=sys.stderr)
+        return EXIT_NO_DEVICE
+    if not args.device:
+        devices = devices[:1]
+    results = fleet.provision_all(devices, profile, save=not args.no_save)
+    if args.json:
+        _output(args, [asdict(result) for result in results])
+    else:
+        fleet.print_results(results, sum(result.elapsed for result in results))
+    return EXIT_OK if all(result.ok for result in results) else EXIT_FAILED
+
+
+def cmd_get(args) -> int:
+    names = args.names or READABLE_PROPERTIES
+    for name in names:
+        if name not in READABLE_PROPERTIES:
+            print(f"Unknown property: {name}", file=sys.stderr)
+            return EXIT_FAILED
+    sim_wheel = _device(args, configurable_only=False)
+    if sim_wheel is None:
+        return EXIT_NO_DEVICE
+    values = {name: getattr(sim_wheel, name) for name in names}
+    if len(names) == 1:
+        _output(args, values, _to_json(values[names[0]]))
+    else:
+        _output(
+            args,
+            values,
+            "\n".join(f"{name}: {_to_json(value)}" for name, value in values.items()),
+        )
+    return EXIT_OK
+
+
+def cmd_set(args) -> int:
+    parser = WRITABLE_PROPERTIES.get(args.name)
+    if parser is None:
+        print(f"Not a writable property: {args.name}", file=sys.stderr)
+        return EXIT_FAILED
+    try:
+        value = parser(args.value)
+    except (ValueError, KeyError):
+        print(f"Invalid value for {args.name}: {args.value}", file=sys.stderr)
+        return EXIT_FAILED
+    sim_wheel = _device(args)
+    if sim_wheel is None:
+        return EXIT_NO_DEVICE
+    try:
+        setattr(sim_wheel, args.name, value)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return EXIT_FAILED
+    # Note: failed writes are not reported by the device, so read it back
+    sim_wheel.refresh()
+    if getattr(sim_wheel, args.name) != value:
+        print(f"Not written: {args.name}", file=sys.stderr)
+        return EXIT_FAILED
+    if args.save and not sim_wheel.save_now():
+        print("Not saved", file=sys.stderr)
+        return EXIT_FAILED
+    _output(args, {args.name: value}, f"{args.name}: {_to_json(value)}")
+    return EXIT_OK
+
+
+def cmd_monitor(args) -> int:
+    device_state = _import("device_state")
+    sim_wheel = _device(args, configurable_only=False)
+    if sim_wheel is None:
+        return EXIT_NO_DEVICE
+
+    def print_changes(changes: dict):
+        if args.json:
+            # Note: one JSON object per line
+            print(json.dumps(changes, default=_to_json), flush=True)
+        else:
+            for name, value in changes.items():
+                print(f"{name}: {_to_json(value)}", flush=True)
+
+    poller = device_state.DeviceStatePoller(sim_wheel)
+    poller.subscribe(print_changes)
+    try:
+        while True:
+            poller.poll()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+
+def cmd_pixels(args) -> int:
+    sim_wheel = _device(args, configurable_only=False)
+    if sim_wheel is None:
+        return EXIT_NO_DEVICE
+    if not sim_wheel.has_pixel_control:
+        print("No pixel control", file=sys.stderr)
+        return EXIT_FAILED
+    if args.action == "clear":
+        ok = sim_wheel.pixel_reset()
+    else:
+        # Note: other pixels are left as they are
+        if args.action == "fill":
+            indexes = range(sim_wheel.pixel_count(args.group))
+        elif 0 <= args.index < sim_wheel.pixel_count(args.group):
+            indexes = (args.index,)
+        else:
+            print(f"Pixel index out of range: {args.index}", file=sys.stderr)
+            return EXIT_FAILED
+        ok = all(
+            [sim_wheel.pixel_set(args.group, index, *args.color) for index in indexes]
+        )
+        ok = sim_wheel.pixel_show() and ok
+    if not ok:
+        print("Not sent", file=sys.stderr)
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+###############################################################################
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ESP32SimWheelConfig.cli",
+        description="ESP32 open-source sim wheel / button box configuration",
+    )
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    parser.add_argument(
+        "--fake", metavar="N", type=int, default=0, help="Use N emulated devices"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_device_argument(command, help="Device ID (hexadecimal)"):
+        command.add_argument(
+            "--device", metavar="ID", type=_parse_device_id, nargs="+", help=help
+        )
+
+    command = commands.add_parser("list", help="List connected devices")
+    command.add_argument(
+        "--all", action="store_true", help="Include non-configurable devices"
+    )
+    command.set_defaults(function=cmd_list)
+
+    command = commands.add_parser("dump", help="Save device settings as a profile")
+    add_device_argument(command)
+    command.add_argument("-o", "--output", metavar="FILE", help="Profile file")
+    command.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Probe all firmware-defined button numbers",
+    )
+    command.set_defaults(function=cmd_dump)
+
+    command = commands.add_parser("apply", help="Apply a profile")
+    command.add_argument("profile", help="Device profile (*.swjson)")
+    add_device_argument(command, "Device IDs (hexadecimal, default: first device)")
+    command.add_argument(
+        "--no-buttons-map",
+        action="store_true",
+        help="Ignore the buttons map in the profile",
+    )
+    command.add_argument(
+        "--no-save", action="store_true", help="Do not save to flash memory"
+    )
+    command.set_defaults(function=cmd_apply)
+
+    command = commands.add_parser("get", help="Show device properties")
+    command.add_argument(
+        "names", nargs="*", metavar="NAME", help="Property names (default: all)"
+    )
+    add_device_argument(command)
+    command.set_defaults(function=cmd_get)
+
+    command = commands.add_parser("set", help="Change a device setting")
+    command.add_argument("name", choices=tuple(WRITABLE_PROPERTIES))
+    command.add_argument("value")
+    command.add_argument(
+        "--save", action="store_true", help="Save to flash memory, too"
+    )
+    add_device_argument(command)
+    command.set_defaults(function=cmd_set)
+
+    command = commands.add_parser("monitor", help="Show device state changes")
+    command.add_argument(
+        "--interval", type=float, default=0.3, help="Polling interval in seconds"
+    )
+    add_device_argument(command)
+    command.set_defaults(function=cmd_monitor)
+
+    command = commands.add_parser("pixels", help="Control pixels")
+    actions = command.add_subparsers(dest="action", required=True)
+    action = actions.add_parser("clear", help="Turn off all pixels")
+    add_device_argument(action)
+    action = actions.add_parser("fill", help="Set all pixels in a group")
+    action.add_argument("group", type=_parse_group)
+    action.add_argument("color", type=_parse_color, metavar="RRGGBB")
+    add_device_argument(action)
+    action = actions.add_parser("set", help="Set a single pixel")
+    action.add_argument("group", type=_parse_group)
+    action.add_argument("index", type=int)
+    action.add_argument("color", type=_parse_color, metavar="RRGGBB")
+    add_device_argument(action)
+    command.set_defaults(function=cmd_pixels)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a command.
+
+    Args:
+        argv (list[str] | None, optional): Command-line arguments.
+        Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit code.
+    """
+    args = _parser().parse_args(argv)
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# ****************************************************************************
+# @file device_state.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Push-based feed of device state
+
+The device is read once per tick, no matter how many
+user interface elements depend on its state.
+Only changed values are pushed to subscribers.
+
+Classes:
+
+    DeviceStatePoller
+"""
+
+###############################################################################
+
+if __package__:
+    from . import esp32simwheel
+else:
+    import esp32simwheel
+
+###############################################################################
+
+# Device properties and their values when the device is not connected
+OFFLINE_STATE = {
+    "is_alive": False,
+    "product_name": "",
+    "is_read_only": False,
+    "has_alt_buttons": False,
+    "alt_buttons_working_mode": None,
+    "has_dpad": False,
+    "dpad_working_mode": None,
+    "has_clutch": False,
+    "has_analog_clutch_paddles": False,
+    "clutch_working_mode": None,
+    "bite_point": None,
+    "has_battery": False,
+    "battery_calibration_available": False,
+    "battery_soc": None,
+    "has_buttons_map": False,
+    "has_rotary_encoders": False,
+    "pulse_width_multiplier": 1,
+    "has_custom_hw_id": False,
+}
+
+###############################################################################
+
+
+class DeviceStatePoller:
+    """Read the state of a device once per tick and push changes to subscribers.
+
+    "is_alive" is read first. Unless the device was read recently,
+    it refreshes the configuration report snapshot,
+    so the remaining properties cost no further HID traffic.
+    """
+
+    def __init__(self, device: esp32simwheel.SimWheel, properties=None):
+        """Create a poller.
+
+        Args:
+            device (SimWheel): Device to poll.
+            properties (iterable, optional): Names of the device properties to poll.
+            Defaults to all the properties in OFFLINE_STATE.
+        """
+        if properties is None:
+            properties = OFFLINE_STATE.keys()
+        self.__device = device
+        self.__properties = [name for name in properties if name != "is_alive"]
+        self.__state = {}
+        self.__subscribers = []
+
+    @property
+    def device(self) -> esp32simwheel.SimWheel:
+        """Polled device."""
+        return self.__device
+
+    @device.setter
+    def device(self, device: esp32simwheel.SimWheel):
+        self.__device = device
+
+    @property
+    def state(self) -> dict:
+        """Last known state."""
+        return dict(self.__state)
+
+    def subscribe(self, callback):
+        """Call back with a dictionary of changed properties on every update.
+
+        Args:
+            callback (callable): A function that takes a dictionary
+            of property names and their new values.
+        """
+        self.__subscribers.append(callback)
+
+    def read(self) -> dict:
+        """Read the state of the device (blocking).
+
+        Returns:
+            dict: Current value of all polled properties.
+        """
+        values = {"is_alive": self.__device.is_alive}
+        for name in self.__properties:
+            if values["is_alive"] or (name not in OFFLINE_STATE):
+                values[name] = getattr(self.__device, name)
+            else:
+                values[name] = OFFLINE_STATE[name]
+        return values
+
+    def update(self, values: dict) -> dict:
+        """Compare with the previous state and push changes to subscribers.
+
+        Args:
+            values (dict): State as returned by read().
+
+        Returns:
+            dict: Changed properties and their new values.
+        """
+        changes = {
+            name: value
+            for name, value in values.items()
+            if (name not in self.__state) or (self.__state[name] != value)
+        }
+        self.__state.update(changes)
+        if changes:
+            for callback in self.__subscribers:
+                callback(changes)
+        return changes
+
+    def poll(self) -> dict:
+        """Read the device and push changes to subscribers (blocking).
+
+        Returns:
+            dict: Changed properties and their new values.
+        """
+        return self.update(self.read())
+
+    def reset(self):
+        """Forget the previous state, so the next update pushes all properties."""
+        self.__state = {}
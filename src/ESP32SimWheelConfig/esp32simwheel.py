@@ -14,14 +14,24 @@ Retrieve instances of connected ESP32 open sim wheel devices
 Classes:
 
     SimWheel
+    DeviceCapabilities
+    ProbeCache
+    PixelFrame
+    HidStats
+    SimWheelRegistry
 
 Enumerations:
 
     ClutchPaddlesWorkingMode
+    ConnectionState
 
 Functions:
 
     enumerate()
+    is_candidate()
+    probe()
+    enable_instrumentation()
+    get_registry()
 
 Exceptions:
 
@@ -29,8 +39,18 @@ Exceptions:
 """
 ###############################################################################
 
+import bisect
 import hid
+import json
+import os
 import struct
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
 from enum import IntEnum
 
 ###############################################################################
@@ -62,6 +82,30 @@ _REPORT30_SIZE_V1_4 = 6 + 1
 
 _MAX_REPORT_SIZE = 25
 
+# Capabilities report layout (id #2), excluding the report-ID field
+_REPORT2_FORMAT_V1_0 = struct.Struct("<HHHH")
+_REPORT2_FORMAT_V1_1 = struct.Struct("<Q")
+_REPORT2_FORMAT_V1_3 = struct.Struct("<B")
+_REPORT2_FORMAT_V1_4 = struct.Struct("<BBB")
+
+# Fixed report layouts, excluding the report-ID field
+_REPORT4_FORMAT_V1_1 = struct.Struct("<BBB")
+_REPORT5_FORMAT_V1_2 = struct.Struct("<HHH")
+_REPORT30_FORMAT_V1_4 = struct.Struct("<BBBBBB")
+
+# Field indexes in the configuration report (id #3)
+_CFG_CLUTCH_WORKING_MODE = 0
+_CFG_ALT_WORKING_MODE = 1
+_CFG_BITE_POINT = 2
+_CFG_BATTERY_SOC = 3  # read
+_CFG_SIMPLE_COMMAND = 3  # write
+_CFG_DPAD_WORKING_MODE = 4
+_CFG_SECURITY_LOCK = 5
+_CFG_PULSE_WIDTH_MULTIPLIER = 6
+
+# Default freshness window (in seconds) of configuration report snapshots
+_DEFAULT_CONFIG_TTL = 0.25
+
 # Capability flags
 _CAP_CLUTCH_BUTTON = 0  # has digital clutch paddles (switches)
 _CAP_CLUTCH_ANALOG = 1  # has analog clutch paddles (potentiometers)
@@ -85,6 +129,27 @@ _CMD_REVERSE_RIGHT_AXIS = 6
 _CMD_SHOW_PIXELS = 7
 _CMD_RESET_PIXELS = 8
 
+# Upper bounds (in milliseconds) of latency histogram buckets
+_LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+# Time (in seconds) between reopen attempts of a disconnected device.
+# Doubled after each failed attempt, up to the maximum.
+_RECONNECT_DELAY_MIN = 0.25
+_RECONNECT_DELAY_MAX = 8.0
+
+# Successful HID traffic within this time (in seconds) proves that a device
+# is still connected
+_LIVENESS_WINDOW = 1.0
+
+# Number of swallowed exceptions kept by HidStats
+_MAX_RECENT_EXCEPTIONS = 20
+
+# True if new HID traffic is instrumented
+_instrumentation_enabled = False
+
+# Report codecs. Key: data minor version
+_report_codecs = {}
+
 ###############################################################################
 
 
@@ -130,235 +195,1113 @@ class PixelGroup(IntEnum):
 ###############################################################################
 
 
+class ConnectionState(IntEnum):
+    """State of the HID connection to a device.
+
+    CONNECTED    : Open, and no HID traffic has failed since
+    SUSPECT      : Closed after a failure. The next access reopens at once.
+    DISCONNECTED : Closed. Reopen attempts are spaced by an exponential backoff.
+    """
+
+    CONNECTED = 0
+    SUSPECT = 1
+    DISCONNECTED = 2
+
+
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """Device capabilities, which never change while the device is connected.
+
+    Attributes:
+
+        data_major_version : Major version of the data interchange specification.
+        data_minor_version : Minor version of the data interchange specification.
+        flags : Capability flags as a bit field.
+        device_id : Unique device identifier (zero if not available).
+        max_fps : Maximum frames per second in pixel control (zero if not available).
+        pixel_count : Number of pixels in each pixel group.
+        custom_hw_id : True if a custom hardware ID can be set.
+    """
+
+    data_major_version: int = 0
+    data_minor_version: int = 0
+    flags: int = 0
+    device_id: int = 0
+    max_fps: int = 0
+    pixel_count: tuple[int, int, int] = (0, 0, 0)
+    custom_hw_id: bool = False
+
+    def _has(self, mask: int) -> bool:
+        return bool(mask & self.flags)
+
+    @property
+    def has_buttons_map(self) -> bool:
+        """True if user-defined button maps are supported."""
+        return self.data_minor_version >= 1
+
+    @property
+    def has_clutch(self) -> bool:
+        """True if there are clutch paddles (any kind)."""
+        return self._has((1 << _CAP_CLUTCH_ANALOG) | (1 << _CAP_CLUTCH_BUTTON))
+
+    @property
+    def has_analog_clutch_paddles(self) -> bool:
+        """True if there are analog clutch paddles."""
+        return self._has(1 << _CAP_CLUTCH_ANALOG)
+
+    @property
+    def has_dpad(self) -> bool:
+        """True if there are navigational controls."""
+        return self._has(1 << _CAP_DPAD)
+
+    @property
+    def has_alt_buttons(self) -> bool:
+        """True if there are ALT buttons."""
+        return self._has(1 << _CAP_ALT)
+
+    @property
+    def has_pixel_control(self) -> bool:
+        """True if there are pixels."""
+        return any(count > 0 for count in self.pixel_count)
+
+    @property
+    def has_battery(self) -> bool:
+        """True if powered by batteries."""
+        return self._has(1 << _CAP_BATTERY)
+
+    @property
+    def has_rotary_encoders(self) -> bool:
+        """True if there are configurable rotary encoders."""
+        return self._has(1 << _CAP_ROTARY_ENCODERS)
+
+    @property
+    def battery_calibration_available(self) -> bool:
+        """True if the battery's state of charge can be auto-calibrated."""
+        return self._has(1 << _CAP_BATTERY_CALIBRATION_AVAILABLE)
+
+    @property
+    def is_user_configurable(self) -> bool:
+        """True if there is any setting available for user configuration."""
+        return (
+            self.has_buttons_map
+            or self.custom_hw_id
+            or self._has(
+                (1 << _CAP_ALT)
+                | (1 << _CAP_CLUTCH_BUTTON)
+                | (1 << _CAP_CLUTCH_ANALOG)
+                | (1 << _CAP_BATTERY_CALIBRATION_AVAILABLE)
+                | (1 << _CAP_DPAD)
+            )
+        )
+
+
+_NO_CAPABILITIES = DeviceCapabilities()
+
+
+def _decode_capabilities_report(report2: bytes) -> DeviceCapabilities | None:
+    """Decode a capabilities feature report (id #2).
+
+    Returns None if the device is not supported.
+    """
+    # Get magic number, data version and flags
+    data = _REPORT2_FORMAT_V1_0.unpack_from(report2, 1)
+    check_failed = data[0] != 48977  # Expected magic number
+    check_failed = check_failed or (
+        data[1] != _SUPPORTED_DATA_MAJOR_VERSION
+    )  # Check major version
+    check_failed = check_failed or (
+        data[2] > _SUPPORTED_DATA_MINOR_VERSION
+    )  # Check minor version
+    if check_failed:
+        return None
+    data_major_version = data[1]
+    data_minor_version = data[2]
+    flags = data[3]
+
+    # At data version 1.1, get device ID
+    if len(report2) >= _REPORT2_SIZE_V1_1:
+        data = _REPORT2_FORMAT_V1_1.unpack_from(report2, _REPORT2_SIZE_V1_0)
+        device_id = data[0]
+    else:
+        device_id = 0
+
+    # At data version 1.3, get max FPS
+    if len(report2) >= _REPORT2_SIZE_V1_3:
+        data = _REPORT2_FORMAT_V1_3.unpack_from(report2, _REPORT2_SIZE_V1_1)
+        max_fps = data[0]
+    else:
+        max_fps = 0
+
+    # At data version 1.4, get pixel count
+    if len(report2) >= _REPORT2_SIZE_V1_4:
+        pixel_count = _REPORT2_FORMAT_V1_4.unpack_from(report2, _REPORT2_SIZE_V1_3)
+    else:
+        pixel_count = (0, 0, 0)
+
+    return DeviceCapabilities(
+        data_major_version=data_major_version,
+        data_minor_version=data_minor_version,
+        flags=flags,
+        device_id=device_id,
+        max_fps=max_fps,
+        pixel_count=pixel_count,
+    )
+
+
+class _ReportCodec:
+    """Layout of HID reports for a given data version.
+
+    Formats exclude the report-ID field, which is the first byte of every report.
+    Sizes include it.
+    """
+
+    def __init__(self, data_minor_version: int):
+        if data_minor_version >= 5:
+            self.config_size = _REPORT3_SIZE_V1_5
+        elif data_minor_version >= 2:
+            self.config_size = _REPORT3_SIZE_V1_2
+        elif data_minor_version == 1:
+            self.config_size = _REPORT3_SIZE_V1_1
+        else:
+            self.config_size = _REPORT3_SIZE_V1_0
+        self.config = struct.Struct("<" + "B" * (self.config_size - 1))
+        if data_minor_version >= 1:
+            self.buttons_map = _REPORT4_FORMAT_V1_1
+        else:
+            self.buttons_map = None
+        if data_minor_version >= 2:
+            self.hardware_id = _REPORT5_FORMAT_V1_2
+        else:
+            self.hardware_id = None
+
+
+def _new_report_buffer(report_id: int, size: int) -> bytearray:
+    """Allocate a report, setting the report-ID field."""
+    buffer = bytearray(size)
+    buffer[0] = report_id
+    return buffer
+
+
+def _get_report_codec(data_minor_version: int) -> _ReportCodec:
+    """Get the (shared) report codec for a data version."""
+    codec = _report_codecs.get(data_minor_version)
+    if codec is None:
+        codec = _ReportCodec(data_minor_version)
+        _report_codecs[data_minor_version] = codec
+    return codec
+
+
+class ProbeCache:
+    """A persistent cache of device probe results.
+
+    Probing a device requires several feature reports.
+    Devices found in this cache are validated with a single
+    capabilities report instead.
+    Entries are keyed by OS path, VID and PID, and validated
+    against the device ID, data version and capabilities.
+
+    Rejected devices (HID game controllers that are not
+    ESP32 open-source sim wheels) are also remembered, keyed by
+    OS path, VID, PID and serial number, so they are not probed again
+    until disconnected.
+    """
+
+    _FORMAT_VERSION = 1
+
+    def __init__(self, filename: str | None = None, persist_rejected: bool = False):
+        """Create a probe cache and load its content from disk.
+
+        Args:
+            filename (str | None, optional): Cache file.
+            Defaults to a file in the user's cache folder.
+            persist_rejected (bool, optional): If True, rejected devices
+            are saved to disk, too. Defaults to False (this session only).
+        """
+        if filename is None:
+            filename = _default_probe_cache_filename()
+        self.__filename = filename
+        self.__persist_rejected = persist_rejected
+        self.__entries = {}
+        # Key: see _rejected_key(). Value: OS path
+        self.__rejected = {}
+        self.__modified = False
+        self.__lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def _key(path, vid: int, pid: int) -> str:
+        return f"{vid:04X}:{pid:04X}:{_path_to_str(path)}"
+
+    @staticmethod
+    def _rejected_key(device_dict: dict) -> str:
+        serial = device_dict.get("serial_number") or ""
+        key = ProbeCache._key(
+            device_dict["path"], device_dict["vendor_id"], device_dict["product_id"]
+        )
+        return f"{serial}:{key}"
+
+    @property
+    def filename(self) -> str:
+        """Cache file."""
+        return self.__filename
+
+    def load(self):
+        """Load the cache content from disk (if any)."""
+        try:
+            with open(self.__filename, "r", encoding="utf-8") as f:
+                content = json.load(f)
+            if content.get("version") != ProbeCache._FORMAT_VERSION:
+                return
+            entries = {}
+            for key, value in content["devices"].items():
+                value["pixel_count"] = tuple(value["pixel_count"])
+                entries[key] = DeviceCapabilities(**value)
+            rejected = {}
+            if self.__persist_rejected:
+                rejected = dict(content.get("rejected", {}))
+        except Exception:
+            return
+        with self.__lock:
+            self.__entries = entries
+            self.__rejected.update(rejected)
+            self.__modified = False
+
+    def save(self):
+        """Save the cache content to disk, if modified."""
+        with self.__lock:
+            if not self.__modified:
+                return
+            content = {
+                "version": ProbeCache._FORMAT_VERSION,
+                "devices": {
+                    key: asdict(value) for key, value in self.__entries.items()
+                },
+            }
+            if self.__persist_rejected:
+                content["rejected"] = {
+                    key: _path_to_str(path) for key, path in self.__rejected.items()
+                }
+            self.__modified = False
+        try:
+            os.makedirs(os.path.dirname(self.__filename), exist_ok=True)
+            aux_filename = self.__filename + ".tmp"
+            with open(aux_filename, "w", encoding="utf-8") as f:
+                json.dump(content, f)
+            os.replace(aux_filename, self.__filename)
+        except Exception:
+            pass
+
+    def get(self, path, vid: int, pid: int) -> DeviceCapabilities | None:
+        """Get the cached capabilities of a device, or None if unknown."""
+        with self.__lock:
+            return self.__entries.get(ProbeCache._key(path, vid, pid), None)
+
+    def put(self, path, vid: int, pid: int, capabilities: DeviceCapabilities):
+        """Store the capabilities of a device."""
+        key = ProbeCache._key(path, vid, pid)
+        with self.__lock:
+            if self.__entries.get(key, None) != capabilities:
+                self.__entries[key] = capabilities
+                self.__modified = True
+
+    def forget(self, path, vid: int, pid: int):
+        """Remove a device from this cache."""
+        key = ProbeCache._key(path, vid, pid)
+        with self.__lock:
+            if self.__entries.pop(key, None) is not None:
+                self.__modified = True
+
+    def clear(self):
+        """Remove all devices from this cache."""
+        with self.__lock:
+            self.__modified = (
+                self.__modified
+                or (len(self.__entries) > 0)
+                or (self.__persist_rejected and (len(self.__rejected) > 0))
+            )
+            self.__entries = {}
+            self.__rejected = {}
+
+    def is_rejected(self, device_dict: dict) -> bool:
+        """Check if a device was rejected by a previous probe.
+
+        Args:
+            device_dict (dict): Device information as given by hid.enumerate().
+        """
+        key = ProbeCache._rejected_key(device_dict)
+        with self.__lock:
+            return key in self.__rejected
+
+    def reject(self, device_dict: dict):
+        """Remember a device that is not an ESP32 open-source sim wheel.
+
+        Args:
+            device_dict (dict): Device information as given by hid.enumerate().
+        """
+        key = ProbeCache._rejected_key(device_dict)
+        with self.__lock:
+            if key not in self.__rejected:
+                self.__rejected[key] = device_dict["path"]
+                self.__modified = self.__modified or self.__persist_rejected
+
+    def forget_rejected(self, path):
+        """Probe devices rejected at the given path again (when unplugged)."""
+        path = _path_to_str(path)
+        with self.__lock:
+            for key, rejected_path in list(self.__rejected.items()):
+                if _path_to_str(rejected_path) == path:
+                    del self.__rejected[key]
+                    self.__modified = self.__modified or self.__persist_rejected
+
+    def prune_rejected(self, device_dicts):
+        """Forget rejected devices not found in the given device list.
+
+        Args:
+            device_dicts (iterable): Connected devices as given by hid.enumerate().
+        """
+        keep = {ProbeCache._rejected_key(device_dict) for device_dict in device_dicts}
+        with self.__lock:
+            for key in list(self.__rejected):
+                if key not in keep:
+                    del self.__rejected[key]
+                    self.__modified = self.__modified or self.__persist_rejected
+
+
+def _path_to_str(path) -> str:
+    """OS path to a device as a string (paths may be bytes)."""
+    if isinstance(path, bytes):
+        return path.decode("utf-8", errors="backslashreplace")
+    return path
+
+
+def _default_probe_cache_filename() -> str:
+    """Default location of the probe cache file."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(base, "ESP32SimWheelConfig", "probe_cache.json")
+
+
+###############################################################################
+
+
+class HidStats:
+    """HID traffic statistics of a single device.
+
+    Counts operations and latency per report, device opening
+    and exceptions swallowed by SimWheel.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__reports = {}
+        self.__opens = 0
+        self.__reopens = 0
+        self.__exception_count = {}
+        self.__recent_exceptions = deque(maxlen=_MAX_RECENT_EXCEPTIONS)
+        self.__start = time.time()
+
+    def record_report(self, operation: str, report_id: int, seconds: float, ok: bool):
+        """Count a report operation ("get", "send" or "write")."""
+        key = f"{operation}:{report_id}"
+        milliseconds = 1000 * seconds
+        with self.__lock:
+            entry = self.__reports.get(key)
+            if entry is None:
+                entry = {
+                    "count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "histogram": [0] * (len(_LATENCY_BUCKETS_MS) + 1),
+                }
+                self.__reports[key] = entry
+            entry["count"] += 1
+            if not ok:
+                entry["errors"] += 1
+            entry["total_ms"] += milliseconds
+            entry["max_ms"] = max(entry["max_ms"], milliseconds)
+            entry["histogram"][
+                bisect.bisect_left(_LATENCY_BUCKETS_MS, milliseconds)
+            ] += 1
+
+    def record_open(self, reopen: bool):
+        """Count an opening of the device.
+
+        Args:
+            reopen (bool): True if the device was open before.
+        """
+        with self.__lock:
+            self.__opens += 1
+            if reopen:
+                self.__reopens += 1
+
+    def record_exception(self, exception: BaseException):
+        """Count an exception swallowed by SimWheel."""
+        name = type(exception).__name__
+        where = ""
+        traceback = exception.__traceback__
+        if traceback is not None:
+            where = traceback.tb_frame.f_code.co_name
+        with self.__lock:
+            self.__exception_count[name] = self.__exception_count.get(name, 0) + 1
+            self.__recent_exceptions.append(
+                {
+                    "time": time.time(),
+                    "type": name,
+                    "message": str(exception),
+                    "where": where,
+                }
+            )
+
+    def snapshot(self) -> dict:
+        """Get a copy of all statistics as a JSON-serializable dictionary."""
+        with self.__lock:
+            reports = {}
+            for key, entry in self.__reports.items():
+                reports[key] = {
+                    "count": entry["count"],
+                    "errors": entry["errors"],
+                    "mean_ms": entry["total_ms"] / entry["count"],
+                    "max_ms": entry["max_ms"],
+                    "histogram": {
+                        (f"<={bound}ms" if bound is not None else "more"): count
+                        for bound, count in zip(
+                            (*_LATENCY_BUCKETS_MS, None), entry["histogram"]
+                        )
+                    },
+                }
+            return {
+                "since": self.__start,
+                "reports": reports,
+                "opens": self.__opens,
+                "reopens": self.__reopens,
+                "exceptions": dict(self.__exception_count),
+                "recent_exceptions": list(self.__recent_exceptions),
+            }
+
+
+def enable_instrumentation(enabled: bool = True):
+    """Enable or disable HID traffic statistics (disabled by default).
+
+    Applies to all SimWheel instances, from their next HID operation.
+    See SimWheel.stats().
+    """
+    global _instrumentation_enabled
+    _instrumentation_enabled = enabled
+
+
+def _to_button_map_tuple(tuple_or_list_or_dict) -> tuple[int, int, int] | None:
+    """Convert a user-defined button mapping to a (firmware, user, userAltMode) tuple.
+
+    Returns None if the given argument is not a button mapping.
+    """
+    if isinstance(tuple_or_list_or_dict, (tuple, list)):
+        if len(tuple_or_list_or_dict) == 3:
+            return (
+                tuple_or_list_or_dict[0],
+                tuple_or_list_or_dict[1],
+                tuple_or_list_or_dict[2],
+            )
+    elif isinstance(tuple_or_list_or_dict, dict):
+        return (
+            tuple_or_list_or_dict["firmware"],
+            tuple_or_list_or_dict["user"],
+            tuple_or_list_or_dict["userAltMode"],
+        )
+    return None
+
+
+###############################################################################
+
+
 class SimWheel:
     """A class to represent an ESP32 open-source sim wheel or button box."""
 
-    def __init__(self, path: str = "", vid: int = 0, pid: int = 0):
-        """Create a representation of an ESP32 open-source sim wheel or button box."""
-        self._hid = hid.device()
+    def __init__(
+        self,
+        path: str = "",
+        vid: int = 0,
+        pid: int = 0,
+        config_ttl: float = _DEFAULT_CONFIG_TTL,
+        probe_cache: ProbeCache | None = None,
+        backend=None,
+    ):
+        """Create a representation of an ESP32 open-source sim wheel or button box.
+
+        Args:
+            config_ttl (float, optional): Freshness window, in seconds, of the
+            configuration report snapshot. Defaults to 0.25 seconds.
+            probe_cache (ProbeCache | None, optional): Cache of probe results.
+            Defaults to None (always do a full probe).
+            backend (optional): HID backend, an object with the same "device()"
+            and "enumerate()" functions as the "hid" module.
+            Defaults to None (the "hid" module).
+        """
+        if backend is None:
+            backend = hid
+        # Note: serializes HID traffic and connection state changes,
+        # since the same instance may be shared by several threads
+        self.__lock = threading.RLock()
+        self._hid = backend.device()
         self.__path = path
         self.__is_open = False
         self.__is_sim_wheel = None
-        self.__data_minor_version = None
-        self.__data_major_version = None
-        self._capability_flags = 0
+        self.__capabilities = _NO_CAPABILITIES
+        self._set_report_codec(0)
+        # Reusable output reports
+        self.__buttons_map_buffer = _new_report_buffer(
+            _RID_BUTTONS_MAP, _REPORT4_SIZE_V1_1
+        )
+        self.__hardware_id_buffer = _new_report_buffer(
+            _RID_HARDWARE_ID, _REPORT5_SIZE_V1_2
+        )
+        self.__pixel_control_buffer = _new_report_buffer(
+            _RID_PIXEL_CONTROL_ID, _REPORT30_SIZE_V1_4
+        )
+        self.__probe_cache = probe_cache
+        self.__manufacturer = None
+        self.__product_name = None
         self.__vid = vid
         self.__pid = pid
-        self.__pixel_count = [0, 0, 0]
+        self.__config_ttl = config_ttl
+        self.__config_snapshot = None
+        self.__config_snapshot_time = 0.0
+        # Configuration batches are private to each thread
+        self.__batch = threading.local()
+        self.__buttons_map = {}
+        self.__buttons_map_complete = False
+        # Valid firmware-defined button numbers learned in this connection
+        self.__buttons_map_index = None
+        self.__open_count = 0
+        self.__stats = None
+        self.__was_open = False
+        self.__connection_state = ConnectionState.DISCONNECTED
+        self.__reconnect_delay = 0.0
+        self.__reconnect_time = 0.0
+        self.__last_traffic_time = 0.0
 
     def __del__(self):
         self.close()
 
-    def _open(self):
-        if (
-            (self.__is_sim_wheel != False)
-            and (not self.__is_open)
-            and (self.__path != "")
-        ):
+    def _get_stats(self) -> HidStats | None:
+        """Statistics of this device, or None if instrumentation is disabled."""
+        if (self.__stats is None) and _instrumentation_enabled:
+            self.__stats = HidStats()
+        return self.__stats
+
+    def _record_exception(self):
+        """Count the exception being handled, if any (when instrumented)."""
+        exception = sys.exc_info()[1]
+        if exception is not None:
+            stats = self._get_stats()
+            if stats is not None:
+                stats.record_exception(exception)
+
+    def _close_on_error(self):
+        """Close HID connection due to the exception being handled."""
+        with self.__lock:
+            self._record_exception()
+            if self.__is_open:
+                self.close()
+                self.__connection_state = ConnectionState.SUSPECT
+
+    def _hid_get_feature_report(self, report_id: int, size: int) -> bytes:
+        """Read a feature report (through instrumentation)."""
+        # Note: not "with", which allocates on every call
+        self.__lock.acquire()
+        try:
+            stats = self._get_stats()
+            if stats is None:
+                result = bytes(self._hid.get_feature_report(report_id, size))
+                self.__last_traffic_time = time.monotonic()
+                return result
+            start = time.perf_counter()
+            ok = False
             try:
-                self._hid.open_path(self.__path)
-                self.__is_open = True
-                if self.__is_sim_wheel == None:
-                    self.__is_sim_wheel = self._check_is_sim_wheel()
-            except Exception:
-                self.__is_open = False
+                result = bytes(self._hid.get_feature_report(report_id, size))
+                self.__last_traffic_time = time.monotonic()
+                ok = True
+                return result
+            finally:
+                stats.record_report("get", report_id, time.perf_counter() - start, ok)
+        finally:
+            self.__lock.release()
+
+    def _hid_send_feature_report(self, data):
+        """Write a feature report (through instrumentation)."""
+        # Note: not "with", which allocates on every call
+        self.__lock.acquire()
+        try:
+            stats = self._get_stats()
+            if stats is None:
+                result = self._hid.send_feature_report(data)
+                self.__last_traffic_time = time.monotonic()
+                return result
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = self._hid.send_feature_report(data)
+                self.__last_traffic_time = time.monotonic()
+                ok = True
+                return result
+            finally:
+                stats.record_report("send", data[0], time.perf_counter() - start, ok)
+        finally:
+            self.__lock.release()
+
+    def _hid_write(self, data):
+        """Write an output report (through instrumentation)."""
+        # Note: not "with", which allocates on every call
+        self.__lock.acquire()
+        try:
+            stats = self._get_stats()
+            if stats is None:
+                result = self._hid.write(data)
+                self.__last_traffic_time = time.monotonic()
+                return result
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = self._hid.write(data)
+                self.__last_traffic_time = time.monotonic()
+                ok = True
+                return result
+            finally:
+                stats.record_report("write", data[0], time.perf_counter() - start, ok)
+        finally:
+            self.__lock.release()
+
+    def _open(self):
+        if self.__is_open:
+            # Note: no locking in the most frequent case
+            return
+        with self.__lock:
+            if (
+                (self.__is_sim_wheel != False)
+                and (not self.__is_open)
+                and (self.__path != "")
+            ):
+                now = time.monotonic()
+                if now < self.__reconnect_time:
+                    # Backing off
+                    return
+                try:
+                    self._hid.open_path(self.__path)
+                    self.__is_open = True
+                    # Note: the firmware may have been updated while disconnected
+                    self.__buttons_map_index = None
+                    self.__open_count += 1
+                    stats = self._get_stats()
+                    if stats is not None:
+                        stats.record_open(self.__was_open)
+                    self.__was_open = True
+                    if self.__is_sim_wheel == None:
+                        self.__is_sim_wheel = self._check_is_sim_wheel()
+                        if self.__is_sim_wheel is None:
+                            # Not probed due to an I/O error (for example,
+                            # still booting): retry later
+                            reconnect_delay = self.__reconnect_delay
+                            self.close()
+                            self.__reconnect_delay = reconnect_delay
+                            self._back_off(now)
+                            return
+                    self.__connection_state = ConnectionState.CONNECTED
+                    self.__reconnect_delay = 0.0
+                except Exception:
+                    self._record_exception()
+                    self.__is_open = False
+                    self._back_off(now)
+
+    def _back_off(self, now: float):
+        """Schedule the next reopen attempt after a failed one."""
+        if self.__connection_state == ConnectionState.DISCONNECTED:
+            self.__reconnect_delay = min(
+                max(2 * self.__reconnect_delay, _RECONNECT_DELAY_MIN),
+                _RECONNECT_DELAY_MAX,
+            )
+        else:
+            self.__connection_state = ConnectionState.DISCONNECTED
+            self.__reconnect_delay = _RECONNECT_DELAY_MIN
+        self.__reconnect_time = now + self.__reconnect_delay
 
     # noinspection python:S3776
-    def _check_is_sim_wheel(self) -> bool:  # NOSONAR
-        """Determine if this device is a supported ESP32 open-source sim wheel or not."""
+    def _check_is_sim_wheel(self) -> bool | None:  # NOSONAR
+        """Determine if this device is a supported ESP32 open-source sim wheel or not.
+
+        Returns None if unknown due to an I/O error, so the device is probed again.
+        """
         # Supported data versions: 1.0, 1.1, 1.2
+        last_capabilities = self.__capabilities
         try:
             # Get "capabilities" report (ID #2)
-            report2 = bytes(
-                self._hid.get_feature_report(_RID_CAPABILITIES, _MAX_REPORT_SIZE)
-            )
+            report2 = self._hid_get_feature_report(_RID_CAPABILITIES, _MAX_REPORT_SIZE)
 
-            # Get magic number, data version and flags
-            data = struct.unpack("<HHHH", report2[1:_REPORT2_SIZE_V1_0])
-            check_failed = data[0] != 48977  # Expected magic number
-            check_failed = check_failed or (
-                data[1] != _SUPPORTED_DATA_MAJOR_VERSION
-            )  # Check major version
-            check_failed = check_failed or (
-                data[2] > _SUPPORTED_DATA_MINOR_VERSION
-            )  # Check minor version
-            if check_failed:
+            capabilities = _decode_capabilities_report(report2)
+            if capabilities is None:
+                if self.__probe_cache is not None:
+                    self.__probe_cache.forget(self.__path, self.__vid, self.__pid)
                 return False
-            self.__data_major_version = data[1]
-            self.__data_minor_version = data[2]
-            self._capability_flags = data[3]
-
-            # At data version 1.1, get device ID
-            if len(report2) >= _REPORT2_SIZE_V1_1:
-                data = struct.unpack(
-                    "<Q", report2[_REPORT2_SIZE_V1_0:_REPORT2_SIZE_V1_1]
-                )
-                self.device_id = data[0]
-            else:
-                self.device_id = 0
-
-            # At data version 1.3, get max FPS
-            if len(report2) >= _REPORT2_SIZE_V1_3:
-                data = struct.unpack(
-                    "<B", report2[_REPORT2_SIZE_V1_1:_REPORT2_SIZE_V1_3]
-                )
-                self.max_fps = data[0]
-            else:
-                self.max_fps = 0
-
-            # At data version 1.4, get pixel count
-            if len(report2) >= _REPORT2_SIZE_V1_3:
-                data = struct.unpack(
-                    "<BBB", report2[_REPORT2_SIZE_V1_3:_REPORT2_SIZE_V1_4]
-                )
-                self.__pixel_count[PixelGroup.GRP_TELEMETRY] = data[0]
-                self.__pixel_count[PixelGroup.GRP_BACKLIGHTS] = data[1]
-                self.__pixel_count[PixelGroup.GRP_INDIVIDUAL] = data[2]
+            self.__capabilities = capabilities
+            self._set_report_codec(capabilities.data_minor_version)
+
+            # Known devices need no further checks
+            if self.__probe_cache is not None:
+                cached = self.__probe_cache.get(self.__path, self.__vid, self.__pid)
+                if (cached is not None) and (
+                    replace(cached, custom_hw_id=False) == capabilities
+                ):
+                    self.__capabilities = cached
+                    return True
 
             # Confirm the "configuration" report is available
-            self._hid.get_feature_report(_RID_CONFIG, _MAX_REPORT_SIZE)
+            self._hid_get_feature_report(_RID_CONFIG, self.__codec.config_size)
 
             # At data version 1.1, confirm that additional reports are available
-            if (self.__data_major_version == 1) and (self.__data_minor_version >= 1):
-                self._hid.get_feature_report(_RID_BUTTONS_MAP, _REPORT4_SIZE_V1_1)
+            if capabilities.data_minor_version >= 1:
+                self._hid_get_feature_report(_RID_BUTTONS_MAP, _REPORT4_SIZE_V1_1)
 
             # At data version 1.2, confirm that additional reports are available
-            if (self.__data_major_version == 1) and (self.__data_minor_version >= 2):
-                self._hid.get_feature_report(_RID_HARDWARE_ID, _REPORT5_SIZE_V1_2)
-
-            # Check availability of custom hardware ID
-            if (self.__data_major_version == 1) and (self.__data_minor_version >= 2):
+            # and check availability of custom hardware ID
+            if capabilities.data_minor_version >= 2:
                 report5 = self._get_hardware_id_report()
-                self._custom_hw_id_enabled = (report5[0] != 0) or (report5[1] != 0)
-            else:
-                self._custom_hw_id_enabled = False
+                self.__capabilities = replace(
+                    capabilities, custom_hw_id=(report5[0] != 0) or (report5[1] != 0)
+                )
 
+            if self.__probe_cache is not None:
+                self.__probe_cache.put(
+                    self.__path, self.__vid, self.__pid, self.__capabilities
+                )
             return True
         except Exception:
-            return False
+            self._record_exception()
+            # Note: keep the last good descriptor, if any
+            self.__capabilities = last_capabilities
+            self._set_report_codec(last_capabilities.data_minor_version)
+            return None
+
+    def _set_report_codec(self, data_minor_version: int):
+        """Select report layouts for a data version."""
+        self.__codec = _get_report_codec(data_minor_version)
+        self.__config_buffer = _new_report_buffer(
+            _RID_CONFIG, self.__codec.config_size
+        )
 
     def _get_config_report(self):
         """Read a device configuration feature report (id #3)."""
-        report3 = bytes(self._hid.get_feature_report(_RID_CONFIG, _MAX_REPORT_SIZE))
-        if self.__data_minor_version >= 5:
-            return struct.unpack("<BBBBBBB", report3[1:_REPORT3_SIZE_V1_5])
-        elif self.__data_minor_version >= 2:
-            return struct.unpack("<BBBBBB", report3[1:_REPORT3_SIZE_V1_2])
-        elif self.__data_minor_version == 1:
-            return struct.unpack("<BBBBB", report3[1:_REPORT3_SIZE_V1_1])
-        else:
-            return struct.unpack("<BBBB", report3[1:_REPORT3_SIZE_V1_0])
+        codec = self.__codec
+        report3 = self._hid_get_feature_report(_RID_CONFIG, codec.config_size)
+        return codec.config.unpack_from(report3, 1)
 
     def _send_config_report(self, data: bytes):
         """Writes a device configuration feature report (id #3)."""
-        aux = bytearray(_REPORT3_SIZE_V1_5)
-        aux[0] = _RID_CONFIG
-        aux[1] = data[0]
-        aux[2] = data[1]
-        aux[3] = data[2]
-        aux[4] = data[3]
-        if self.__data_minor_version >= 1:
-            aux[5] = data[4]
-        if self.__data_minor_version >= 2:
-            aux[6] = data[5]
-        if self.__data_minor_version >= 5:
-            aux[7] = data[6]
-        if self.__data_minor_version >= 5:
-            self._hid.send_feature_report(aux[0:_REPORT3_SIZE_V1_5])
-        elif self.__data_minor_version >= 2:
-            self._hid.send_feature_report(aux[0:_REPORT3_SIZE_V1_2])
-        elif self.__data_minor_version == 1:
-            self._hid.send_feature_report(aux[0:_REPORT3_SIZE_V1_1])
-        elif self.__data_minor_version == 0:
-            self._hid.send_feature_report(aux[0:_REPORT3_SIZE_V1_0])
-        else:
-            raise RuntimeError("Unsupported data version")
+        codec = self.__codec
+        buffer = self.__config_buffer
+        codec.config.pack_into(buffer, 1, *data[0 : codec.config_size - 1])
+        self._hid_send_feature_report(buffer)
+
+    def _get_cached_config_report(self, refresh: bool = False):
+        """Get a snapshot of the device configuration feature report (id #3).
+
+        The report is read again from the device when the snapshot
+        is older than the freshness window or when refresh is True.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            if (
+                refresh
+                or (self.__config_snapshot is None)
+                or ((now - self.__config_snapshot_time) > self.__config_ttl)
+            ):
+                self.__config_snapshot = self._get_config_report()
+                self.__config_snapshot_time = now
+            return self.__config_snapshot
+
+    def _update_config_report(self, data: bytes):
+        """Writes a device configuration feature report (id #3) through the snapshot."""
+        with self.__lock:
+            self._send_config_report(data)
+            snapshot = self.__config_snapshot
+            if snapshot is None:
+                return
+            if (len(snapshot) > _CFG_SECURITY_LOCK) and (
+                snapshot[_CFG_SECURITY_LOCK] != 0
+            ):
+                # The device will ignore this write
+                self._invalidate_config_snapshot()
+                return
+            snapshot = list(snapshot)
+            for i in range(len(snapshot)):
+                if (i != _CFG_SIMPLE_COMMAND) and (data[i] != 0xFF):
+                    snapshot[i] = data[i]
+            self.__config_snapshot = tuple(snapshot)
+            self.__config_snapshot_time = time.monotonic()
+
+    def _invalidate_config_snapshot(self):
+        """Force the next configuration query to read report #3 again."""
+        self.__config_snapshot = None
+
+    def _invalidate_buttons_map(self):
+        """Forget the user-defined buttons map retrieved so far."""
+        self.__buttons_map = {}
+        self.__buttons_map_complete = False
+
+    def _get_current_buttons_map(self) -> dict[int, tuple[int, int]]:
+        """Get the current buttons map, reading it from the device if not known.
+
+        Returns a dictionary mapping firmware-defined button numbers
+        to user-defined button numbers (regular and alternate mode).
+        """
+        if not self.__buttons_map_complete:
+            for _ in self.enumerate_buttons_map():
+                pass
+        return dict(self.__buttons_map)
+
+    @property
+    def __pending_config(self) -> bytearray | None:
+        """Configuration fields held by the batch of the calling thread."""
+        return getattr(self.__batch, "pending_config", None)
+
+    @__pending_config.setter
+    def __pending_config(self, value: bytearray | None):
+        self.__batch.pending_config = value
 
-    def _send_simple_command(self, command: int):
-        """Send a simple command to the device."""
+    def _write_config_field(self, index: int, value: int) -> bool:
+        """Write a single field of the configuration report (id #3).
+
+        Within a batch, the field is held until the batch is committed.
+
+        Returns:
+            bool: False if the field was not written (device not available).
+        """
+        if self.__pending_config is not None:
+            self.__pending_config[index] = value
+            return True
+        if self._is_ready():
+            data = bytearray([0xFF] * 7)
+            data[index] = value
+            try:
+                self._update_config_report(data)
+                return True
+            except Exception:
+                self._close_on_error()
+        return False
+
+    def _flush_config_batch(self) -> bool:
+        """Send all pending configuration fields in a single report.
+
+        Returns:
+            bool: False if pending fields were not written (device not available).
+        """
+        data = self.__pending_config
+        if (data is None) or all(value == 0xFF for value in data):
+            return True
+        self.__pending_config = bytearray([0xFF] * 7)
+        if self._is_ready():
+            try:
+                self._update_config_report(data)
+                return True
+            except Exception:
+                self._close_on_error()
+        return False
+
+    @contextmanager
+    def batch(self):
+        """Merge configuration writes into a single configuration report.
+
+        Writes to clutch_working_mode, alt_buttons_working_mode, bite_point,
+        dpad_working_mode and pulse_width_multiplier are held until the
+        outermost batch exits. Then, they are sent all at once.
+        Queries within a batch do not reflect pending writes.
+        Pending writes are discarded if an exception is raised.
+        Simple commands (save_now() and others) send pending writes first.
+        Batches belong to the calling thread: writes from other threads
+        are neither held nor sent with this batch.
+
+        Example:
+
+            with wheel.batch():
+                wheel.clutch_working_mode = ClutchPaddlesWorkingMode.CLUTCH
+                wheel.bite_point = 127
+        """
+        if self.__pending_config is not None:
+            # Nested batch
+            yield self
+            return
+        self.__pending_config = bytearray([0xFF] * 7)
+        try:
+            yield self
+            self._flush_config_batch()
+        finally:
+            self.__pending_config = None
+
+    def _send_simple_command(self, command: int) -> bool:
+        """Send a simple command to the device.
+
+        Returns:
+            bool: False if the command (or pending writes) were not sent.
+        """
+        ok = self._flush_config_batch()
         if self._is_ready():
             try:
                 self._send_config_report(
                     bytes([0xFF, 0xFF, 0xFF, command, 0xFF, 0xFF, 0xFF])
                 )
             except Exception:
-                self.close()
+                self._close_on_error()
+                ok = False
+            # Commands may have side effects on the device configuration
+            self._invalidate_config_snapshot()
+            return ok
+        return False
 
     def _get_buttons_map_report(self):
         """Read a buttons map feature report (id #4)."""
-        if self.__data_minor_version >= 1:
-            data = bytes(
-                self._hid.get_feature_report(_RID_BUTTONS_MAP, _REPORT4_SIZE_V1_1)
-            )
-            return struct.unpack("<BBB", data[1:_REPORT4_SIZE_V1_1])
+        codec = self.__codec
+        if codec.buttons_map is not None:
+            data = self._hid_get_feature_report(_RID_BUTTONS_MAP, _REPORT4_SIZE_V1_1)
+            return codec.buttons_map.unpack_from(data, 1)
         else:
             return ()
 
-    def _send_buttons_map_report(self, data: bytes):
+    def _send_buttons_map_report(self, raw: int, user: int, user_alt: int):
         """Writes a buttons map feature report."""
-        aux = bytearray(_REPORT4_SIZE_V1_1)
-        aux[0] = _RID_BUTTONS_MAP
-        aux[1] = data[0]
-        aux[2] = data[1]
-        aux[3] = data[2]
-        self._hid.send_feature_report(aux)
-
-    def _send_pixel_control_report(self, data: bytes):
+        buffer = self.__buttons_map_buffer
+        _REPORT4_FORMAT_V1_1.pack_into(buffer, 1, raw, user, user_alt)
+        self._hid_send_feature_report(buffer)
+
+    def _send_pixel_control_report(
+        self, group: int, index: int = 0, blue: int = 0, green: int = 0, red: int = 0
+    ):
         """Writes a pixel control output report."""
-        aux = bytearray(_REPORT30_SIZE_V1_4)
-        aux[0] = _RID_PIXEL_CONTROL_ID
-        aux[1] = data[0]
-        aux[2] = data[1]
-        aux[3] = data[2]
-        aux[4] = data[3]
-        aux[5] = data[4]
-        aux[6] = data[5]
-        self._hid.write(aux)
+        buffer = self.__pixel_control_buffer
+        _REPORT30_FORMAT_V1_4.pack_into(buffer, 1, group, index, blue, green, red, 0)
+        self._hid_write(buffer)
 
     def _get_hardware_id_report(self):
         """Read a custom hardware ID feature report (id #5)."""
-        if self.__data_minor_version >= 2:
-            data = bytes(
-                self._hid.get_feature_report(_RID_HARDWARE_ID, _REPORT5_SIZE_V1_2)
-            )
-            return struct.unpack("<HHH", data[1:7])
+        codec = self.__codec
+        if codec.hardware_id is not None:
+            data = self._hid_get_feature_report(_RID_HARDWARE_ID, _REPORT5_SIZE_V1_2)
+            return codec.hardware_id.unpack_from(data, 1)
         else:
             return ()
 
-    def _send_hardware_id_report(self, data: bytes):
+    def _send_hardware_id_report(self, vid: int, pid: int, control: int):
         """Writes a custom hardware ID feature report."""
-        aux = bytearray(_REPORT5_SIZE_V1_2)
-        aux[0] = _RID_HARDWARE_ID
-        aux[1] = data[0]
-        aux[2] = data[1]
-        aux[3] = data[2]
-        aux[4] = data[3]
-        aux[5] = data[4]
-        aux[6] = data[5]
-        self._hid.send_feature_report(aux)
+        buffer = self.__hardware_id_buffer
+        _REPORT5_FORMAT_V1_2.pack_into(buffer, 1, vid, pid, control)
+        self._hid_send_feature_report(buffer)
 
     def _is_ready(self):
         """Returns True if the device is connected and ready for user configuration."""
         self._open()
         return (self.__is_sim_wheel == True) and (self.__is_open)
 
+    def _get_capabilities(self) -> DeviceCapabilities:
+        """Capabilities of a connected device, without HID traffic once probed.
+
+        A device closed due to an error is reopened (subject to backoff),
+        so its capabilities are available again as soon as it answers.
+        """
+        self._open()
+        if self.__is_open and self.__is_sim_wheel:
+            return self.__capabilities
+        return _NO_CAPABILITIES
+
+    def stats(self) -> dict | None:
+        """HID traffic statistics.
+
+        See enable_instrumentation().
+
+        Returns:
+            dict | None: Operations and latency histograms per report
+            (keyed as "get:3", "send:4", "write:30" and so on),
+            device (re)openings and swallowed exceptions.
+            None if instrumentation was never enabled for this device.
+        """
+        if self.__stats is None:
+            return None
+        return self.__stats.snapshot()
+
     def close(self):
-        """Close HID connection."""
-        try:
-            self._hid.close()
-        except Exception:
-            pass
-        self.__is_open = False
+        """Close HID connection.
+
+        The next access reopens the device at once,
+        unless it was already closed and waiting to be reopened (see reconnect()).
+        """
+        with self.__lock:
+            try:
+                self._hid.close()
+            except Exception:
+                pass
+            if self.__is_open:
+                self.__is_open = False
+                self.__connection_state = ConnectionState.DISCONNECTED
+                self.__reconnect_delay = 0.0
+                self.__reconnect_time = 0.0
+            self._invalidate_config_snapshot()
+            self._invalidate_buttons_map()
+
+    @property
+    def config_ttl(self) -> float:
+        """Freshness window, in seconds, of the configuration report snapshot.
+
+        Configuration queries within this window are served
+        without reading the configuration report again.
+        Set to zero to read the device on every query.
+        """
+        return self.__config_ttl
+
+    @config_ttl.setter
+    def config_ttl(self, value: float):
+        if value < 0:
+            raise ValueError("config_ttl must not be negative")
+        self.__config_ttl = value
 
     @property
     def is_alive(self) -> bool:
-        """Returns True if this device is still connected"""
-        self._open()
-        try:
-            self._get_config_report()
-        except Exception:
-            self.close()
-        return self.__is_open
+        """Returns True if this device is still connected.
+
+        Successful HID traffic in the last second proves that
+        the device is connected. Otherwise, the configuration report
+        snapshot is refreshed.
+        """
+        with self.__lock:
+            self._open()
+            if self.__is_open and (
+                (time.monotonic() - self.__last_traffic_time) > _LIVENESS_WINDOW
+            ):
+                try:
+                    self._get_cached_config_report(refresh=True)
+                except Exception:
+                    self._close_on_error()
+            return self.__is_open
+
+    @property
+    def connection_state(self) -> ConnectionState:
+        """State of the HID connection (no HID traffic)."""
+        return self.__connection_state
+
+    def reconnect(self):
+        """Cancel the reopen backoff, so the next access reopens the device at once.
+
+        Call when the device is known to be connected again,
+        for example, on hotplug events.
+        """
+        with self.__lock:
+            if not self.__is_open:
+                self.__reconnect_delay = 0.0
+                self.__reconnect_time = 0.0
 
     @property
     def is_sim_wheel(self) -> bool:
@@ -366,105 +1309,108 @@ class SimWheel:
         self._open()
         return bool(self.__is_sim_wheel)
 
+    @property
+    def is_rejected(self) -> bool:
+        """Returns True if this device was probed and found not to be
+        an ESP32 open-source sim wheel or button box (no HID traffic).
+
+        False if the device could not be probed, for example, if not connected
+        or due to an I/O error while probing.
+        """
+        return self.__is_sim_wheel == False
+
+    @property
+    def capabilities(self) -> DeviceCapabilities:
+        """Capabilities of this device.
+
+        All capabilities are reported as unavailable if this device
+        is not connected or not supported.
+        """
+        return self._get_capabilities()
+
     @property
     def has_buttons_map(self) -> bool:
         """Returns True if this device supports user-defined button maps."""
-        if self._is_ready():
-            return self.__data_minor_version >= 1
-        else:
-            return False
+        return self._get_capabilities().has_buttons_map
 
     @property
     def has_clutch(self) -> bool:
         """Returns True if this device has clutch paddles (any kind)."""
-        if self._is_ready():
-            return bool(
-                ((1 << _CAP_CLUTCH_ANALOG) | (1 << _CAP_CLUTCH_BUTTON))
-                & self._capability_flags
-            )
-        else:
-            return False
+        return self._get_capabilities().has_clutch
 
     @property
     def has_analog_clutch_paddles(self) -> bool:
         """Returns True if this device has analog clutch paddles."""
-        if self._is_ready():
-            return bool((1 << _CAP_CLUTCH_ANALOG) & self._capability_flags)
-        else:
-            return False
+        return self._get_capabilities().has_analog_clutch_paddles
 
     @property
     def has_dpad(self) -> bool:
         """Returns True if this device has navigational controls."""
-        if self._is_ready():
-            return bool((1 << _CAP_DPAD) & self._capability_flags)
-        else:
-            return False
+        return self._get_capabilities().has_dpad
 
     @property
     def has_alt_buttons(self) -> bool:
         """Returns True if this device has ALT buttons."""
-        if self._is_ready():
-            return bool((1 << _CAP_ALT) & self._capability_flags)
-        else:
-            return False
+        return self._get_capabilities().has_alt_buttons
 
     @property
     def has_pixel_control(self) -> bool:
         """Returns True if this device has pixels."""
-        self._open()
-        return (
-            (self.__pixel_count[PixelGroup.GRP_TELEMETRY] > 0)
-            or (self.__pixel_count[PixelGroup.GRP_BACKLIGHTS] > 0)
-            or (self.__pixel_count[PixelGroup.GRP_INDIVIDUAL] > 0)
-        )
+        return self._get_capabilities().has_pixel_control
 
     @property
     def has_battery(self) -> bool:
         """Returns True if this device is powered by batteries."""
-        if self._is_ready():
-            return bool((1 << _CAP_BATTERY) & self._capability_flags)
-        else:
-            return False
+        return self._get_capabilities().has_battery
 
     @property
     def has_rotary_encoders(self) -> bool:
         """Returns True if this device has configurable rotary encoders."""
-        if self._is_ready():
-            return bool((1 << _CAP_ROTARY_ENCODERS) & self._capability_flags)
-        else:
-            return False
+        return self._get_capabilities().has_rotary_encoders
 
     @property
     def battery_calibration_available(self) -> bool:
         """Returns True if this device is able to auto-calibrate battery's state of charge."""
-        if self._is_ready():
-            return bool(
-                (1 << _CAP_BATTERY_CALIBRATION_AVAILABLE) & self._capability_flags
-            )
-        else:
-            return False
+        return self._get_capabilities().battery_calibration_available
 
     @property
     def battery_soc(self) -> int | None:
         """Returns a percentage (0..100) of current battery charge"""
         if self._is_ready():
             try:
-                report = self._get_config_report()
-                return report[3]
+                report = self._get_cached_config_report()
+                return report[_CFG_BATTERY_SOC]
             except Exception:
-                self.close()
+                self._close_on_error()
         return None
 
     @property
     def data_major_version(self) -> int | None:
         """Major version of the data interchange specification supported by this device."""
-        return self.__data_major_version
+        if self.__is_sim_wheel:
+            return self.__capabilities.data_major_version
+        return None
 
     @property
     def data_minor_version(self) -> int | None:
         """Minor version of the data interchange specification supported by this device."""
-        return self.__data_minor_version
+        if self.__is_sim_wheel:
+            return self.__capabilities.data_minor_version
+        return None
+
+    @property
+    def device_id(self) -> int:
+        """Unique identifier of this device (zero if not available)."""
+        if self.__is_sim_wheel is None:
+            self._open()
+        return self.__capabilities.device_id
+
+    @property
+    def max_fps(self) -> int:
+        """Maximum frames per second in pixel control (zero if not available)."""
+        if self.__is_sim_wheel is None:
+            self._open()
+        return self.__capabilities.max_fps
 
     @property
     def clutch_working_mode(self) -> ClutchPaddlesWorkingMode | None:
@@ -475,10 +1421,10 @@ class SimWheel:
         """
         if self._is_ready():
             try:
-                report = self._get_config_report()
-                return ClutchPaddlesWorkingMode(report[0])
+                report = self._get_cached_config_report()
+                return ClutchPaddlesWorkingMode(report[_CFG_CLUTCH_WORKING_MODE])
             except Exception:
-                self.close()
+                self._close_on_error()
         return None
 
     @clutch_working_mode.setter
@@ -487,13 +1433,7 @@ class SimWheel:
 
         No effect if there are no clutch paddles.
         """
-        if self._is_ready():
-            try:
-                self._send_config_report(
-                    bytes([int(mode), 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF])
-                )
-            except Exception:
-                self.close()
+        self._write_config_field(_CFG_CLUTCH_WORKING_MODE, int(mode))
 
     @property
     def alt_buttons_working_mode(self) -> bool | None:
@@ -505,10 +1445,10 @@ class SimWheel:
         """
         if self._is_ready():
             try:
-                report = self._get_config_report()
-                return bool(report[1])
+                report = self._get_cached_config_report()
+                return bool(report[_CFG_ALT_WORKING_MODE])
             except Exception:
-                self.close()
+                self._close_on_error()
         return None
 
     @alt_buttons_working_mode.setter
@@ -517,13 +1457,7 @@ class SimWheel:
 
         No effect if there are no ALT buttons.
         """
-        if self._is_ready():
-            try:
-                self._send_config_report(
-                    bytes([0xFF, int(mode), 0xFF, 0xFF, 0xFF, 0xFF, 0xFF])
-                )
-            except Exception:
-                self.close()
+        self._write_config_field(_CFG_ALT_WORKING_MODE, int(mode))
 
     @property
     def bite_point(self) -> int | None:
@@ -534,10 +1468,10 @@ class SimWheel:
         """
         if self._is_ready():
             try:
-                report = self._get_config_report()
-                return report[2]
+                report = self._get_cached_config_report()
+                return report[_CFG_BITE_POINT]
             except Exception:
-                self.close()
+                self._close_on_error()
         return None
 
     @bite_point.setter
@@ -548,13 +1482,7 @@ class SimWheel:
         """
         if (value < 0) or (value > 254):
             raise ValueError("Bite point not in the range 0..254")
-        if self._is_ready():
-            try:
-                self._send_config_report(
-                    bytes([0xFF, 0xFF, value, 0xFF, 0xFF, 0xFF, 0xFF])
-                )
-            except Exception:
-                self.close()
+        self._write_config_field(_CFG_BITE_POINT, value)
 
     @property
     def dpad_working_mode(self) -> bool | None:
@@ -566,10 +1494,10 @@ class SimWheel:
         """
         if self._is_ready():
             try:
-                report = self._get_config_report()
-                return bool(report[4])
+                report = self._get_cached_config_report()
+                return bool(report[_CFG_DPAD_WORKING_MODE])
             except Exception:
-                self.close()
+                self._close_on_error()
         return None
 
     @dpad_working_mode.setter
@@ -578,13 +1506,7 @@ class SimWheel:
 
         No effect if there are no navigational controls.
         """
-        if self._is_ready():
-            try:
-                self._send_config_report(
-                    bytes([0xFF, 0xFF, 0xFF, 0xFF, int(mode), 0xFF, 0xFF])
-                )
-            except Exception:
-                self.close()
+        self._write_config_field(_CFG_DPAD_WORKING_MODE, int(mode))
 
     @property
     def vid(self) -> str:
@@ -603,17 +1525,27 @@ class SimWheel:
 
     @path.setter
     def path(self, path: str):
-        if self.__path != path:
-            self.close()
-            self.__path = path
-            self.__is_sim_wheel = None
+        with self.__lock:
+            if self.__path != path:
+                self.close()
+                self.__path = path
+                self.__is_sim_wheel = None
+                self.__was_open = False
+                self.__last_traffic_time = 0.0
+                self.__capabilities = _NO_CAPABILITIES
+                self._set_report_codec(0)
+                self.__manufacturer = None
+                self.__product_name = None
 
     @property
     def manufacturer(self) -> str:
         """Name of the manufacturer of this device."""
         self._open()
         if self.__is_open:
-            return self._hid.get_manufacturer_string()
+            if self.__manufacturer is None:
+                with self.__lock:
+                    self.__manufacturer = self._hid.get_manufacturer_string()
+            return self.__manufacturer
         else:
             return ""
 
@@ -622,51 +1554,33 @@ class SimWheel:
         """Product name of this device."""
         self._open()
         if self.__is_open:
-            return self._hid.get_product_string()
+            if self.__product_name is None:
+                with self.__lock:
+                    self.__product_name = self._hid.get_product_string()
+            return self.__product_name
         else:
             return ""
 
     @property
     def is_user_configurable(self) -> bool:
         """Returns True if this device has any setting available for user configuration."""
-        if self._is_ready():
-            return (
-                self.has_buttons_map
-                or self.has_custom_hw_id
-                or bool(
-                    (
-                        (1 << _CAP_ALT)
-                        | (1 << _CAP_CLUTCH_BUTTON)
-                        | (1 << _CAP_CLUTCH_ANALOG)
-                        | (1 << _CAP_BATTERY_CALIBRATION_AVAILABLE)
-                        | (1 << _CAP_DPAD)
-                    )
-                    & self._capability_flags
-                )
-            )
-        else:
-            return False
+        return self._get_capabilities().is_user_configurable
 
     @property
     def is_read_only(self) -> bool:
         """Security lock on this device."""
-        if self._is_ready() and (self.__data_minor_version >= 2):
+        if self._is_ready() and (self.__capabilities.data_minor_version >= 2):
             try:
-                report3 = bytes(
-                    self._hid.get_feature_report(_RID_CONFIG, _MAX_REPORT_SIZE)
-                )
-                return report3[6] != 0
+                report = self._get_cached_config_report()
+                return report[_CFG_SECURITY_LOCK] != 0
             except Exception:
-                self.close()
+                self._close_on_error()
         return False
 
     @property
     def has_custom_hw_id(self) -> bool:
         """Check if this device can set a custom hardware ID"""
-        if self._is_ready():
-            return self._custom_hw_id_enabled
-        else:
-            return False
+        return self._get_capabilities().custom_hw_id
 
     @property
     def custom_vid(self) -> int | None:
@@ -679,7 +1593,7 @@ class SimWheel:
                 report = self._get_hardware_id_report()
                 return report[0]
             except Exception:
-                self.close()
+                self._close_on_error()
         return None
 
     @property
@@ -693,31 +1607,24 @@ class SimWheel:
                 report = self._get_hardware_id_report()
                 return report[1]
             except Exception:
-                self.close()
+                self._close_on_error()
         return None
 
     @property
     def pulse_width_multiplier(self) -> int:
         """Pulse width multiplier for rotary encoders."""
-        try:
-            report = self._get_config_report()
-            if len(report) >= 7:
-                return int(report[6])
-            else:
-                return 1
-        except Exception:
-            self.close()
-            return 1
-
-    @pulse_width_multiplier.setter
-    def pulse_width_multiplier(self, value: int):
         if self._is_ready():
             try:
-                self._send_config_report(
-                    bytes([0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, int(value)])
-                )
+                report = self._get_cached_config_report()
+                if len(report) > _CFG_PULSE_WIDTH_MULTIPLIER:
+                    return int(report[_CFG_PULSE_WIDTH_MULTIPLIER])
             except Exception:
-                self.close()
+                self._close_on_error()
+        return 1
+
+    @pulse_width_multiplier.setter
+    def pulse_width_multiplier(self, value: int):
+        self._write_config_field(_CFG_PULSE_WIDTH_MULTIPLIER, int(value))
 
     def recalibrate_analog_axes(self):
         """Force auto-calibration of analog clutch paddles (if available)."""
@@ -733,10 +1640,20 @@ class SimWheel:
         No effect if this feature is not supported.
         """
         self._send_simple_command(_CMD_RESET_BUTTONS_MAP)
+        self._invalidate_buttons_map()
+
+    def save_now(self) -> bool:
+        """Save all user settings to the device's internal flash memory.
+
+        Returns:
+            bool: False if the device is not available.
+        """
+        return self._send_simple_command(_CMD_SAVE_NOW)
 
-    def save_now(self):
-        """Save all user settings to the device's internal flash memory."""
-        self._send_simple_command(_CMD_SAVE_NOW)
+    def refresh(self):
+        """Forget all settings read so far, so they are read from the device again."""
+        self._invalidate_config_snapshot()
+        self._invalidate_buttons_map()
 
     def get_button_map(self, raw_input_number: int):
         """Returns a user-defined button mapping.
@@ -759,13 +1676,15 @@ class SimWheel:
         if (raw_input_number < 0) or (raw_input_number >= 128):
             raise ValueError("raw_input_number not in the range 0..127")
         if self._is_ready():
-            if self.__data_minor_version == 0:
+            if self.__capabilities.data_minor_version == 0:
                 return {}
             try:
-                self._send_buttons_map_report(bytes([raw_input_number, 0xFF, 0xFF]))
-                report = self._get_buttons_map_report()
+                # Note: no other request in between
+                with self.__lock:
+                    self._send_buttons_map_report(raw_input_number, 0xFF, 0xFF)
+                    report = self._get_buttons_map_report()
             except Exception:
-                self.close()
+                self._close_on_error()
                 return {}
 
             if report[0] != raw_input_number:
@@ -776,6 +1695,7 @@ class SimWheel:
                 and (report[2] >= 0)
                 and (report[2] < 127)
             ):
+                self.__buttons_map[report[0]] = (report[1], report[2])
                 return {
                     "firmware": report[0],
                     "user": report[1],
@@ -788,8 +1708,11 @@ class SimWheel:
         raw_input_number: int,
         user_input_number: int,
         user_input_number_alt_mode: int,
-    ):
-        """Sets an user-defined button mapping"""
+    ) -> bool:
+        """Sets an user-defined button mapping
+
+        Returns False if not written (device not available).
+        """
         if (raw_input_number < 0) or (raw_input_number >= 128):
             raise ValueError("raw_input_number not in the range 0..127")
         if (user_input_number < 0) or (user_input_number >= 128):
@@ -799,16 +1722,17 @@ class SimWheel:
         if self._is_ready():
             try:
                 self._send_buttons_map_report(
-                    bytes(
-                        [
-                            raw_input_number,
-                            user_input_number,
-                            user_input_number_alt_mode,
-                        ]
-                    )
+                    raw_input_number, user_input_number, user_input_number_alt_mode
                 )
+                if raw_input_number in self.__buttons_map:
+                    self.__buttons_map[raw_input_number] = (
+                        user_input_number,
+                        user_input_number_alt_mode,
+                    )
+                return True
             except Exception:
-                self.close()
+                self._close_on_error()
+        return False
 
     def set_button_map_tuple(self, tuple_or_list_or_dict):
         """Sets an user-defined button mapping
@@ -821,49 +1745,59 @@ class SimWheel:
             Index 1 or key \"user\": An user-defined button number in the range from 0 to 127, inclusive.
             Index 2 or key \"userAltMode\": the same as index 1, but for alternate mode.
         """
-        if isinstance(tuple_or_list_or_dict, (tuple, list)):
-            if len(tuple_or_list_or_dict) == 3:
-                self.set_button_map(
-                    tuple_or_list_or_dict[0],
-                    tuple_or_list_or_dict[1],
-                    tuple_or_list_or_dict[2],
-                )
-        elif isinstance(tuple_or_list_or_dict, dict):
-            self.set_button_map(
-                tuple_or_list_or_dict["firmware"],
-                tuple_or_list_or_dict["user"],
-                tuple_or_list_or_dict["userAltMode"],
-            )
+        btn_map = _to_button_map_tuple(tuple_or_list_or_dict)
+        if btn_map is not None:
+            self.set_button_map(btn_map[0], btn_map[1], btn_map[2])
 
-    def enumerate_buttons_map(self):
+    def enumerate_buttons_map(self, rescan: bool = False):
         """Enumerates all available firmware-defined button numbers and their current user-defined map.
 
+        Args:
+            rescan (bool, optional): When True, all firmware-defined button numbers
+            are probed, even if the valid ones are already known. Defaults to False.
+
         Remarks:
-            May take a few seconds to run.
+            Valid firmware-defined button numbers are learned, so only those
+            are queried in later enumerations. Since the firmware may be updated
+            while the device is disconnected, they are learned again
+            every time the device is connected. So, the first enumeration
+            after connecting (or a rescan) may take a few seconds to run.
         """
-        for raw in range(128):
-            btn_map = self.get_button_map(raw)
-            if btn_map != {}:
-                yield btn_map
+        self._open()
+        known = None if rescan else self.__buttons_map_index
+        open_count = self.__open_count
+        self._invalidate_buttons_map()
+        complete = True
+        if known is None:
+            found = []
+            for raw in range(128):
+                btn_map = self.get_button_map(raw)
+                if btn_map != {}:
+                    found.append(raw)
+                    yield btn_map
+            # Note: not learned if reconnected in the meantime
+            if self.__is_open and (open_count == self.__open_count):
+                self.__buttons_map_index = tuple(found)
+        else:
+            for raw in known:
+                btn_map = self.get_button_map(raw)
+                if btn_map != {}:
+                    yield btn_map
+                else:
+                    # Outdated index: rescan next time
+                    self.__buttons_map_index = None
+                    complete = False
+        self.__buttons_map_complete = (
+            complete and self.__is_open and (open_count == self.__open_count)
+        )
 
     def reset_custom_hardware_id(self):
         """Reset custom hardware ID to factory defaults after next reboot"""
         if self._is_ready():
             try:
-                self._send_hardware_id_report(
-                    bytes(
-                        [
-                            0x00,
-                            0x00,
-                            0x00,
-                            0x00,
-                            0x96,
-                            0xAA,
-                        ]
-                    )
-                )
+                self._send_hardware_id_report(0x0000, 0x0000, 0xAA96)
             except Exception:
-                self.close()
+                self._close_on_error()
 
     def set_custom_hardware_id(self, vid: int, pid: int):
         """Force a custom hardware ID after next reboot (BLE only)
@@ -878,29 +1812,12 @@ class SimWheel:
         if self._is_ready():
             try:
                 control = (vid * pid) % 65536
-                vid_bytes = vid.to_bytes(2, byteorder="little")
-                pid_bytes = pid.to_bytes(2, byteorder="little")
-                control_bytes = control.to_bytes(2, byteorder="little")
                 # for debug: print(
                 #     f"Request for custom hardware ID: VID = {vid} PID = {pid}, control = {control} "
                 # )
-                # print(f"(bytes): VID = {vid_bytes[0]},{vid_bytes[1]}")
-                # print(f"(bytes): PID = {pid_bytes[0]},{pid_bytes[1]}")
-                # print(f"(bytes): control = {control_bytes[0]},{control_bytes[1]}")
-                self._send_hardware_id_report(
-                    bytes(
-                        [
-                            vid_bytes[0],
-                            vid_bytes[1],
-                            pid_bytes[0],
-                            pid_bytes[1],
-                            control_bytes[0],
-                            control_bytes[1],
-                        ]
-                    )
-                )
+                self._send_hardware_id_report(vid, pid, control)
             except Exception:
-                self.close()
+                self._close_on_error()
 
     def reverse_left_axis(self):
         """Reverse the polarity of the left analog axis."""
@@ -912,52 +1829,92 @@ class SimWheel:
 
     def pixel_count(self, group: PixelGroup) -> int:
         """Number of pixels in a group"""
-        return self.__pixel_count[group]
+        return self.__capabilities.pixel_count[group]
 
     def pixel_set(
         self, group: PixelGroup, index: int, red: int, green: int, blue: int
-    ) -> None:
-        """Set pixel color in a group"""
+    ) -> bool:
+        """Set pixel color in a group
+
+        Returns False if not sent (device not available or pixel out of range).
+        """
         if (
             self._is_ready()
             and (group < 3)
             and (index >= 0)
-            and (index < self.__pixel_count[group])
+            and (index < self.__capabilities.pixel_count[group])
         ):
             try:
-                self._send_pixel_control_report(
-                    bytes([group, index, blue, green, red, 0x00])
-                )
+                self._send_pixel_control_report(group, index, blue, green, red)
+                return True
             except Exception:
-                self.close()
+                self._close_on_error()
+        return False
 
-    def pixel_show(self) -> None:
-        """Show all pixels (in all groups) at once"""
-        if self._is_ready():
+    def _send_pixel_show(self):
+        """Send the command to show all pixels, depending on data version."""
+        if self.__capabilities.data_minor_version >= 6:
+            self._send_pixel_control_report(0xFF)
+        else:
+            self._send_simple_command(_CMD_SHOW_PIXELS)
+
+    def _send_pixels(self, pixels, show: bool = True) -> bool:
+        """Set many pixels, checking the device only once.
+
+        Args:
+            pixels (iterable): (group, index, red, green, blue) tuples.
+            show (bool, optional): If True, show all pixels afterwards.
+            Defaults to True.
+
+        Returns:
+            bool: True on success, False if the device is not available.
+        """
+        with self.__lock:
+            if not self._is_ready():
+                return False
             try:
-                if self.data_minor_version >= 6:
-                    self._send_pixel_control_report(
-                        bytes([0xFF, 0x00, 0x00, 0x00, 0x00, 0x00])
-                    )
-                else:
-                    self._send_simple_command(_CMD_SHOW_PIXELS)
+                for group, index, red, green, blue in pixels:
+                    self._send_pixel_control_report(group, index, blue, green, red)
+                if show:
+                    self._send_pixel_show()
+                return True
+            except Exception:
+                self._close_on_error()
+                return False
+
+    def pixel_frame(self) -> "PixelFrame":
+        """Create a frame buffer for pixel control. See PixelFrame."""
+        return PixelFrame(self)
 
+    def pixel_show(self) -> bool:
+        """Show all pixels (in all groups) at once
+
+        Returns False if not sent (device not available).
+        """
+        if self._is_ready():
+            try:
+                self._send_pixel_show()
+                return True
             except Exception:
-                self.close()
+                self._close_on_error()
+        return False
 
-    def pixel_reset(self) -> None:
-        """Turn off all pixels (in all groups) at once"""
+    def pixel_reset(self) -> bool:
+        """Turn off all pixels (in all groups) at once
+
+        Returns False if not sent (device not available).
+        """
         if self._is_ready():
             try:
-                if self.data_minor_version >= 6:
-                    self._send_pixel_control_report(
-                        bytes([0xFE, 0x00, 0x00, 0x00, 0x00, 0x00])
-                    )
+                if self.__capabilities.data_minor_version >= 6:
+                    self._send_pixel_control_report(0xFE)
+                    return True
                 else:
-                    self._send_simple_command(_CMD_RESET_PIXELS)
+                    return self._send_simple_command(_CMD_RESET_PIXELS)
 
             except Exception:
-                self.close()
+                self._close_on_error()
+        return False
 
     def serialize(self, all: bool = False) -> dict:
         """Returns a dictionary containing current device settings
@@ -996,53 +1953,549 @@ class SimWheel:
 
         return result
 
-    def deserialize(self, source: dict):
+    def deserialize(
+        self, source: dict, only_changes: bool = False, verify: bool = False
+    ) -> dict:
         """Updates device user settings from the given dictionary
 
         Args:
             source (dict): A dictionary object as returned by serialize()
+            only_changes (bool, optional): When True, settings and button mappings
+            are compared to the current ones and only those that differ are written.
+            The current buttons map is read from the device unless it was
+            completely enumerated before. Button mappings not found in the
+            current buttons map (for example, if it could not be read)
+            are written anyway. Defaults to False.
+            verify (bool, optional): When True, written settings and button
+            mappings are read back from the device. Defaults to False.
+
+        Returns:
+            dict: A summary of the changes, with the following keys:
+
+                settings : Names of the written properties.
+                buttons_map : Firmware-defined button numbers whose mapping was written.
+                unchanged : Number of settings and button mappings already in place.
+                failed_settings : Names of the properties not written
+                                  (or not verified).
+                failed_buttons_map : Firmware-defined button numbers whose mapping
+                                     was not written (or not verified).
         """
-        if "AltWorkingMode" in source:
-            self.alt_buttons_working_mode = source["AltWorkingMode"]
-        if "DpadWorkingMode" in source:
-            self.dpad_working_mode = source["DpadWorkingMode"]
-        if "Clutch" in source:
-            self.clutch_working_mode = source["Clutch"][0]
-            self.bite_point = source["Clutch"][1]
+        summary = {
+            "settings": [],
+            "buttons_map": [],
+            "unchanged": 0,
+            "failed_settings": [],
+            "failed_buttons_map": [],
+        }
+        written_settings = {}
+        written_buttons_map = {}
+
+        def write_setting(name: str, value):
+            if only_changes and (getattr(self, name) == value):
+                summary["unchanged"] += 1
+            else:
+                setattr(self, name, value)
+                written_settings[name] = value
+
+        nested = self.__pending_config is not None
+        with self.batch():
+            if "AltWorkingMode" in source:
+                write_setting("alt_buttons_working_mode", source["AltWorkingMode"])
+            if "DpadWorkingMode" in source:
+                write_setting("dpad_working_mode", source["DpadWorkingMode"])
+            if "Clutch" in source:
+                write_setting("clutch_working_mode", source["Clutch"][0])
+                write_setting("bite_point", source["Clutch"][1])
+            # Note: held writes are sent by the outermost batch
+            if nested or self._flush_config_batch():
+                summary["settings"] = list(written_settings)
+            else:
+                summary["failed_settings"] = list(written_settings)
         if "ButtonsMap" in source:
             buttons_map = source["ButtonsMap"]
             if isinstance(buttons_map, list):
+                current = self._get_current_buttons_map() if only_changes else None
                 for m in buttons_map:
-                    self.set_button_map_tuple(m)
+                    btn_map = _to_button_map_tuple(m)
+                    if btn_map is None:
+                        continue
+                    if (current is not None) and (
+                        current.get(btn_map[0]) == (btn_map[1], btn_map[2])
+                    ):
+                        summary["unchanged"] += 1
+                        continue
+                    if self.set_button_map(btn_map[0], btn_map[1], btn_map[2]):
+                        summary["buttons_map"].append(btn_map[0])
+                        written_buttons_map[btn_map[0]] = (btn_map[1], btn_map[2])
+                    else:
+                        summary["failed_buttons_map"].append(btn_map[0])
+        if verify:
+            self.refresh()
+            if not nested:
+                for name in summary["settings"]:
+                    if getattr(self, name) != written_settings[name]:
+                        summary["failed_settings"].append(name)
+            for raw, user in written_buttons_map.items():
+                btn_map = self.get_button_map(raw)
+                if (btn_map == {}) or (
+                    (btn_map["user"], btn_map["userAltMode"]) != user
+                ):
+                    summary["failed_buttons_map"].append(raw)
+            summary["settings"] = [
+                name
+                for name in summary["settings"]
+                if name not in summary["failed_settings"]
+            ]
+            summary["buttons_map"] = [
+                raw
+                for raw in summary["buttons_map"]
+                if raw not in summary["failed_buttons_map"]
+            ]
+        return summary
+
+
+###############################################################################
+
+
+class PixelFrame:
+    """Frame buffer for pixel control.
+
+    Pixel colors are kept in a compact buffer (3 bytes per pixel, RGB order).
+    On commit, only those pixels that changed since the last shown frame
+    are sent to the device, followed by a single "show" command.
+    """
+
+    def __init__(self, device: SimWheel):
+        """Create an all-black frame buffer for a device.
+
+        Args:
+            device (SimWheel): Device with pixel control.
+        """
+        self.__device = device
+        self.__pixel_count = device.capabilities.pixel_count
+        self.__offset = (
+            0,
+            3 * self.__pixel_count[0],
+            3 * (self.__pixel_count[0] + self.__pixel_count[1]),
+        )
+        self.__pending = bytearray(3 * sum(self.__pixel_count))
+        # Note: the device state is unknown until the first commit
+        self.__shown = None
+
+    @property
+    def device(self) -> SimWheel:
+        """Device this frame belongs to."""
+        return self.__device
+
+    def pixel_count(self, group: PixelGroup) -> int:
+        """Number of pixels in a group"""
+        return self.__pixel_count[group]
+
+    def set(self, group: PixelGroup, index: int, red: int, green: int, blue: int):
+        """Set pixel color in a group. Out-of-range pixels are ignored."""
+        if (0 <= group < 3) and (0 <= index < self.__pixel_count[group]):
+            offset = self.__offset[group] + 3 * index
+            pending = self.__pending
+            pending[offset] = red
+            pending[offset + 1] = green
+            pending[offset + 2] = blue
+
+    def get(self, group: PixelGroup, index: int) -> tuple[int, int, int]:
+        """Get pixel color in a group as a (red, green, blue) tuple."""
+        if not (0 <= index < self.__pixel_count[group]):
+            raise IndexError("Pixel index out of range")
+        offset = self.__offset[group] + 3 * index
+        return tuple(self.__pending[offset : offset + 3])
+
+    def fill(self, group: PixelGroup, red: int, green: int, blue: int):
+        """Set all pixels in a group to the same color."""
+        offset = self.__offset[group]
+        count = self.__pixel_count[group]
+        self.__pending[offset : offset + 3 * count] = bytes([red, green, blue]) * count
+
+    def set_group(self, group: PixelGroup, colors: bytes):
+        """Set all pixels in a group at once.
+
+        Args:
+            group (PixelGroup): Pixel group.
+            colors (bytes): Three bytes (red, green, blue) per pixel.
+            Must have the exact size.
+        """
+        size = 3 * self.__pixel_count[group]
+        if len(colors) != size:
+            raise ValueError(f"Expected {size} bytes, got {len(colors)}")
+        offset = self.__offset[group]
+        self.__pending[offset : offset + size] = colors
+
+    def clear(self):
+        """Set all pixels (in all groups) to black."""
+        self.__pending[:] = bytes(len(self.__pending))
+
+    def changes(self):
+        """Enumerate pixels that changed since the last shown frame.
+
+        Yields:
+            tuple: (group, index, red, green, blue)
+        """
+        pending = self.__pending
+        shown = self.__shown
+        if pending == shown:
+            return
+        for group in PixelGroup:
+            offset = self.__offset[group]
+            for index in range(self.__pixel_count[group]):
+                if (shown is None) or (
+                    pending[offset : offset + 3] != shown[offset : offset + 3]
+                ):
+                    yield (group, index, *pending[offset : offset + 3])
+                offset += 3
+
+    @property
+    def is_dirty(self) -> bool:
+        """True if this frame differs from the last shown frame."""
+        return self.__pending != self.__shown
+
+    def invalidate(self):
+        """Forget the last shown frame, so the next commit sends all pixels."""
+        self.__shown = None
+
+    def commit(self, show: bool = True) -> int | None:
+        """Send changed pixels to the device and show them.
+
+        Nothing is sent if there are no changes.
+
+        Args:
+            show (bool, optional): If False, changed pixels are sent
+            but not shown until show() is called. Defaults to True.
+
+        Returns:
+            int | None: Number of pixels sent, or None if the device is not available.
+        """
+        changes = list(self.changes())
+        if not changes:
+            return 0
+        if self.__device._send_pixels(changes, show):
+            self.__shown = bytearray(self.__pending)
+            return len(changes)
+        self.__shown = None
+        return None
+
+    def show(self) -> bool:
+        """Show pixels sent by a previous commit.
+
+        Returns:
+            bool: True on success, False if the device is not available.
+        """
+        return self.__device._send_pixels((), True)
+
+    def reset(self):
+        """Turn off all pixels (in all groups) at once, both here and in the device."""
+        self.clear()
+        self.__device.pixel_reset()
+        if self.__device._is_ready():
+            self.__shown = bytearray(self.__pending)
+        else:
+            self.__shown = None
 
 
 ###############################################################################
 
 
-def enumerate(configurable_only: bool = True):
+def is_candidate(device_dict: dict) -> bool:
+    """Check if a HID device may be an ESP32 open-source sim wheel or button box."""
+    return (device_dict["usage_page"] == 1) and (
+        device_dict["usage"] == _CONTROLLER_TYPE
+    )
+
+
+def probe(
+    device_dict: dict,
+    configurable_only: bool,
+    probe_cache: ProbeCache | None,
+    backend=None,
+) -> SimWheel | None:
+    """Probe a HID device.
+
+    Args:
+        device_dict (dict): Device information as given by hid.enumerate().
+        configurable_only (bool): If True, devices with no user-configurable
+        settings are rejected.
+        probe_cache (ProbeCache | None): Cache of probe results (may be None).
+        backend (optional): HID backend. Defaults to None (the "hid" module).
+
+    Returns:
+        SimWheel | None: The probed device, or None if it is not
+        a (configurable) ESP32 open-source sim wheel or button box.
+    """
+    if (probe_cache is not None) and probe_cache.is_rejected(device_dict):
+        return None
+    a_wheel = SimWheel(
+        device_dict["path"],
+        device_dict["vendor_id"],
+        device_dict["product_id"],
+        probe_cache=probe_cache,
+        backend=backend,
+    )
+    test = a_wheel.is_sim_wheel and (
+        (not configurable_only) or a_wheel.is_user_configurable
+    )
+    if test:
+        return a_wheel
+    if (probe_cache is not None) and a_wheel.is_rejected:
+        probe_cache.reject(device_dict)
+    return None
+
+
+def enumerate(
+    configurable_only: bool = True,
+    probe_cache: ProbeCache | None = None,
+    max_workers: int = 1,
+    backend=None,
+):
     """Retrieve all connected ESP32 open-source sim wheels or button boxes.
 
     Args:
         configurable_only (bool, optional):
         if True, devices with no user-configurable settings will be ignored.
         Defaults to True.
+        probe_cache (ProbeCache | None, optional):
+        Cache of probe results, saved to disk when done.
+        Defaults to None (always do a full probe).
+        max_workers (int, optional):
+        Maximum number of devices probed concurrently.
+        If greater than 1, devices are yielded in completion order,
+        as soon as each one is probed. Defaults to 1 (one after another).
+        backend (optional):
+        HID backend, an object with the same "device()" and "enumerate()"
+        functions as the "hid" module. Defaults to None (the "hid" module).
 
     Yields:
         SimWheel: A connected ESP32 open-source sim wheel or button box.
     """
-    for device_dict in hid.enumerate():
-        usage_page = device_dict["usage_page"]
-        page = device_dict["usage"]
+    if backend is None:
+        backend = hid
+    try:
+        candidates = [
+            device_dict
+            for device_dict in backend.enumerate()
+            if is_candidate(device_dict)
+        ]
+        if probe_cache is not None:
+            probe_cache.prune_rejected(candidates)
+        yield from _probe_all(
+            candidates,
+            lambda device_dict: probe(
+                device_dict, configurable_only, probe_cache, backend
+            ),
+            max_workers,
+        )
+    finally:
+        if probe_cache is not None:
+            probe_cache.save()
+
+
+def _probe_all(candidates: list[dict], probe_function, max_workers: int):
+    """Probe candidate devices, one after another or concurrently.
+
+    Yields:
+        SimWheel: Every probed device not rejected by the probe function.
+    """
+    if (max_workers <= 1) or (len(candidates) <= 1):
+        for device_dict in candidates:
+            a_wheel = probe_function(device_dict)
+            if a_wheel is not None:
+                yield a_wheel
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(candidates)),
+            thread_name_prefix="SimWheelProbe",
+        ) as executor:
+            futures = [
+                executor.submit(probe_function, device_dict)
+                for device_dict in candidates
+            ]
+            try:
+                for future in as_completed(futures):
+                    a_wheel = future.result()
+                    if a_wheel is not None:
+                        yield a_wheel
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+###############################################################################
+
+
+class SimWheelRegistry:
+    """Shared instances of probed devices, keyed by OS path.
+
+    Each device is probed once. Later requests for the same path
+    get the same SimWheel instance, with no further probing.
+    Shared instances are safe to use from several threads.
+    """
+
+    def __init__(self, probe_cache: ProbeCache | None = None, backend=None):
+        """Create an empty registry.
+
+        Args:
+            probe_cache (ProbeCache | None, optional): Cache of probe results.
+            Defaults to None (always do a full probe).
+            backend (optional): HID backend. Defaults to None (the "hid" module).
+        """
+        if backend is None:
+            backend = hid
+        self.__probe_cache = probe_cache
+        self.__backend = backend
+        self.__devices = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def probe_cache(self) -> ProbeCache | None:
+        """Cache of probe results."""
+        return self.__probe_cache
+
+    @property
+    def paths(self) -> list:
+        """OS paths of all registered devices."""
+        with self.__lock:
+            return list(self.__devices)
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__devices)
+
+    def __contains__(self, path) -> bool:
+        with self.__lock:
+            return path in self.__devices
+
+    def get(self, path) -> SimWheel | None:
+        """Get the registered device at the given path, or None if unknown."""
+        with self.__lock:
+            return self.__devices.get(path, None)
+
+    def probe(
+        self, device_dict: dict, configurable_only: bool = True
+    ) -> SimWheel | None:
+        """Get the registered device, or probe and register it if unknown.
+
+        Args:
+            device_dict (dict): Device information as given by hid.enumerate().
+            configurable_only (bool, optional): If True, devices with no
+            user-configurable settings are rejected. Defaults to True.
+
+        Returns:
+            SimWheel | None: The registered device, or None if it is not
+            a (configurable) ESP32 open-source sim wheel or button box.
+        """
         path = device_dict["path"]
-        vid = device_dict["vendor_id"]
-        pid = device_dict["product_id"]
-        if (usage_page == 1) and (page == _CONTROLLER_TYPE):
-            a_wheel = SimWheel(path, vid, pid)
-            test = a_wheel.is_sim_wheel and (
-                (not configurable_only) or a_wheel.is_user_configurable
+        a_wheel = self.get(path)
+        probe_cache = self.__probe_cache
+        if (a_wheel is None) and (probe_cache is not None):
+            if probe_cache.is_rejected(device_dict):
+                return None
+        if (
+            (a_wheel is None)
+            or (a_wheel.vid != device_dict["vendor_id"])
+            or (a_wheel.pid != device_dict["product_id"])
+        ):
+            a_wheel = SimWheel(
+                path,
+                device_dict["vendor_id"],
+                device_dict["product_id"],
+                probe_cache=self.__probe_cache,
+                backend=self.__backend,
             )
-            if test:
-                yield a_wheel
+            if not a_wheel.is_sim_wheel:
+                with self.__lock:
+                    self.__devices.pop(path, None)
+                if (probe_cache is not None) and a_wheel.is_rejected:
+                    probe_cache.reject(device_dict)
+                return None
+            with self.__lock:
+                # Note: another thread may have registered this device first
+                registered = self.__devices.get(path, None)
+                if (registered is None) or (
+                    (registered.vid, registered.pid) != (a_wheel.vid, a_wheel.pid)
+                ):
+                    self.__devices[path] = a_wheel
+                else:
+                    a_wheel = registered
+        else:
+            # Note: a probe request means that the device should be connected
+            a_wheel.reconnect()
+            if not a_wheel.is_sim_wheel:
+                return None
+        if configurable_only and not a_wheel.is_user_configurable:
+            return None
+        return a_wheel
+
+    def enumerate(self, configurable_only: bool = True, max_workers: int = 1):
+        """Retrieve all connected devices, probing only unknown ones.
+
+        Devices no longer connected are removed from this registry.
+        See enumerate() for a description of the arguments.
+
+        Yields:
+            SimWheel: A registered ESP32 open-source sim wheel or button box.
+        """
+        try:
+            candidates = [
+                device_dict
+                for device_dict in self.__backend.enumerate()
+                if is_candidate(device_dict)
+            ]
+            self.prune([device_dict["path"] for device_dict in candidates])
+            if self.__probe_cache is not None:
+                self.__probe_cache.prune_rejected(candidates)
+            yield from _probe_all(
+                candidates,
+                lambda device_dict: self.probe(device_dict, configurable_only),
+                max_workers,
+            )
+        finally:
+            if self.__probe_cache is not None:
+                self.__probe_cache.save()
+
+    def forget(self, path):
+        """Remove a device from this registry (for example, when disconnected).
+
+        The device is closed as soon as no one else is using it.
+        A device rejected at this path will be probed again.
+        """
+        with self.__lock:
+            self.__devices.pop(path, None)
+        if self.__probe_cache is not None:
+            self.__probe_cache.forget_rejected(path)
+
+    def prune(self, connected_paths):
+        """Remove all devices not in the given list of paths."""
+        connected_paths = set(connected_paths)
+        with self.__lock:
+            for path in list(self.__devices):
+                if path not in connected_paths:
+                    del self.__devices[path]
+
+    def clear(self):
+        """Remove all devices from this registry."""
+        with self.__lock:
+            self.__devices.clear()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> SimWheelRegistry:
+    """Process-wide registry of devices, shared by all user interfaces.
+
+    Created on first use, with the default probe cache.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SimWheelRegistry(ProbeCache())
+        return _registry
 
 
 ###############################################################################
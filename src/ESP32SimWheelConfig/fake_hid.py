@@ -0,0 +1,295 @@
+# ****************************************************************************
+# @file fake_hid.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+In-process fake HID backend
+
+Emulates ESP32 open-source sim wheels (data version 1.7)
+with an optional latency on every report, so the app
+can be tested with no hardware. Use it in place of the "hid" module:
+
+    backend = fake_hid.FakeBackend(latency=0.001)
+    for sim_wheel in esp32simwheel.enumerate(backend=backend):
+        ...
+
+Classes:
+
+    FakeDeviceSpec
+    FakeBackend
+    FakeDevice
+"""
+
+###############################################################################
+
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass
+
+###############################################################################
+
+_MAGIC = 48977
+_DATA_MAJOR_VERSION = 1
+_DATA_MINOR_VERSION = 7
+
+_RID_CAPABILITIES = 2
+_RID_CONFIG = 3
+_RID_BUTTONS_MAP = 4
+_RID_HARDWARE_ID = 5
+_RID_PIXEL_CONTROL_ID = 30
+
+_CMD_RESET_BUTTONS_MAP = 3
+_CMD_SHOW_PIXELS = 7
+_CMD_RESET_PIXELS = 8
+
+# Default configuration report: clutch mode, ALT mode, bite point,
+# battery SOC, DPAD mode, security lock, pulse width multiplier
+_DEFAULT_CONFIG = (0, 1, 127, 66, 1, 0, 2)
+
+###############################################################################
+
+
+@dataclass(frozen=True)
+class FakeDeviceSpec:
+    """Description of an emulated device.
+
+    Attributes:
+
+        path : OS path to the device.
+        vendor_id : Vendor ID.
+        product_id : Product ID.
+        manufacturer : Manufacturer string.
+        product : Product string.
+        device_id : Unique device identifier.
+        flags : Capability flags as a bit field.
+        max_fps : Maximum frames per second in pixel control.
+        pixel_count : Number of pixels in each pixel group.
+        input_count : Number of firmware-defined buttons (numbered from zero).
+    """
+
+    path: bytes = b"fake://0"
+    vendor_id: int = 0x1D50
+    product_id: int = 0xFFFF
+    manufacturer: str = "Fake"
+    product: str = "Fake sim wheel"
+    device_id: int = 0xFA4E0000
+    flags: int = 0b10000011111
+    max_fps: int = 50
+    pixel_count: tuple[int, int, int] = (8, 4, 2)
+    input_count: int = 24
+
+
+###############################################################################
+
+
+class FakeBackend:
+    """Replacement for the "hid" module."""
+
+    def __init__(
+        self,
+        specs: list[FakeDeviceSpec] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+    ):
+        """Create a fake HID backend.
+
+        Args:
+            specs (list[FakeDeviceSpec] | None, optional): Emulated devices.
+            Defaults to None (a single device with default attributes).
+            latency (float, optional): Time (in seconds) spent on every report.
+            Defaults to 0.0.
+            jitter (float, optional): Maximum random time (in seconds)
+            added to the latency. Defaults to 0.0.
+        """
+        if specs is None:
+            specs = [FakeDeviceSpec()]
+        self.__specs = {spec.path: spec for spec in specs}
+        self.__states = {}
+        self.latency = latency
+        self.jitter = jitter
+
+    def _state(self, path) -> "_FakeDeviceState":
+        if path not in self.__specs:
+            raise OSError("open failed")
+        if path not in self.__states:
+            self.__states[path] = _FakeDeviceState(self.__specs[path])
+        return self.__states[path]
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter > 0.0:
+            delay += random.uniform(0.0, self.jitter)
+        if delay > 0.0:
+            time.sleep(delay)
+
+    def enumerate(self, vendor_id: int = 0, product_id: int = 0) -> list[dict]:
+        """Same as hid.enumerate()."""
+        return [
+            {
+                "path": spec.path,
+                "vendor_id": spec.vendor_id,
+                "product_id": spec.product_id,
+                "serial_number": f"{spec.device_id:X}",
+                "release_number": 0,
+                "manufacturer_string": spec.manufacturer,
+                "product_string": spec.product,
+                "usage_page": 1,
+                "usage": 5,
+                "interface_number": -1,
+            }
+            for spec in self.__specs.values()
+            if ((vendor_id == 0) or (vendor_id == spec.vendor_id))
+            and ((product_id == 0) or (product_id == spec.product_id))
+        ]
+
+    def device(self) -> "FakeDevice":
+        """Same as hid.device()."""
+        return FakeDevice(self)
+
+
+###############################################################################
+
+
+class _FakeDeviceState:
+    """Internal state of an emulated device, shared by all its handles."""
+
+    def __init__(self, spec: FakeDeviceSpec):
+        self.spec = spec
+        self.lock = threading.Lock()
+        self.config = list(_DEFAULT_CONFIG)
+        self.buttons_map = {}
+        self.selected_button = 0
+        self.hardware_id = (0, 0)
+        self.pixels = [bytearray(3 * count) for count in spec.pixel_count]
+        self.shown = [bytes(buffer) for buffer in self.pixels]
+        self.frames_shown = 0
+        self.reset_buttons_map()
+
+    def reset_buttons_map(self):
+        self.buttons_map = {
+            button: (button, button + self.spec.input_count)
+            for button in range(self.spec.input_count)
+        }
+
+    def simple_command(self, command: int):
+        if command == _CMD_RESET_BUTTONS_MAP:
+            self.reset_buttons_map()
+        elif command == _CMD_SHOW_PIXELS:
+            self.show_pixels()
+        elif command == _CMD_RESET_PIXELS:
+            self.reset_pixels()
+
+    def show_pixels(self):
+        self.shown = [bytes(buffer) for buffer in self.pixels]
+        self.frames_shown += 1
+
+    def reset_pixels(self):
+        self.pixels = [bytearray(len(buffer)) for buffer in self.pixels]
+        self.show_pixels()
+
+
+class FakeDevice:
+    """Replacement for hid.device."""
+
+    def __init__(self, backend: FakeBackend):
+        self.__backend = backend
+        self.__state = None
+
+    def __check_open(self) -> _FakeDeviceState:
+        if self.__state is None:
+            raise OSError("not open")
+        return self.__state
+
+    @property
+    def state(self) -> _FakeDeviceState | None:
+        """Internal state of the emulated device (None if not open)."""
+        return self.__state
+
+    def open_path(self, path):
+        self.__state = self.__backend._state(path)
+
+    def close(self):
+        self.__state = None
+
+    def get_manufacturer_string(self) -> str:
+        return self.__check_open().spec.manufacturer
+
+    def get_product_string(self) -> str:
+        return self.__check_open().spec.product
+
+    def get_feature_report(self, report_id: int, max_length: int) -> list[int]:
+        state = self.__check_open()
+        self.__backend._delay()
+        spec = state.spec
+        with state.lock:
+            if report_id == _RID_CAPABILITIES:
+                report = struct.pack(
+                    "<BHHHHQBBBB",
+                    _RID_CAPABILITIES,
+                    _MAGIC,
+                    _DATA_MAJOR_VERSION,
+                    _DATA_MINOR_VERSION,
+                    spec.flags,
+                    spec.device_id,
+                    spec.max_fps,
+                    *spec.pixel_count,
+                )
+            elif report_id == _RID_CONFIG:
+                report = bytes([_RID_CONFIG, *state.config])
+            elif report_id == _RID_BUTTONS_MAP:
+                button = state.selected_button
+                user, user_alt = state.buttons_map.get(button, (0xFF, 0xFF))
+                report = bytes([_RID_BUTTONS_MAP, button, user, user_alt])
+            elif report_id == _RID_HARDWARE_ID:
+                report = struct.pack("<BHHH", _RID_HARDWARE_ID, *state.hardware_id, 0)
+            else:
+                raise OSError("unknown report")
+        return list(report[:max_length])
+
+    def send_feature_report(self, data) -> int:
+        state = self.__check_open()
+        self.__backend._delay()
+        data = bytes(data)
+        with state.lock:
+            if data[0] == _RID_CONFIG:
+                for index, value in enumerate(data[1:]):
+                    if index == 3:
+                        if value != 0xFF:
+                            state.simple_command(value)
+                    elif (value != 0xFF) and (index < len(state.config)):
+                        state.config[index] = value
+            elif data[0] == _RID_BUTTONS_MAP:
+                state.selected_button = data[1]
+                if (data[2] != 0xFF) and (data[1] in state.buttons_map):
+                    state.buttons_map[data[1]] = (data[2], data[3])
+            elif data[0] == _RID_HARDWARE_ID:
+                state.hardware_id = struct.unpack("<HH", data[1:5])
+            else:
+                raise OSError("unknown report")
+        return len(data)
+
+    def write(self, data) -> int:
+        state = self.__check_open()
+        self.__backend._delay()
+        data = bytes(data)
+        if data[0] != _RID_PIXEL_CONTROL_ID:
+            raise OSError("unknown report")
+        with state.lock:
+            group, index, blue, green, red = data[1:6]
+            if group == 0xFF:
+                state.show_pixels()
+            elif group == 0xFE:
+                state.reset_pixels()
+            elif (group < 3) and (index < state.spec.pixel_count[group]):
+                state.pixels[group][3 * index : 3 * index + 3] = bytes(
+                    [red, green, blue]
+                )
+        return len(data)
@@ -0,0 +1,346 @@
+# ****************************************************************************
+# @file fleet.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Apply a device profile to many devices at once (no user interface)
+
+Matching devices are provisioned concurrently. Only those settings
+and button mappings that differ from the profile are written,
+then saved to the device's flash memory.
+
+Usage:
+
+    python fleet.py PROFILE [--all | --device-id ID [ID ...] | --hardware-id VID:PID]
+                    [--workers N] [--no-buttons-map] [--no-save] [--fake N]
+
+Device IDs, VID and PID are hexadecimal numbers, as shown in the main app.
+
+Classes:
+
+    DeviceSelector
+    ProvisioningResult
+
+Functions:
+
+    load_profile()
+    provision()
+    provision_all()
+    print_results()
+"""
+
+###############################################################################
+
+if __package__:
+    from . import esp32simwheel
+    from . import fake_hid
+else:
+    import esp32simwheel
+    import fake_hid
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+###############################################################################
+
+DEFAULT_WORKERS = 4
+
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DeviceSelector:
+    """Devices a profile is applied to.
+
+    Attributes:
+
+        device_ids : Matching device IDs (empty for any).
+        vid : Matching Vendor ID (None for any).
+        pid : Matching Product ID (None for any).
+    """
+
+    device_ids: tuple[int, ...] = ()
+    vid: int | None = None
+    pid: int | None = None
+
+    def matches(self, sim_wheel: esp32simwheel.SimWheel) -> bool:
+        """Check if a device is selected."""
+        return (
+            ((len(self.device_ids) == 0) or (sim_wheel.device_id in self.device_ids))
+            and ((self.vid is None) or (sim_wheel.vid == self.vid))
+            and ((self.pid is None) or (sim_wheel.pid == self.pid))
+        )
+
+
+@dataclass
+class ProvisioningResult:
+    """Outcome of applying a profile to a single device.
+
+    Attributes:
+
+        path : OS path to the device.
+        product_name : Product name.
+        device_id : Unique device identifier.
+        ok : True if all settings were written, read back (and saved).
+        error : Reason of failure (empty if ok).
+        settings : Number of written settings.
+        buttons_map : Number of written button mappings.
+        unchanged : Number of settings and button mappings already in place.
+        failed : Number of settings and button mappings not written.
+        elapsed : Time spent on this device (in seconds).
+    """
+
+    path: str
+    product_name: str
+    device_id: int
+    ok: bool = False
+    error: str = ""
+    settings: int = 0
+    buttons_map: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+
+###############################################################################
+
+
+def load_profile(filename: str, buttons_map: bool = True) -> dict:
+    """Load a device profile (*.swjson file) saved by the main app.
+
+    Args:
+        filename (str): Profile file.
+        buttons_map (bool, optional): If False, the buttons map in the profile
+        is ignored. Defaults to True.
+
+    Returns:
+        dict: Device settings, as given by SimWheel.serialize().
+    """
+    with open(filename, "r", encoding="utf-8") as f:
+        content = json.load(f)
+    # Note: the profile is applied to other devices, too
+    content.pop("deviceID", None)
+    if not buttons_map:
+        content.pop("ButtonsMap", None)
+    return content
+
+
+def provision(
+    sim_wheel: esp32simwheel.SimWheel, profile: dict, save: bool = True
+) -> ProvisioningResult:
+    """Apply a profile to a device (blocking).
+
+    Args:
+        sim_wheel (SimWheel): Device.
+        profile (dict): Device settings, as given by load_profile().
+        save (bool, optional): If True, settings are saved to the device's
+        flash memory. Defaults to True.
+
+    Returns:
+        ProvisioningResult: Outcome.
+    """
+    path = sim_wheel.path
+    if isinstance(path, bytes):
+        path = path.decode(errors="replace")
+    result = ProvisioningResult(
+        path=path,
+        product_name=sim_wheel.product_name,
+        device_id=sim_wheel.device_id,
+    )
+    start = time.perf_counter()
+    try:
+        if not sim_wheel.is_alive:
+            result.error = "Not connected"
+        elif sim_wheel.is_read_only:
+            result.error = "Security lock"
+        else:
+            # Note: written values are read back, since failed writes
+            # are not reported by the device
+            summary = sim_wheel.deserialize(profile, only_changes=True, verify=True)
+            result.settings = len(summary["settings"])
+            result.buttons_map = len(summary["buttons_map"])
+            result.unchanged = summary["unchanged"]
+            result.failed = len(summary["failed_settings"]) + len(
+                summary["failed_buttons_map"]
+            )
+            if result.failed > 0:
+                result.error = (
+                    f"{result.failed} settings or button mappings not written"
+                )
+            elif (
+                save
+                and (result.settings + result.buttons_map > 0)
+                and not sim_wheel.save_now()
+            ):
+                result.error = "Not saved"
+            else:
+                result.ok = True
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def provision_all(
+    devices: list[esp32simwheel.SimWheel],
+    profile: dict,
+    max_workers: int = DEFAULT_WORKERS,
+    save: bool = True,
+) -> list[ProvisioningResult]:
+    """Apply a profile to many devices concurrently (blocking).
+
+    Args:
+        devices (list[SimWheel]): Devices.
+        profile (dict): Device settings, as given by load_profile().
+        max_workers (int, optional): Maximum number of devices provisioned
+        at the same time. Defaults to DEFAULT_WORKERS.
+        save (bool, optional): If True, settings are saved to the devices'
+        flash memory. Defaults to True.
+
+    Returns:
+        list[ProvisioningResult]: Outcome for each device, in the same order.
+    """
+    if len(devices) == 0:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(devices))),
+        thread_name_prefix="Provisioning",
+    ) as executor:
+        return list(
+            executor.map(
+                lambda sim_wheel: provision(sim_wheel, profile, save), devices
+            )
+        )
+
+
+def print_results(results: list[ProvisioningResult], elapsed: float):
+    """Print a table of provisioning results."""
+    print(
+        f"{'Device ID':>16}  {'Product':<24} {'Result':<8} "
+        f"{'Settings':>8} {'Buttons':>8} {'Same':>6} {'Time (ms)':>10}  Path"
+    )
+    for result in results:
+        status = "OK" if result.ok else "FAILED"
+        print(
+            f"{result.device_id:>16X}  {result.product_name[:24]:<24} {status:<8} "
+            f"{result.settings:>8} {result.buttons_map:>8} {result.unchanged:>6} "
+            f"{1000 * result.elapsed:>10.1f}  {result.path}"
+        )
+        if not result.ok:
+            print(f"{'':>18}{result.error}")
+    failed = sum(1 for result in results if not result.ok)
+    print(
+        f"{len(results)} devices, {failed} failed, "
+        f"{1000 * elapsed:.1f} ms in total"
+    )
+
+
+###############################################################################
+
+
+def _parse_hardware_id(value: str) -> tuple[int, int]:
+    try:
+        vid, pid = value.split(":")
+        return (int(vid, 16), int(pid, 16))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a VID:PID pair: {value}")
+
+
+def _parse_device_id(value: str) -> int:
+    try:
+        return int(value, 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a device ID: {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Apply a device profile to many devices at once"
+    )
+    parser.add_argument("profile", help="Device profile (*.swjson)")
+    selector_group = parser.add_mutually_exclusive_group(required=True)
+    selector_group.add_argument(
+        "--all", action="store_true", help="Select all configurable devices"
+    )
+    selector_group.add_argument(
+        "--device-id",
+        nargs="+",
+        type=_parse_device_id,
+        metavar="ID",
+        help="Select devices by device ID",
+    )
+    selector_group.add_argument(
+        "--hardware-id",
+        type=_parse_hardware_id,
+        metavar="VID:PID",
+        help="Select devices by VID and PID",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Devices provisioned at the same time",
+    )
+    parser.add_argument(
+        "--no-buttons-map",
+        action="store_true",
+        help="Ignore the buttons map in the profile",
+    )
+    parser.add_argument(
+        "--no-save", action="store_true", help="Do not save to flash memory"
+    )
+    parser.add_argument(
+        "--fake", metavar="N", type=int, default=0, help="Use N emulated devices"
+    )
+    args = parser.parse_args()
+
+    try:
+        profile = load_profile(args.profile, not args.no_buttons_map)
+    except Exception as e:
+        print(f"Unable to load {args.profile}: {e}")
+        sys.exit(2)
+
+    if args.device_id:
+        selector = DeviceSelector(device_ids=tuple(args.device_id))
+    elif args.hardware_id:
+        selector = DeviceSelector(vid=args.hardware_id[0], pid=args.hardware_id[1])
+    else:
+        selector = DeviceSelector()
+
+    if args.fake > 0:
+        registry = esp32simwheel.SimWheelRegistry(
+            backend=fake_hid.FakeBackend(
+                [
+                    fake_hid.FakeDeviceSpec(
+                        path=f"fake://{i}".encode(), device_id=i + 1
+                    )
+                    for i in range(args.fake)
+                ]
+            )
+        )
+    else:
+        registry = esp32simwheel.get_registry()
+
+    start = time.perf_counter()
+    devices = [
+        sim_wheel
+        for sim_wheel in registry.enumerate(max_workers=args.workers)
+        if selector.matches(sim_wheel)
+    ]
+    if len(devices) == 0:
+        print("No devices found")
+        sys.exit(1)
+    devices.sort(key=lambda sim_wheel: sim_wheel.device_id)
+    results = provision_all(devices, profile, args.workers, not args.no_save)
+    print_results(results, time.perf_counter() - start)
+    sys.exit(0 if all(result.ok for result in results) else 1)
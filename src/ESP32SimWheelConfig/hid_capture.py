@@ -0,0 +1,627 @@
+# ****************************************************************************
+# @file hid_capture.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Capture and deterministic replay of HID traffic
+
+CaptureBackend wraps a HID backend and records every call
+into a binary capture file. ReplayBackend plays the device responses
+back from that file, with original or scaled timing,
+so no hardware is needed. Both are used in place of the "hid" module:
+
+    with hid_capture.CaptureBackend("wheel.cap") as backend:
+        for sim_wheel in esp32simwheel.enumerate(backend=backend):
+            ...
+
+    backend = hid_capture.ReplayBackend("wheel.cap", time_scale=0.0)
+    for sim_wheel in esp32simwheel.enumerate(backend=backend):
+        ...
+
+Capture file format (little endian):
+
+    Header: magic "ESWC", format version (uint16).
+    Records: operation (uint8), handle (uint16),
+    timestamp since capture start in seconds (double),
+    call duration in seconds (float), payload length (uint32), payload.
+    The payload of a failed call is the request (if any, for example,
+    the device path), a NUL byte and the error message.
+
+Records are replayed in order for each device path, so the replayed
+application must issue the same calls to each device, in the same order,
+as the captured one. Calls to different devices may be interleaved
+in any order (for example, when probing devices concurrently).
+
+Usage:
+
+    python hid_capture.py record FILE [--fake N]
+    python hid_capture.py replay FILE [--time-scale SCALE]
+    python hid_capture.py dump FILE
+
+Classes:
+
+    CaptureBackend
+    CaptureDevice
+    ReplayBackend
+    ReplayDevice
+    CaptureRecord
+
+Functions:
+
+    read_capture()
+
+Exceptions:
+
+    ReplayError
+"""
+
+###############################################################################
+
+if __package__:
+    from . import esp32simwheel
+    from . import fake_hid
+else:
+    import esp32simwheel
+    import fake_hid
+
+import argparse
+import hid
+import json
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+
+###############################################################################
+
+_MAGIC = b"ESWC"
+_FORMAT_VERSION = 3
+_HEADER = struct.Struct("<4sH")
+# Note: enumerations may take more than 64 KiB
+_RECORD_HEADER = struct.Struct("<BHdfI")
+_GET_REQUEST = struct.Struct("<BH")
+
+# Set in the operation field when the call raised an exception
+_ERROR_FLAG = 0x80
+
+
+class _Op(IntEnum):
+    """Recorded operations."""
+
+    ENUMERATE = 1
+    OPEN = 2
+    CLOSE = 3
+    GET_FEATURE_REPORT = 4
+    SEND_FEATURE_REPORT = 5
+    WRITE = 6
+    MANUFACTURER = 7
+    PRODUCT = 8
+
+
+###############################################################################
+
+
+class ReplayError(OSError):
+    """The replayed application does not issue the captured calls.
+
+    Raised as a HID failure, so the replayed application handles it
+    as it would handle a failing device.
+    """
+
+    pass
+
+
+@dataclass(frozen=True)
+class CaptureRecord:
+    """A recorded call.
+
+    Attributes:
+
+        op : Recorded operation (a name).
+        handle : Device handle (zero for "enumerate").
+        timestamp : Time since capture start (in seconds).
+        duration : Time spent by the call (in seconds).
+        error : True if the call raised an exception.
+        payload : Operation-dependent data.
+    """
+
+    op: str
+    handle: int
+    timestamp: float
+    duration: float
+    error: bool
+    payload: bytes
+
+
+def _encode_json(value) -> bytes:
+    # Note: device paths are bytes, which JSON does not support
+    def default(obj):
+        if isinstance(obj, (bytes, bytearray)):
+            return {"__bytes__": bytes(obj).hex()}
+        raise TypeError(type(obj).__name__)
+
+    return json.dumps(value, default=default).encode()
+
+
+def _decode_json(payload: bytes):
+    def object_hook(obj):
+        if "__bytes__" in obj:
+            return bytes.fromhex(obj["__bytes__"])
+        return obj
+
+    return json.loads(payload, object_hook=object_hook)
+
+
+def _encode_path(path) -> bytes:
+    if isinstance(path, str):
+        return b"s" + path.encode()
+    return b"b" + bytes(path)
+
+
+def _decode_path(payload: bytes):
+    if payload[:1] == b"s":
+        return payload[1:].decode()
+    return payload[1:]
+
+
+def _encode_error(request: bytes, error: Exception) -> bytes:
+    return request + b"\0" + str(error).encode()
+
+
+def _split_error(payload: bytes) -> tuple[bytes, str]:
+    """Get the request and the error message of a failed call."""
+    request, _, message = payload.rpartition(b"\0")
+    return (request, message.decode(errors="replace"))
+
+
+def read_capture(filename: str) -> list[CaptureRecord]:
+    """Read all records in a capture file.
+
+    Args:
+        filename (str): Capture file.
+
+    Raises:
+        ValueError: Not a capture file.
+
+    Returns:
+        list[CaptureRecord]: Recorded calls, in capture order.
+    """
+    with open(filename, "rb") as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Not a capture file: {filename}")
+    magic, version = _HEADER.unpack_from(data)
+    if (magic != _MAGIC) or (version != _FORMAT_VERSION):
+        raise ValueError(f"Not a capture file: {filename}")
+    result = []
+    offset = _HEADER.size
+    while offset + _RECORD_HEADER.size <= len(data):
+        op, handle, timestamp, duration, length = _RECORD_HEADER.unpack_from(
+            data, offset
+        )
+        offset += _RECORD_HEADER.size
+        payload = data[offset : offset + length]
+        offset += length
+        result.append(
+            CaptureRecord(
+                op=_Op(op & ~_ERROR_FLAG).name,
+                handle=handle,
+                timestamp=timestamp,
+                duration=duration,
+                error=(op & _ERROR_FLAG) != 0,
+                payload=payload,
+            )
+        )
+    return result
+
+
+###############################################################################
+
+
+class CaptureBackend:
+    """Replacement for the "hid" module that records all traffic."""
+
+    def __init__(self, filename: str, backend=None):
+        """Start a capture.
+
+        Args:
+            filename (str): Capture file (overwritten).
+            backend (optional): Captured HID backend.
+            Defaults to None (the "hid" module).
+        """
+        if backend is None:
+            backend = hid
+        self.__backend = backend
+        self.__lock = threading.Lock()
+        self.__file = open(filename, "wb")
+        self.__file.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION))
+        self.__start = time.perf_counter()
+        self.__next_handle = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Finish the capture."""
+        with self.__lock:
+            if not self.__file.closed:
+                self.__file.close()
+
+    def _new_handle(self) -> int:
+        with self.__lock:
+            handle = self.__next_handle
+            self.__next_handle = (self.__next_handle % 0xFFFF) + 1
+            return handle
+
+    def _record(
+        self, op: _Op, handle: int, start: float, error: bool, payload: bytes = b""
+    ):
+        now = time.perf_counter()
+        header = _RECORD_HEADER.pack(
+            op | (_ERROR_FLAG if error else 0),
+            handle,
+            start - self.__start,
+            now - start,
+            len(payload),
+        )
+        with self.__lock:
+            if not self.__file.closed:
+                self.__file.write(header + payload)
+
+    def enumerate(self, vendor_id: int = 0, product_id: int = 0) -> list[dict]:
+        """Same as hid.enumerate()."""
+        start = time.perf_counter()
+        try:
+            result = self.__backend.enumerate(vendor_id, product_id)
+        except Exception as e:
+            self._record(_Op.ENUMERATE, 0, start, True, _encode_error(b"", e))
+            raise
+        self._record(_Op.ENUMERATE, 0, start, False, _encode_json(result))
+        return result
+
+    def device(self) -> "CaptureDevice":
+        """Same as hid.device()."""
+        return CaptureDevice(self, self.__backend.device(), self._new_handle())
+
+
+class CaptureDevice:
+    """Replacement for hid.device that records all traffic."""
+
+    def __init__(self, backend: CaptureBackend, device, handle: int):
+        self.__backend = backend
+        self.__device = device
+        self.__handle = handle
+        self.__is_open = False
+
+    def __call(self, op: _Op, function, args, request: bytes, response):
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+        except Exception as e:
+            self.__backend._record(
+                op, self.__handle, start, True, _encode_error(request, e)
+            )
+            raise
+        self.__backend._record(
+            op, self.__handle, start, False, request + response(result)
+        )
+        return result
+
+    def open_path(self, path):
+        # Note: the path is recorded first, so replay can match
+        # this handle with a device path
+        self.__call(
+            _Op.OPEN,
+            self.__device.open_path,
+            (path,),
+            _encode_path(path),
+            lambda result: b"",
+        )
+        self.__is_open = True
+
+    def close(self):
+        # Note: closing a device that is not open is not captured
+        if self.__is_open:
+            self.__is_open = False
+            self.__call(_Op.CLOSE, self.__device.close, (), b"", lambda result: b"")
+        else:
+            self.__device.close()
+
+    def get_manufacturer_string(self) -> str:
+        return self.__call(
+            _Op.MANUFACTURER,
+            self.__device.get_manufacturer_string,
+            (),
+            b"",
+            lambda result: (result or "").encode(),
+        )
+
+    def get_product_string(self) -> str:
+        return self.__call(
+            _Op.PRODUCT,
+            self.__device.get_product_string,
+            (),
+            b"",
+            lambda result: (result or "").encode(),
+        )
+
+    def get_feature_report(self, report_id: int, max_length: int):
+        return self.__call(
+            _Op.GET_FEATURE_REPORT,
+            self.__device.get_feature_report,
+            (report_id, max_length),
+            _GET_REQUEST.pack(report_id, max_length),
+            bytes,
+        )
+
+    def send_feature_report(self, data):
+        # Note: "data" may be a reused buffer, so it is copied before the call
+        return self.__call(
+            _Op.SEND_FEATURE_REPORT,
+            self.__device.send_feature_report,
+            (data,),
+            bytes(data),
+            lambda result: b"",
+        )
+
+    def write(self, data):
+        return self.__call(
+            _Op.WRITE,
+            self.__device.write,
+            (data,),
+            bytes(data),
+            lambda result: b"",
+        )
+
+
+###############################################################################
+
+
+class ReplayBackend:
+    """Replacement for the "hid" module that plays a capture file back."""
+
+    def __init__(self, filename: str, time_scale: float = 1.0, strict: bool = True):
+        """Load a capture file.
+
+        Args:
+            filename (str): Capture file.
+            time_scale (float, optional): Factor applied to the
+            captured duration of every call. Zero means no delays.
+            Defaults to 1.0 (original timing).
+            strict (bool, optional): If True, written reports must match
+            the captured ones. Defaults to True.
+        """
+        self.time_scale = time_scale
+        self.strict = strict
+        self.__lock = threading.Lock()
+        self.__enumerations = []
+        # Key: device path. Value: captured calls to that device, in order
+        self.__streams = {}
+        path_of = {}
+        for record in read_capture(filename):
+            if record.op == _Op.ENUMERATE.name:
+                self.__enumerations.append(record)
+            elif record.op == _Op.OPEN.name:
+                payload = record.payload
+                if record.error:
+                    payload = _split_error(payload)[0]
+                path = _decode_path(payload)
+                path_of[record.handle] = path
+                self.__streams.setdefault(path, []).append(record)
+            elif record.handle in path_of:
+                self.__streams[path_of[record.handle]].append(record)
+        self.__enumeration_index = 0
+        self.__positions = {path: 0 for path in self.__streams}
+
+    @property
+    def paths(self) -> list:
+        """Captured device paths."""
+        return list(self.__streams)
+
+    def _delay(self, record: CaptureRecord):
+        if self.time_scale > 0.0:
+            time.sleep(record.duration * self.time_scale)
+
+    def _next(self, path, op: _Op) -> CaptureRecord:
+        with self.__lock:
+            stream = self.__streams.get(path, [])
+            position = self.__positions.get(path, 0)
+            if position >= len(stream):
+                raise ReplayError(f"No more captured calls to {path!r}")
+            record = stream[position]
+            if record.op != op.name:
+                raise ReplayError(
+                    f"Expected {record.op} at {path!r}, not {op.name} "
+                    f"(call #{position})"
+                )
+            self.__positions[path] = position + 1
+        self._delay(record)
+        if record.error:
+            raise OSError(_split_error(record.payload)[1])
+        return record
+
+    def enumerate(self, vendor_id: int = 0, product_id: int = 0) -> list[dict]:
+        """Same as hid.enumerate().
+
+        The captured results are returned in order.
+        The last one is repeated when there are no more.
+        """
+        with self.__lock:
+            if len(self.__enumerations) == 0:
+                return []
+            index = min(self.__enumeration_index, len(self.__enumerations) - 1)
+            self.__enumeration_index += 1
+        record = self.__enumerations[index]
+        self._delay(record)
+        if record.error:
+            raise OSError(_split_error(record.payload)[1])
+        return [
+            device_dict
+            for device_dict in _decode_json(record.payload)
+            if ((vendor_id == 0) or (vendor_id == device_dict["vendor_id"]))
+            and ((product_id == 0) or (product_id == device_dict["product_id"]))
+        ]
+
+    def device(self) -> "ReplayDevice":
+        """Same as hid.device()."""
+        return ReplayDevice(self)
+
+    def rewind(self):
+        """Play the capture file back from the beginning."""
+        with self.__lock:
+            self.__enumeration_index = 0
+            self.__positions = {path: 0 for path in self.__streams}
+
+    def remaining(self) -> int:
+        """Number of captured calls not played back yet (excluding enumerate)."""
+        with self.__lock:
+            return sum(
+                len(stream) - self.__positions[path]
+                for path, stream in self.__streams.items()
+            )
+
+
+class ReplayDevice:
+    """Replacement for hid.device that plays a capture file back."""
+
+    def __init__(self, backend: ReplayBackend):
+        self.__backend = backend
+        self.__path = None
+
+    def __next(self, op: _Op) -> CaptureRecord:
+        if self.__path is None:
+            raise OSError("not open")
+        return self.__backend._next(self.__path, op)
+
+    def __check_written(self, record: CaptureRecord, data):
+        if self.__backend.strict and (record.payload != bytes(data)):
+            raise ReplayError(
+                f"Written report {bytes(data).hex()} does not match "
+                f"captured report {record.payload.hex()} at {self.__path!r}"
+            )
+
+    def open_path(self, path):
+        self.__path = path
+        try:
+            self.__next(_Op.OPEN)
+        except OSError:
+            self.__path = None
+            raise
+
+    def close(self):
+        if self.__path is not None:
+            try:
+                self.__next(_Op.CLOSE)
+            finally:
+                self.__path = None
+
+    def get_manufacturer_string(self) -> str:
+        return self.__next(_Op.MANUFACTURER).payload.decode()
+
+    def get_product_string(self) -> str:
+        return self.__next(_Op.PRODUCT).payload.decode()
+
+    def get_feature_report(self, report_id: int, max_length: int) -> list[int]:
+        record = self.__next(_Op.GET_FEATURE_REPORT)
+        request = _GET_REQUEST.pack(report_id, max_length)
+        if record.payload[: _GET_REQUEST.size] != request:
+            raise ReplayError(
+                f"Requested report {report_id} ({max_length} bytes) "
+                f"does not match the captured request at {self.__path!r}"
+            )
+        return list(record.payload[_GET_REQUEST.size :])
+
+    def send_feature_report(self, data) -> int:
+        record = self.__next(_Op.SEND_FEATURE_REPORT)
+        self.__check_written(record, data)
+        return len(data)
+
+    def write(self, data) -> int:
+        record = self.__next(_Op.WRITE)
+        self.__check_written(record, data)
+        return len(data)
+
+
+###############################################################################
+
+
+def _workload(backend) -> dict:
+    """Run the captured/replayed operations and time them (in seconds)."""
+    timings = {}
+    start = time.perf_counter()
+    devices = list(esp32simwheel.enumerate(configurable_only=False, backend=backend))
+    timings["enumerate"] = time.perf_counter() - start
+    for device in devices:
+        start = time.perf_counter()
+        device.serialize(all=True)
+        timings[f"{device.path!r} serialize"] = time.perf_counter() - start
+        if device.has_buttons_map:
+            start = time.perf_counter()
+            list(device.enumerate_buttons_map(rescan=True))
+            timings[f"{device.path!r} buttons map"] = time.perf_counter() - start
+        device.close()
+    return timings
+
+
+def _print_timings(timings: dict):
+    for name, seconds in timings.items():
+        print(f"  {name}: {1000 * seconds:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HID traffic capture and replay")
+    parser.add_argument("mode", choices=("record", "replay", "dump"))
+    parser.add_argument("file", help="Capture file")
+    parser.add_argument(
+        "--fake", metavar="N", type=int, default=0, help="Record N emulated devices"
+    )
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="Factor applied to captured timing (replay, 0 = no delays)",
+    )
+    args = parser.parse_args()
+
+    if args.mode == "dump":
+        for record in read_capture(args.file):
+            if record.error:
+                request, message = _split_error(record.payload)
+                details = f"(error) {request[:32].hex()} {message}"
+            else:
+                details = record.payload[:32].hex()
+            print(
+                f"{record.timestamp:12.6f} {1000 * record.duration:9.3f} ms "
+                f"#{record.handle:<5} {record.op} {details}"
+            )
+    elif args.mode == "record":
+        captured = None
+        if args.fake > 0:
+            captured = fake_hid.FakeBackend(
+                [
+                    fake_hid.FakeDeviceSpec(
+                        path=f"fake://{i}".encode(), device_id=i + 1
+                    )
+                    for i in range(args.fake)
+                ]
+            )
+        with CaptureBackend(args.file, captured) as backend:
+            timings = _workload(backend)
+        print(f"Captured to {args.file}")
+        _print_timings(timings)
+    else:
+        backend = ReplayBackend(args.file, time_scale=args.time_scale)
+        timings = _workload(backend)
+        print(f"Replayed {args.file} (time scale {args.time_scale})")
+        _print_timings(timings)
+        print(f"Calls not replayed: {backend.remaining()}")
@@ -0,0 +1,238 @@
+# ****************************************************************************
+# @file hotplug.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Detection of connected and disconnected HID devices
+
+Successive snapshots of the HID device list are compared
+in order to tell which devices were added or removed.
+In Linux, the HID device list is not retrieved again
+unless "/dev/hidraw*" files are created or deleted.
+Other systems fall back to polling.
+
+Classes:
+
+    HotplugEvent
+    HotplugMonitor
+"""
+
+###############################################################################
+
+import hid
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+if __package__:
+    from . import esp32simwheel
+else:
+    import esp32simwheel
+
+###############################################################################
+
+# Time (in seconds) to keep on polling after a file system event,
+# since device files may not be ready at once.
+_SETTLE_TIME = 2.0
+
+###############################################################################
+
+
+@dataclass(frozen=True)
+class HotplugEvent:
+    """A HID device was added or removed.
+
+    Attributes:
+
+        added : True if the device was added, False if removed.
+        device_dict : Device information as given by hid.enumerate().
+    """
+
+    added: bool
+    device_dict: dict
+
+    @property
+    def path(self):
+        """OS path to the device."""
+        return self.device_dict["path"]
+
+
+###############################################################################
+
+
+class _HidrawWatcher:
+    """Watch for creation and deletion of "/dev/hidraw*" files (Linux only)."""
+
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_NONBLOCK = 0o00004000
+    _IN_CLOEXEC = 0o02000000
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = libc.inotify_init1(
+            _HidrawWatcher._IN_NONBLOCK | _HidrawWatcher._IN_CLOEXEC
+        )
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _HidrawWatcher._IN_CREATE | _HidrawWatcher._IN_DELETE
+        if libc.inotify_add_watch(fd, b"/dev", mask) < 0:
+            os.close(fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        self.__fd = fd
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for events. Returns True if any "hidraw" file was created or deleted."""
+        readable, _, _ = select.select([self.__fd], [], [], timeout)
+        if not readable:
+            return False
+        result = False
+        try:
+            while True:
+                buffer = os.read(self.__fd, 4096)
+                offset = 0
+                while offset < len(buffer):
+                    _, _, _, length = _HidrawWatcher._EVENT_HEADER.unpack_from(
+                        buffer, offset
+                    )
+                    offset += _HidrawWatcher._EVENT_HEADER.size
+                    name = buffer[offset : offset + length].rstrip(b"\0")
+                    offset += length
+                    result = result or name.startswith(b"hidraw")
+        except BlockingIOError:
+            pass
+        return result
+
+    def close(self):
+        os.close(self.__fd)
+
+
+###############################################################################
+
+
+class HotplugMonitor:
+    """Report HID devices as they are connected or disconnected."""
+
+    def __init__(self, candidates_only: bool = True, report_existing: bool = False):
+        """Create a hotplug monitor.
+
+        Args:
+            candidates_only (bool, optional): If True, ignore HID devices that
+            can not be an ESP32 open-source sim wheel or button box.
+            Defaults to True.
+            report_existing (bool, optional): If True, the first poll reports
+            all connected devices as added. Defaults to False.
+        """
+        self.__candidates_only = candidates_only
+        self.__settle_deadline = 0.0
+        self.__thread = None
+        self.__stop = threading.Event()
+        self.__watcher = None
+        if sys.platform.startswith("linux"):
+            try:
+                self.__watcher = _HidrawWatcher()
+            except Exception:
+                self.__watcher = None
+        # Note: watch before taking the first snapshot, so no event is missed
+        self.__known = None if report_existing else self._snapshot()
+
+    @property
+    def uses_file_system_events(self) -> bool:
+        """True if file system events are used instead of polling."""
+        return self.__watcher is not None
+
+    def _snapshot(self) -> dict:
+        return {
+            device_dict["path"]: device_dict
+            for device_dict in hid.enumerate()
+            if (not self.__candidates_only) or esp32simwheel.is_candidate(device_dict)
+        }
+
+    def resync(self):
+        """Take the current device list as known, without reporting any change."""
+        self.__known = self._snapshot()
+
+    def poll(self, timeout: float = 0.0) -> list[HotplugEvent]:
+        """Get changes since the last poll.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for a file system
+            event, in seconds. Ignored when polling. Defaults to 0.0 (do not wait).
+
+        Returns:
+            list[HotplugEvent]: Added and removed devices (may be empty).
+        """
+        if (self.__watcher is not None) and (self.__known is not None):
+            if self.__watcher.wait(timeout):
+                self.__settle_deadline = time.monotonic() + _SETTLE_TIME
+            elif time.monotonic() > self.__settle_deadline:
+                return []
+        current = self._snapshot()
+        known = self.__known if self.__known is not None else {}
+        events = [
+            HotplugEvent(False, device_dict)
+            for path, device_dict in known.items()
+            if path not in current
+        ]
+        events.extend(
+            HotplugEvent(True, device_dict)
+            for path, device_dict in current.items()
+            if path not in known
+        )
+        self.__known = current
+        return events
+
+    def start(self, callback, interval: float = 1.0):
+        """Call back on every change from a background thread.
+
+        Args:
+            callback (callable): A function taking a HotplugEvent as argument.
+            interval (float, optional): Polling interval, in seconds. Defaults to 1.0.
+        """
+        if self.__thread is not None:
+            raise RuntimeError("Hotplug monitor already started")
+        self.__stop.clear()
+
+        def run():
+            while not self.__stop.is_set():
+                if self.uses_file_system_events:
+                    events = self.poll(interval)
+                else:
+                    events = self.poll()
+                    self.__stop.wait(interval)
+                for event in events:
+                    callback(event)
+
+        self.__thread = threading.Thread(
+            target=run, name="HotplugMonitor", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self):
+        """Stop the background thread (if started)."""
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+    def close(self):
+        """Stop monitoring and release resources."""
+        self.stop()
+        if self.__watcher is not None:
+            self.__watcher.close()
+            self.__watcher = None
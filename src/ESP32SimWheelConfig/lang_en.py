@@ -43,6 +43,7 @@ class EN(Enum):
     RECALIBRATE = "Recalibrate"
     REGULAR_BUTTON = "Regular button"
     RELOAD = "Reload"
+    RESCAN = "Rescan"
     SAVE = "Save"
     SELECT = "Select"
     SOC = "State of charge"
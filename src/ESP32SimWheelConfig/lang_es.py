@@ -45,6 +45,7 @@ class ES(Enum):
     RECALIBRATE = "Recalibrar"
     REGULAR_BUTTON = "Botón normal"
     RELOAD = "Recargar"
+    RESCAN = "Explorar"
     SAVE = "Salvar"
     SELECT = "Seleccionar"
     SOC = "Estado de carga"
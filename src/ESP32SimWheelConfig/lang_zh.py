@@ -43,6 +43,7 @@ class ZH(Enum):
     RECALIBRATE = "重新校准"
     REGULAR_BUTTON = "常规按钮"
     RELOAD = "重新加载"
+    RESCAN = "重新扫描"
     SAVE = "节省"
     SELECT = "选择"
     SOC = "充电状态"
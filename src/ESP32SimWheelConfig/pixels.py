@@ -0,0 +1,494 @@
+# ****************************************************************************
+# @file pixels.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Pixel streaming at a steady frame rate
+
+Frames are scheduled at monotonic deadlines, capped at the maximum
+frame rate reported by each device. Frames that can not be shown
+in time are dropped instead of queued.
+Several devices can show their frames at the same time.
+
+Classes:
+
+    PacerStats
+    SkewStats
+    FramePacer
+    PixelStreamer
+    SyncPixelEngine
+
+Functions:
+
+    effective_fps()
+"""
+
+###############################################################################
+
+import threading
+import time
+from dataclasses import dataclass
+
+if __package__:
+    from . import esp32simwheel
+else:
+    import esp32simwheel
+
+###############################################################################
+
+# Frame rate (frames per second) when neither the user nor the device sets one
+DEFAULT_FPS = 50
+
+# Time (in seconds) to wait for a submitted frame before checking for stop requests
+_IDLE_TIMEOUT = 0.5
+
+###############################################################################
+
+
+def effective_fps(device: esp32simwheel.SimWheel, fps: float | None = None) -> float:
+    """Frame rate for a device.
+
+    Args:
+        device (SimWheel): Device with pixel control.
+        fps (float | None, optional): Requested frame rate. Defaults to None
+        (as fast as the device allows).
+
+    Returns:
+        float: The requested frame rate, capped at the maximum frame rate
+        reported by the device (if any).
+    """
+    max_fps = device.max_fps
+    if (fps is None) or (fps <= 0):
+        return max_fps if max_fps > 0 else DEFAULT_FPS
+    if max_fps > 0:
+        return min(fps, max_fps)
+    return fps
+
+
+###############################################################################
+
+
+@dataclass(frozen=True)
+class PacerStats:
+    """Frame pacing statistics.
+
+    Attributes:
+
+        frames : Frames shown.
+        late_frames : Frames shown after their deadline.
+        dropped_frames : Frames skipped because their deadline had passed
+        or because a newer frame replaced them.
+        elapsed : Time (in seconds) since the first frame.
+        span : Time (in seconds) from the first frame to the last one.
+    """
+
+    frames: int = 0
+    late_frames: int = 0
+    dropped_frames: int = 0
+    elapsed: float = 0.0
+    span: float = 0.0
+
+    @property
+    def fps(self) -> float:
+        """Achieved frame rate."""
+        # Note: N frames are N - 1 periods apart
+        if (self.frames < 2) or (self.span <= 0.0):
+            return 0.0
+        return (self.frames - 1) / self.span
+
+
+@dataclass(frozen=True)
+class SkewStats:
+    """Time difference between devices showing the same frame.
+
+    Attributes:
+
+        frames : Frames shown by more than one device.
+        last : Skew of the last frame, in seconds.
+        mean : Average skew, in seconds.
+        max : Worst skew, in seconds.
+    """
+
+    frames: int = 0
+    last: float = 0.0
+    mean: float = 0.0
+    max: float = 0.0
+
+
+###############################################################################
+
+
+class FramePacer:
+    """Wait for frame deadlines at a fixed frame rate.
+
+    Deadlines are computed from the start time, not from the time
+    the previous frame was done, so the frame rate does not drift.
+    Whole frame periods that were missed are dropped, not made up for.
+    """
+
+    def __init__(self, fps: float):
+        """Create a frame pacer.
+
+        Args:
+            fps (float): Frames per second. Must be positive.
+        """
+        if fps <= 0:
+            raise ValueError("Frame rate must be positive")
+        self.__period = 1.0 / fps
+        self.__start = None
+        self.__last = None
+        self.__deadline = None
+        self.__frames = 0
+        self.__late_frames = 0
+        self.__dropped_frames = 0
+
+    @property
+    def period(self) -> float:
+        """Time between frames, in seconds."""
+        return self.__period
+
+    @property
+    def deadline(self) -> float | None:
+        """Monotonic time of the next frame (None before the first frame)."""
+        return self.__deadline
+
+    def wait(self) -> bool:
+        """Wait for the next frame deadline.
+
+        Returns:
+            bool: True if the frame is on time, False if it is late.
+        """
+        now = time.monotonic()
+        if self.__deadline is None:
+            self.__start = now
+            self.__deadline = now
+        on_time = True
+        if now < self.__deadline:
+            time.sleep(self.__deadline - now)
+            self.__last = self.__deadline
+        else:
+            self.__last = now
+            missed = int((now - self.__deadline) / self.__period)
+            if missed > 0:
+                self.__dropped_frames += missed
+                self.__deadline += missed * self.__period
+            if now - self.__deadline > self.__period / 10:
+                self.__late_frames += 1
+                on_time = False
+        self.__frames += 1
+        self.__deadline += self.__period
+        return on_time
+
+    def resume(self):
+        """Resume after an idle period, so missed deadlines do not count as dropped."""
+        if self.__deadline is not None:
+            self.__deadline = max(self.__deadline, time.monotonic())
+
+    def drop(self, count: int = 1):
+        """Account for frames dropped by the caller."""
+        self.__dropped_frames += count
+
+    @property
+    def stats(self) -> PacerStats:
+        """Statistics since the first frame."""
+        if self.__start is None:
+            return PacerStats()
+        return PacerStats(
+            frames=self.__frames,
+            late_frames=self.__late_frames,
+            dropped_frames=self.__dropped_frames,
+            elapsed=time.monotonic() - self.__start,
+            span=self.__last - self.__start,
+        )
+
+    def reset(self):
+        """Start over."""
+        self.__start = None
+        self.__last = None
+        self.__deadline = None
+        self.__frames = 0
+        self.__late_frames = 0
+        self.__dropped_frames = 0
+
+
+###############################################################################
+
+
+class PixelStreamer:
+    """Stream pixel frames to a device at a steady frame rate.
+
+    Frames can be rendered on every tick (see run())
+    or submitted from another thread (see submit() and start()).
+    In the latter case, only the latest submitted frame is shown.
+    """
+
+    def __init__(self, device: esp32simwheel.SimWheel, fps: float | None = None):
+        """Create a pixel streamer.
+
+        Args:
+            device (SimWheel): Device with pixel control.
+            fps (float | None, optional): Requested frame rate, capped at the
+            device's maximum. Defaults to None (as fast as the device allows).
+        """
+        self.__frame = device.pixel_frame()
+        self.__pacer = FramePacer(effective_fps(device, fps))
+        self.__lock = threading.Lock()
+        self.__pending = None
+        self.__submitted = threading.Event()
+        self.__thread = None
+        self.__stop = threading.Event()
+
+    @property
+    def frame(self) -> esp32simwheel.PixelFrame:
+        """Frame buffer."""
+        return self.__frame
+
+    @property
+    def fps(self) -> float:
+        """Target frame rate."""
+        return 1.0 / self.__pacer.period
+
+    @property
+    def stats(self) -> PacerStats:
+        """Frame pacing statistics."""
+        return self.__pacer.stats
+
+    def tick(self, render) -> int | None:
+        """Wait for the next deadline, then render and show a frame.
+
+        Args:
+            render (callable): A function that takes a PixelFrame and sets its pixels.
+
+        Returns:
+            int | None: See PixelFrame.commit().
+        """
+        self.__pacer.wait()
+        render(self.__frame)
+        return self.__frame.commit()
+
+    def run(self, render, duration: float | None = None):
+        """Render and show frames until the given time has elapsed.
+
+        Args:
+            render (callable): A function that takes a PixelFrame and sets its pixels.
+            duration (float | None, optional): Time to run, in seconds.
+            Defaults to None (forever).
+        """
+        end = None if duration is None else time.monotonic() + duration
+        while (end is None) or (time.monotonic() < end):
+            if self.tick(render) is None:
+                break
+
+    def submit(self, render):
+        """Show a frame at the next deadline.
+
+        If another frame is still waiting, it is dropped.
+
+        Args:
+            render (callable): A function that takes a PixelFrame and sets its pixels.
+        """
+        with self.__lock:
+            if self.__pending is not None:
+                self.__pacer.drop()
+            self.__pending = render
+            self.__submitted.set()
+
+    def start(self):
+        """Show submitted frames from a background thread."""
+        if self.__thread is not None:
+            raise RuntimeError("Pixel streamer already started")
+        self.__stop.clear()
+
+        def run():
+            while not self.__stop.is_set():
+                if not self.__submitted.is_set():
+                    if not self.__submitted.wait(_IDLE_TIMEOUT):
+                        continue
+                    if self.__stop.is_set():
+                        break
+                    self.__pacer.resume()
+                self.__pacer.wait()
+                with self.__lock:
+                    render = self.__pending
+                    self.__pending = None
+                    self.__submitted.clear()
+                if render is not None:
+                    render(self.__frame)
+                    self.__frame.commit()
+
+        self.__thread = threading.Thread(target=run, name="PixelStreamer", daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stop the background thread (if started)."""
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__submitted.set()
+            self.__thread.join()
+            self.__thread = None
+
+
+###############################################################################
+
+
+class SyncPixelEngine:
+    """Stream pixel frames to several devices, showing them at the same time.
+
+    Each device has its own writer thread. On every frame, all devices
+    send their changed pixels in parallel, then wait for each other
+    and send the "show" command together.
+    """
+
+    def __init__(self, devices, fps: float | None = None):
+        """Create a pixel engine.
+
+        Args:
+            devices (iterable): Devices (SimWheel) with pixel control.
+            fps (float | None, optional): Requested frame rate, capped at the
+            maximum of the slowest device. Defaults to None
+            (as fast as the slowest device allows).
+        """
+        devices = list(devices)
+        if len(devices) == 0:
+            raise ValueError("No devices")
+        self.__frames = [device.pixel_frame() for device in devices]
+        self.__pacer = FramePacer(
+            min(effective_fps(device, fps) for device in devices)
+        )
+        # Note: writer threads plus the calling thread
+        self.__barrier = threading.Barrier(len(devices) + 1)
+        self.__render = None
+        self.__show_time = [None] * len(devices)
+        self.__threads = []
+        self.__stop = False
+        self.__skew_frames = 0
+        self.__skew_last = 0.0
+        self.__skew_total = 0.0
+        self.__skew_max = 0.0
+
+    @property
+    def frames(self) -> list[esp32simwheel.PixelFrame]:
+        """Frame buffers, one per device."""
+        return list(self.__frames)
+
+    @property
+    def fps(self) -> float:
+        """Target frame rate."""
+        return 1.0 / self.__pacer.period
+
+    @property
+    def stats(self) -> PacerStats:
+        """Frame pacing statistics."""
+        return self.__pacer.stats
+
+    @property
+    def skew(self) -> SkewStats:
+        """Skew statistics."""
+        if self.__skew_frames == 0:
+            return SkewStats()
+        return SkewStats(
+            frames=self.__skew_frames,
+            last=self.__skew_last,
+            mean=self.__skew_total / self.__skew_frames,
+            max=self.__skew_max,
+        )
+
+    def __writer(self, index: int):
+        frame = self.__frames[index]
+        try:
+            while True:
+                self.__barrier.wait()
+                if self.__stop:
+                    return
+                # Stage
+                try:
+                    self.__render(frame)
+                    staged = frame.commit(show=False)
+                except Exception:
+                    staged = None
+                self.__barrier.wait()
+                # Show
+                self.__show_time[index] = None
+                if staged and frame.show():
+                    self.__show_time[index] = time.perf_counter()
+                self.__barrier.wait()
+        except threading.BrokenBarrierError:
+            return
+
+    def start(self):
+        """Start writer threads."""
+        if self.__threads:
+            raise RuntimeError("Pixel engine already started")
+        self.__stop = False
+        self.__barrier.reset()
+        for index in range(len(self.__frames)):
+            thread = threading.Thread(
+                target=self.__writer,
+                args=(index,),
+                name=f"PixelWriter{index}",
+                daemon=True,
+            )
+            thread.start()
+            self.__threads.append(thread)
+
+    def stop(self):
+        """Stop writer threads (if started)."""
+        if self.__threads:
+            self.__stop = True
+            self.__barrier.abort()
+            for thread in self.__threads:
+                thread.join()
+            self.__threads = []
+
+    def wait(self) -> bool:
+        """Wait for the next frame deadline. See FramePacer.wait()."""
+        return self.__pacer.wait()
+
+    def show(self, render):
+        """Render and show a frame on all devices, without waiting for a deadline.
+
+        Args:
+            render (callable): A function that takes a PixelFrame and sets its pixels.
+            Called once per device, from the device's writer thread.
+            See PixelFrame.device.
+        """
+        if not self.__threads:
+            self.start()
+        self.__render = render
+        self.__barrier.wait()  # stage
+        self.__barrier.wait()  # show
+        self.__barrier.wait()  # done
+        show_time = [t for t in self.__show_time if t is not None]
+        if len(show_time) > 1:
+            skew = max(show_time) - min(show_time)
+            self.__skew_frames += 1
+            self.__skew_last = skew
+            self.__skew_total += skew
+            self.__skew_max = max(self.__skew_max, skew)
+
+    def tick(self, render):
+        """Wait for the next deadline, then render and show a frame on all devices.
+
+        Args:
+            render (callable): See show().
+        """
+        self.wait()
+        self.show(render)
+
+    def run(self, render, duration: float | None = None):
+        """Render and show frames until the given time has elapsed.
+
+        Args:
+            render (callable): See tick().
+            duration (float | None, optional): Time to run, in seconds.
+            Defaults to None (forever).
+        """
+        end = None if duration is None else time.monotonic() + duration
+        while (end is None) or (time.monotonic() < end):
+            self.tick(render)
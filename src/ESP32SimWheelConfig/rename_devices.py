@@ -20,9 +20,12 @@ Functions:
 
 ###############################################################################
 
-import winreg
 from sys import platform
 
+# Note: "winreg" is not available in other systems
+if platform == "win32":
+    import winreg
+
 __all__ = [
     "get_display_name_from_registry",
     "set_display_name_in_registry",
@@ -0,0 +1,478 @@
+# ****************************************************************************
+# @file telemetry.py
+#
+# @author Ángel Fernández Pineda. Madrid. Spain.
+# @date 2026-10-18
+# @brief Configuration app for ESP32-based open source sim wheels
+# @copyright 2026 Ángel Fernández Pineda. Madrid. Spain.
+# @license Licensed under the EUPL
+# *****************************************************************************
+
+"""
+Telemetry-driven pixels
+
+Simple telemetry packets (RPM, max RPM and flags) are received
+from a local UDP socket and shown in all pixel groups:
+
+- Telemetry group: revs bar, flashing at the shift point.
+- Backlights: race flags.
+- Individual pixels: one per telemetry flag.
+
+Colors of every pixel group are precomputed for each possible
+state, so a frame is rendered with a single copy per group.
+
+Packet format (little endian):
+
+    magic (4 bytes) "ESWT"
+    rpm (uint16)
+    max_rpm (uint16)
+    flags (uint16)
+
+Usage:
+
+    python telemetry.py [--port PORT] [--fps FPS]
+    python telemetry.py generate [--port PORT] [--rate RATE]
+
+Classes:
+
+    TelemetryPacket
+    LatencyStats
+    TelemetryListener
+    TelemetryMapper
+    TelemetryPipeline
+    PacketGenerator
+"""
+
+###############################################################################
+
+import argparse
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+
+if __package__:
+    from . import esp32simwheel
+    from . import pixels
+else:
+    import esp32simwheel
+    import pixels
+
+###############################################################################
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 20777
+
+_PACKET = struct.Struct("<4sHHH")
+_MAGIC = b"ESWT"
+
+# Telemetry flags
+FLAG_PIT_LIMITER = 0x01
+FLAG_LOW_FUEL = 0x02
+FLAG_ABS = 0x04
+FLAG_TC = 0x08
+FLAG_YELLOW = 0x10
+FLAG_BLUE = 0x20
+
+# Colors (red, green, blue)
+_OFF = (0, 0, 0)
+_GREEN = (0, 255, 0)
+_YELLOW = (255, 192, 0)
+_RED = (255, 0, 0)
+_BLUE = (0, 0, 255)
+_WHITE = (64, 64, 64)
+
+# Color of individual pixels, in flag order
+_FLAG_COLORS = (_BLUE, _YELLOW, _RED, _YELLOW)
+
+# Revs bar zones, as a fraction of its length
+_GREEN_ZONE = 0.5
+_YELLOW_ZONE = 0.8
+
+# Fraction of max RPM where the revs bar starts flashing
+_SHIFT_POINT = 0.95
+
+# Blinks per second
+_BLINK_RATE = 4
+
+# Seconds the receiver thread waits for a packet before checking for close()
+_RECEIVE_TIMEOUT = 0.1
+
+###############################################################################
+
+
+@dataclass(frozen=True)
+class TelemetryPacket:
+    """Telemetry data.
+
+    Attributes:
+
+        rpm : Engine revolutions per minute.
+        max_rpm : Maximum engine revolutions per minute.
+        flags : Telemetry flags as a bit field (see FLAG_*).
+    """
+
+    rpm: int = 0
+    max_rpm: int = 0
+    flags: int = 0
+
+    def to_bytes(self) -> bytes:
+        """Encode as a UDP packet."""
+        return _PACKET.pack(_MAGIC, self.rpm, self.max_rpm, self.flags)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "TelemetryPacket | None":
+        """Decode a UDP packet. Returns None if not valid."""
+        if len(data) != _PACKET.size:
+            return None
+        magic, rpm, max_rpm, flags = _PACKET.unpack(data)
+        if magic != _MAGIC:
+            return None
+        return TelemetryPacket(rpm, max_rpm, flags)
+
+
+###############################################################################
+
+
+@dataclass(frozen=True)
+class LatencyStats:
+    """Time from packet arrival to pixels being shown.
+
+    Attributes:
+
+        packets : Packets shown.
+        last : Latency of the last packet, in seconds.
+        mean : Average latency, in seconds.
+        max : Worst latency, in seconds.
+    """
+
+    packets: int = 0
+    last: float = 0.0
+    mean: float = 0.0
+    max: float = 0.0
+
+
+###############################################################################
+
+
+class TelemetryListener:
+    """Receive telemetry packets from a local UDP socket.
+
+    Packets are received by a background thread blocked on the socket,
+    so their arrival time does not depend on how often receive() is called.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.__socket.bind((host, port))
+        # Note: the timeout lets the receiver thread notice close()
+        self.__socket.settimeout(_RECEIVE_TIMEOUT)
+        self.__lock = threading.Lock()
+        self.__latest = None
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(
+            target=self.__run, name="TelemetryListener", daemon=True
+        )
+        self.__thread.start()
+
+    def __run(self):
+        while not self.__stop.is_set():
+            try:
+                data = self.__socket.recv(64)
+            except (TimeoutError, InterruptedError):
+                continue
+            except OSError:
+                # Socket closed
+                return
+            # Note: stamped as soon as the packet leaves the kernel buffer
+            arrival = time.perf_counter()
+            packet = TelemetryPacket.from_bytes(data)
+            if packet is not None:
+                with self.__lock:
+                    self.__latest = (packet, arrival)
+
+    def receive(self) -> tuple[TelemetryPacket, float] | None:
+        """Get the latest packet, without waiting.
+
+        Older packets are dropped.
+
+        Returns:
+            tuple[TelemetryPacket, float] | None: The latest valid packet
+            not retrieved yet and its arrival time (as given by
+            time.perf_counter()), or None if there is none.
+        """
+        with self.__lock:
+            result = self.__latest
+            self.__latest = None
+        return result
+
+    def close(self):
+        """Stop the receiver thread and close the UDP socket."""
+        self.__stop.set()
+        self.__thread.join()
+        self.__socket.close()
+
+
+###############################################################################
+
+
+def _fill(count: int, color) -> bytes:
+    return bytes(color) * count
+
+
+def _revs_bar(count: int, lit: int) -> bytes:
+    colors = []
+    for index in range(count):
+        if index >= lit:
+            colors.append(_OFF)
+        elif index < count * _GREEN_ZONE:
+            colors.append(_GREEN)
+        elif index < count * _YELLOW_ZONE:
+            colors.append(_YELLOW)
+        else:
+            colors.append(_RED)
+    return b"".join(bytes(color) for color in colors)
+
+
+class TelemetryMapper:
+    """Compute pixel colors from telemetry data."""
+
+    def __init__(self, pixel_count: tuple[int, int, int]):
+        """Precompute pixel colors for a device.
+
+        Args:
+            pixel_count (tuple[int, int, int]): Number of pixels in each group.
+        """
+        telemetry, backlights, individual = pixel_count
+        self.__pixel_count = pixel_count
+        # Revs bar, indexed by the number of lit pixels
+        self.__revs = [_revs_bar(telemetry, lit) for lit in range(telemetry + 1)]
+        self.__shift = _fill(telemetry, _RED)
+        self.__backlights = {
+            color: _fill(backlights, color) for color in (_WHITE, _YELLOW, _BLUE)
+        }
+        # Individual pixels, indexed by telemetry flags
+        flag_count = min(individual, len(_FLAG_COLORS))
+        self.__individual = [
+            b"".join(
+                bytes(_FLAG_COLORS[index]) if (flags >> index) & 1 else bytes(_OFF)
+                for index in range(flag_count)
+            )
+            + bytes(3 * (individual - flag_count))
+            for flags in range(1 << flag_count)
+        ]
+        self.__flag_mask = (1 << flag_count) - 1
+
+    def render(self, frame: esp32simwheel.PixelFrame, packet: TelemetryPacket):
+        """Set all pixels in a frame.
+
+        Args:
+            frame (PixelFrame): Frame buffer.
+            packet (TelemetryPacket): Telemetry data.
+        """
+        blink_on = int(time.monotonic() * 2 * _BLINK_RATE) % 2 == 0
+
+        telemetry = self.__pixel_count[esp32simwheel.PixelGroup.GRP_TELEMETRY]
+        if telemetry > 0:
+            if packet.max_rpm > 0:
+                ratio = min(packet.rpm / packet.max_rpm, 1.0)
+            else:
+                ratio = 0.0
+            if ratio >= _SHIFT_POINT:
+                revs = self.__shift if blink_on else self.__revs[0]
+            else:
+                revs = self.__revs[round(ratio * telemetry)]
+            frame.set_group(esp32simwheel.PixelGroup.GRP_TELEMETRY, revs)
+
+        if self.__pixel_count[esp32simwheel.PixelGroup.GRP_BACKLIGHTS] > 0:
+            if packet.flags & FLAG_BLUE:
+                color = _BLUE
+            elif packet.flags & FLAG_YELLOW:
+                color = _YELLOW
+            else:
+                color = _WHITE
+            frame.set_group(
+                esp32simwheel.PixelGroup.GRP_BACKLIGHTS, self.__backlights[color]
+            )
+
+        if self.__pixel_count[esp32simwheel.PixelGroup.GRP_INDIVIDUAL] > 0:
+            flags = packet.flags & self.__flag_mask
+            if (flags & FLAG_PIT_LIMITER) and not blink_on:
+                flags &= ~FLAG_PIT_LIMITER
+            frame.set_group(
+                esp32simwheel.PixelGroup.GRP_INDIVIDUAL, self.__individual[flags]
+            )
+
+
+###############################################################################
+
+
+class TelemetryPipeline:
+    """Show telemetry from a UDP socket on the pixels of several devices."""
+
+    def __init__(
+        self,
+        devices,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        fps: float | None = None,
+    ):
+        """Create a telemetry pipeline.
+
+        Args:
+            devices (iterable): Devices (SimWheel) with pixel control.
+            host (str, optional): Address to listen to. Defaults to localhost.
+            port (int, optional): UDP port to listen to. Defaults to DEFAULT_PORT.
+            fps (float | None, optional): Requested frame rate. See SyncPixelEngine.
+        """
+        self.__engine = pixels.SyncPixelEngine(devices, fps)
+        self.__mappers = {
+            id(frame): TelemetryMapper(frame.device.capabilities.pixel_count)
+            for frame in self.__engine.frames
+        }
+        self.__listener = TelemetryListener(host, port)
+        self.__packet = TelemetryPacket()
+        self.__latency_packets = 0
+        self.__latency_last = 0.0
+        self.__latency_total = 0.0
+        self.__latency_max = 0.0
+
+    @property
+    def engine(self) -> pixels.SyncPixelEngine:
+        """Pixel engine."""
+        return self.__engine
+
+    @property
+    def latency(self) -> LatencyStats:
+        """Latency statistics."""
+        if self.__latency_packets == 0:
+            return LatencyStats()
+        return LatencyStats(
+            packets=self.__latency_packets,
+            last=self.__latency_last,
+            mean=self.__latency_total / self.__latency_packets,
+            max=self.__latency_max,
+        )
+
+    def __render(self, frame: esp32simwheel.PixelFrame):
+        self.__mappers[id(frame)].render(frame, self.__packet)
+
+    def tick(self):
+        """Wait for the next frame deadline, then show the latest telemetry."""
+        self.__engine.wait()
+        received = self.__listener.receive()
+        if received is not None:
+            self.__packet = received[0]
+        self.__engine.show(self.__render)
+        if received is not None:
+            latency = time.perf_counter() - received[1]
+            self.__latency_packets += 1
+            self.__latency_last = latency
+            self.__latency_total += latency
+            self.__latency_max = max(self.__latency_max, latency)
+
+    def run(self, duration: float | None = None):
+        """Show telemetry until the given time has elapsed.
+
+        Args:
+            duration (float | None, optional): Time to run, in seconds.
+            Defaults to None (forever).
+        """
+        end = None if duration is None else time.monotonic() + duration
+        while (end is None) or (time.monotonic() < end):
+            self.tick()
+
+    def close(self):
+        """Stop the pixel engine and close the UDP socket."""
+        self.__engine.stop()
+        self.__listener.close()
+
+
+###############################################################################
+
+
+class PacketGenerator:
+    """Send fake telemetry packets to a local UDP socket (for testing)."""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.__address = (host, port)
+
+    def send(self, packet: TelemetryPacket):
+        """Send a single packet."""
+        self.__socket.sendto(packet.to_bytes(), self.__address)
+
+    def run(
+        self,
+        duration: float | None = None,
+        rate: float = 60.0,
+        max_rpm: int = 8000,
+        sweep_time: float = 3.0,
+    ):
+        """Send packets sweeping RPM from zero to max RPM, over and over.
+
+        Telemetry flags change on every sweep.
+
+        Args:
+            duration (float | None, optional): Time to run, in seconds.
+            Defaults to None (forever).
+            rate (float, optional): Packets per second. Defaults to 60.
+            max_rpm (int, optional): Maximum RPM. Defaults to 8000.
+            sweep_time (float, optional): Time of a single sweep, in seconds.
+            Defaults to 3.
+        """
+        pacer = pixels.FramePacer(rate)
+        start = time.monotonic()
+        while (duration is None) or (time.monotonic() - start < duration):
+            pacer.wait()
+            sweep, position = divmod((time.monotonic() - start) / sweep_time, 1.0)
+            flags = int(sweep) & 0x3F
+            self.send(TelemetryPacket(int(position * max_rpm), max_rpm, flags))
+
+    def close(self):
+        self.__socket.close()
+
+
+###############################################################################
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telemetry-driven pixels")
+    parser.add_argument(
+        "mode", nargs="?", choices=("listen", "generate"), default="listen"
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fps", type=float, default=None, help="Frame rate (listen)")
+    parser.add_argument(
+        "--rate", type=float, default=60.0, help="Packets per second (generate)"
+    )
+    args = parser.parse_args()
+
+    if args.mode == "generate":
+        print(f"Sending telemetry to port {args.port}")
+        generator = PacketGenerator(port=args.port)
+        try:
+            generator.run(rate=args.rate)
+        except KeyboardInterrupt:
+            pass
+        generator.close()
+    else:
+        devices = [
+            device
+            for device in esp32simwheel.enumerate(configurable_only=False)
+            if device.has_pixel_control
+        ]
+        if len(devices) == 0:
+            print("No devices found")
+        else:
+            pipeline = TelemetryPipeline(devices, port=args.port, fps=args.fps)
+            print(f"Listening to port {args.port} at {pipeline.engine.fps} FPS")
+            try:
+                pipeline.run()
+            except KeyboardInterrupt:
+                pass
+            pipeline.close()
+            latency = pipeline.latency
+            print(f"Packets shown: {latency.packets}")
+            print(f"Mean latency: {1000 * latency.mean:.3f} ms")
+            print(f"Max. latency: {1000 * latency.max:.3f} ms")